@@ -9,12 +9,16 @@ and maintainability.
 """
 
 import argparse
+import json
 import os
 import re
 import sys
 import math
+from contextlib import nullcontext, redirect_stdout
+from functools import lru_cache, partial
+from multiprocessing import Pool
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
 from typing import Dict, List, Tuple, Any
 
 def show_banner():
@@ -43,6 +47,7 @@ def get_project_root(path: str) -> str:
     
     return path  # Return original path if .git not found
 
+@lru_cache(maxsize=None)
 def get_language_patterns() -> Dict[str, Dict[str, List[str]]]:
     """Define language-specific patterns for operators and operands"""
     return {
@@ -154,66 +159,98 @@ def get_language_patterns() -> Dict[str, Dict[str, List[str]]]:
         }
     }
 
-def get_halstead_metrics(file_path: str, language: str) -> Dict[str, float]:
-    """Calculate Halstead metrics for a file"""
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"Warning: Could not read file {file_path} as text. It might be a binary file: {e}")
-        return {
-            'vocabulary': 0, 'length': 0, 'volume': 0,
-            'difficulty': 0, 'effort': 0, 'time': 0, 'bugs': 0
-        }
-    
-    if not content.strip():
-        print(f"Warning: File {file_path} is empty or could not be read.")
-        return {
-            'vocabulary': 0, 'length': 0, 'volume': 0,
-            'difficulty': 0, 'effort': 0, 'time': 0, 'bugs': 0
-        }
-    
-    # Get language patterns
-    patterns = get_language_patterns()
-    lang_patterns = patterns.get(language, patterns.get('py', {}))  # Default to Python
-    
-    unique_operators = defaultdict(int)
-    unique_operands = defaultdict(int)
-    total_operators = 0
-    total_operands = 0
-    
-    # Count operators
-    for pattern in lang_patterns.get('operators', []):
-        try:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                unique_operators[match] += 1
-                total_operators += 1
-        except Exception as e:
-            print(f"Warning: Error matching operator pattern '{pattern}': {e}")
+# Comment syntax per file language; languages without an entry use C-style comments
+LINE_COMMENT_LANGUAGES = {'py', 'rb'}
+
+EMPTY_METRICS = {
+    'vocabulary': 0, 'length': 0, 'volume': 0,
+    'difficulty': 0, 'effort': 0, 'time': 0, 'bugs': 0
+}
+
+class HalsteadTokenizer:
+    """Single-pass tokenizer that splits source into Halstead operators and operands.
+
+    Built once per language from get_language_patterns(): symbolic operators
+    become one longest-first alternation, keyword operators (new, typeof,
+    and, is...) are matched as whole words, and identifiers, numbers and
+    string literals are operands. Comments are skipped. Every character is
+    consumed by at most one token, so '==' is never also counted as two '='
+    and 'is' is never found inside 'this'.
+    """
     
-    # Count operands
-    for pattern in lang_patterns.get('operands', []):
-        try:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                unique_operands[match] += 1
-                total_operands += 1
-        except Exception as e:
-            print(f"Warning: Error matching operand pattern '{pattern}': {e}")
+    def __init__(self, language: str):
+        patterns = get_language_patterns()
+        pattern_language = language if language in patterns else 'py'  # Default to Python
+        lang_patterns = patterns[pattern_language]
+        
+        symbol_operators = set()
+        keyword_operators = set()
+        for pattern in lang_patterns['operators']:
+            # Operator patterns are plain literals with regex escapes
+            literal = pattern.replace('\\', '')
+            if literal.isalpha():
+                keyword_operators.add(literal)
+            else:
+                symbol_operators.add(literal)
+        
+        identifier = r'[a-zA-Z_$][a-zA-Z0-9_$]*' if pattern_language in ('js', 'ts') else r'[a-zA-Z_][a-zA-Z0-9_]*'
+        
+        if language in LINE_COMMENT_LANGUAGES:
+            comment = r'\#[^\n]*'
+        else:
+            comment = r'//[^\n]*|/\*.*?\*/'
+        
+        strings = [r'"(?:\\.|[^"\\])*"', r"'(?:\\.|[^'\\])*'"]
+        if pattern_language == 'py':
+            strings = [r'""".*?"""', r"'''.*?'''"] + strings
+            # String prefixes (f"", r'', b"") belong to the literal, not to an identifier
+            strings = [r'(?:[rRbBuUfF]{1,2})?(?:' + '|'.join(strings) + ')']
+        elif pattern_language in ('js', 'ts'):
+            strings.append(r'`(?:\\.|[^`\\])*`')
+        
+        operators = '|'.join(re.escape(op) for op in sorted(symbol_operators, key=lambda op: (-len(op), op)))
+        
+        # No capture groups: findall then returns plain token strings built in C,
+        # and only distinct tokens need to be classified afterwards
+        self.token_pattern = re.compile(
+            f'{comment}'
+            f'|{"|".join(strings)}'
+            r'|\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?[a-zA-Z]*'
+            f'|{identifier}'
+            f'|{operators}',
+            re.DOTALL
+        )
+        self.operators = symbol_operators | keyword_operators
+        self.comment_prefixes = ('#',) if language in LINE_COMMENT_LANGUAGES else ('//', '/*')
     
-    # Calculate Halstead metrics
-    n1 = len(unique_operators)    # Number of unique operators
-    n2 = len(unique_operands)     # Number of unique operands
-    N1 = total_operators          # Total number of operators
-    N2 = total_operands           # Total number of operands
+    def count_tokens(self, content: str) -> Tuple[Counter, Counter]:
+        """Count occurrences of each distinct operator and operand in one sweep."""
+        operators = Counter()
+        operands = Counter()
+        
+        for token, count in Counter(self.token_pattern.findall(content)).items():
+            if token in self.operators:
+                operators[token] = count
+            elif not token.startswith(self.comment_prefixes):
+                operands[token] = count
+        
+        return operators, operands
+
+@lru_cache(maxsize=None)
+def get_halstead_tokenizer(language: str) -> HalsteadTokenizer:
+    """Get the compiled tokenizer for a language, building it on first use."""
+    return HalsteadTokenizer(language)
+
+def compute_halstead_metrics(operators: Counter, operands: Counter) -> Dict[str, float]:
+    """Calculate Halstead metrics from operator and operand occurrence counts"""
+    n1 = len(operators)              # Number of unique operators
+    n2 = len(operands)               # Number of unique operands
+    N1 = sum(operators.values())     # Total number of operators
+    N2 = sum(operands.values())      # Total number of operands
     
     # Avoid division by zero
     if n1 == 0 or n2 == 0:
-        return {
-            'vocabulary': 0, 'length': 0, 'volume': 0,
-            'difficulty': 0, 'effort': 0, 'time': 0, 'bugs': 0
-        }
+        return dict(EMPTY_METRICS)
     
     vocabulary = n1 + n2                      # Program vocabulary
     length = N1 + N2                          # Program length
@@ -233,6 +270,23 @@ def get_halstead_metrics(file_path: str, language: str) -> Dict[str, float]:
         'bugs': round(bugs, 3)
     }
 
+def get_halstead_metrics(file_path: str, language: str) -> Dict[str, float]:
+    """Calculate Halstead metrics for a file"""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except Exception as e:
+        print(f"Warning: Could not read file {file_path} as text. It might be a binary file: {e}",
+              file=sys.stderr)
+        return dict(EMPTY_METRICS)
+    
+    if not content.strip():
+        print(f"Warning: File {file_path} is empty or could not be read.", file=sys.stderr)
+        return dict(EMPTY_METRICS)
+    
+    operators, operands = get_halstead_tokenizer(language).count_tokens(content)
+    return compute_halstead_metrics(operators, operands)
+
 def get_language_from_extension(file_path: str) -> str:
     """Determine language from file extension"""
     ext = Path(file_path).suffix.lower().lstrip('.')
@@ -252,6 +306,82 @@ def get_language_from_extension(file_path: str) -> str:
     }
     return language_map.get(ext, 'unknown')
 
+def analyze_file(file_path: Path, project_root: str) -> Dict[str, Any]:
+    """Build the result record for one file.
+
+    Kept at module level so it can be dispatched to process pool workers.
+    """
+    language = get_language_from_extension(str(file_path))
+    metrics = get_halstead_metrics(str(file_path), language)
+    
+    return {
+        'file': str(file_path.relative_to(project_root)),
+        'language': language,
+        **metrics
+    }
+
+def _init_worker():
+    """Send anything a pool worker prints to stderr.
+
+    Workers started with spawn or forkserver do not inherit the parent's
+    redirected stdout, and stdout may be carrying --jsonl records.
+    """
+    sys.stdout = sys.stderr
+
+def iter_file_results(files: List[Path], project_root: str, jobs: int = 1):
+    """Yield result records as files are analyzed.
+
+    With more than one job, files are spread over a process pool and records
+    are yielded in completion order rather than input order.
+    """
+    worker = partial(analyze_file, project_root=project_root)
+    if jobs <= 1 or len(files) <= 1:
+        yield from map(worker, files)
+        return
+    
+    chunksize = max(1, min(64, len(files) // (jobs * 4)))
+    with Pool(processes=jobs, initializer=_init_worker) as pool:
+        yield from pool.imap_unordered(worker, files, chunksize=chunksize)
+
+def iter_source_files(repo_path: str, file_extensions: List[str], exclude_patterns: List[str]):
+    """Yield files under repo_path whose extension is in file_extensions.
+
+    The tree is walked once with os.scandir. Exclude patterns are matched as
+    substrings of the path relative to repo_path, and excluded directories are
+    pruned before they are descended into. Entries are visited in name order
+    so a max_files cutoff is deterministic. Symlinked directories are not
+    followed.
+    """
+    extensions = {ext.lower().lstrip('.') for ext in file_extensions}
+    stack = [(str(repo_path), '')]
+    
+    while stack:
+        directory, relative_dir = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Warning: Could not read directory {directory}: {e}")
+            continue
+        
+        subdirectories = []
+        for entry in entries:
+            relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            if any(pattern in relative_path for pattern in exclude_patterns):
+                continue
+            
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append((entry.path, relative_path))
+                elif (entry.name.rpartition('.')[2].lower() in extensions
+                      and '.' in entry.name and entry.is_file()):
+                    yield Path(entry.path)
+            except OSError:
+                continue
+        
+        # Reversed so subdirectories are popped in name order
+        stack.extend(reversed(subdirectories))
+
 def find_files_to_analyze(repo_path: str, file_extensions: List[str], 
                          exclude_patterns: List[str], max_files: int,
                          files_to_analyze_file: str = None) -> List[Path]:
@@ -295,21 +425,12 @@ def find_files_to_analyze(repo_path: str, file_extensions: List[str],
         # Default behavior: scan repository for files matching extensions
         print(f"\033[93mNo files list provided. Scanning repository for files matching extensions...\033[0m")
         
-        repo_path_obj = Path(repo_path)
-        for ext in file_extensions:
-            for file_path in repo_path_obj.rglob(f"*.{ext}"):
-                # Check exclusion patterns
-                should_exclude = any(pattern in str(file_path) for pattern in exclude_patterns)
-                
-                if not should_exclude:
-                    files_to_analyze.append(file_path)
-                
-                # Limit the number of files if MaxFiles is set
-                if max_files > 0 and len(files_to_analyze) >= max_files:
-                    print(f"\033[93mReached maximum file limit ({max_files}). Use --max-files parameter to adjust.\033[0m")
-                    break
+        for file_path in iter_source_files(repo_path, file_extensions, exclude_patterns):
+            files_to_analyze.append(file_path)
             
+            # Limit the number of files if MaxFiles is set
             if max_files > 0 and len(files_to_analyze) >= max_files:
+                print(f"\033[93mReached maximum file limit ({max_files}). Use --max-files parameter to adjust.\033[0m")
                 break
     
     return files_to_analyze
@@ -320,8 +441,9 @@ def generate_report(results: List[Dict[str, Any]], output_file: str, repo_path:
         print("No files were analyzed. Cannot generate report.")
         return
     
-    # Sort results by effort (descending)
-    sorted_results = sorted(results, key=lambda x: x['effort'], reverse=True)
+    # Sort results by effort (descending); the path breaks ties so the report
+    # does not depend on the order parallel workers completed in
+    sorted_results = sorted(results, key=lambda x: (-x['effort'], x['file']))
     
     # Calculate summary statistics
     total_files = len(results)
@@ -382,7 +504,7 @@ The following files require the most effort to understand and maintain:
     
     # Group by language
     language_groups = defaultdict(list)
-    for result in results:
+    for result in sorted_results:
         language_groups[result['language']].append(result)
     
     for language, group in language_groups.items():
@@ -453,9 +575,22 @@ def main():
                        help='Maximum number of files to analyze (0 for unlimited)')
     parser.add_argument('--files-to-analyze-file',
                        help='Path to a text file containing a list of files to analyze')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                       help='Number of worker processes (0 for one per CPU)')
+    parser.add_argument('--jsonl',
+                       help='Stream one JSON record per file to this path as files complete '
+                            '("-" for stdout). The markdown report is skipped unless --output-file is given')
     
     args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     
+    # Keep stdout clean for piping when records are streamed there
+    to_stdout = args.jsonl == '-'
+    with redirect_stdout(sys.stderr) if to_stdout else nullcontext():
+        run(args, jobs, sys.__stdout__ if to_stdout else None)
+
+def run(args: argparse.Namespace, jobs: int, jsonl_stream=None):
+    """Find, analyze and report on files according to the parsed arguments."""
     try:
         show_banner()
         
@@ -467,7 +602,8 @@ def main():
             print(f"Project root found: {project_root}")
         
         # Set default output file if not provided
-        if not args.output_file:
+        write_report = bool(args.output_file) or not args.jsonl
+        if write_report and not args.output_file:
             findings_dir = Path(project_root) / "olaf-data" / "findings"
             findings_dir.mkdir(parents=True, exist_ok=True)
             args.output_file = str(findings_dir / "halstead-metrics.md")
@@ -485,27 +621,29 @@ def main():
             print("No files found to analyze.")
             sys.exit(1)
         
-        print(f"Found {len(files_to_analyze)} files to analyze.")
+        print(f"Found {len(files_to_analyze)} files to analyze with {jobs} job(s).")
         
-        # Analyze files
+        if args.jsonl and jsonl_stream is None:
+            Path(args.jsonl).parent.mkdir(parents=True, exist_ok=True)
+        
+        # Analyze files, streaming records out as they complete
         results = []
-        for i, file_path in enumerate(files_to_analyze, 1):
-            print(f"Analyzing {i}/{len(files_to_analyze)}: {file_path.name}")
-            
-            language = get_language_from_extension(str(file_path))
-            metrics = get_halstead_metrics(str(file_path), language)
-            
-            relative_path = file_path.relative_to(project_root)
-            
-            result = {
-                'file': str(relative_path),
-                'language': language,
-                **metrics
-            }
-            results.append(result)
+        with open(args.jsonl, 'w', encoding='utf-8') if args.jsonl and jsonl_stream is None else nullcontext(jsonl_stream) as stream:
+            for i, result in enumerate(iter_file_results(files_to_analyze, project_root, jobs), 1):
+                print(f"Analyzed {i}/{len(files_to_analyze)}: {result['file']}")
+                
+                if stream is not None:
+                    stream.write(json.dumps(result) + '\n')
+                    stream.flush()
+                if write_report:
+                    results.append(result)
+        
+        if args.jsonl and jsonl_stream is None:
+            print(f"\033[92mStreamed {len(files_to_analyze)} records to {args.jsonl}\033[0m")
         
         # Generate report
-        generate_report(results, args.output_file, project_root)
+        if write_report:
+            generate_report(results, args.output_file, project_root)
         
     except Exception as e:
         print(f"Error during analysis: {e}")
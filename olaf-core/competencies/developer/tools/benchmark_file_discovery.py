@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Halstead file discovery
+
+Builds a fixture tree dominated by node_modules and build output, then compares
+iter_source_files (one pruned os.scandir walk) used by analyze_halstead_metrics.py
+with the previous approach (one Path.rglob per extension, filtering excluded
+paths after descending into them).
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from analyze_halstead_metrics import iter_source_files  # noqa: E402
+
+EXTENSIONS = ['cs', 'java', 'js', 'ts', 'py', 'rb', 'php', 'go', 'cpp', 'c', 'h', 'hpp']
+EXCLUDES = ['node_modules', 'dist', 'bin', 'obj', 'build', 'target', 'vendor', 'packages']
+
+
+def legacy_find(repo_path, file_extensions, exclude_patterns):
+    """Find files the way the per-extension rglob implementation did."""
+    files = []
+    repo_path_obj = Path(repo_path)
+    for ext in file_extensions:
+        for file_path in repo_path_obj.rglob(f"*.{ext}"):
+            if not any(pattern in str(file_path.relative_to(repo_path_obj)) for pattern in exclude_patterns):
+                files.append(file_path)
+    return files
+
+
+def build_fixture(root: Path, source_dirs: int, packages: int):
+    """Create a source tree next to a large node_modules and build output."""
+    for i in range(source_dirs):
+        package_dir = root / 'src' / f'module{i}'
+        package_dir.mkdir(parents=True)
+        for ext in ('py', 'ts', 'java', 'go'):
+            (package_dir / f'file{i}.{ext}').write_text('x = 1\n')
+        (package_dir / 'README.md').write_text('docs\n')
+
+    for i in range(packages):
+        package_dir = root / 'node_modules' / f'pkg{i}' / 'lib' / 'internal'
+        package_dir.mkdir(parents=True)
+        for name in ('index.js', 'util.js', 'types.ts', 'package.json'):
+            (package_dir / name).write_text('module.exports = {};\n')
+
+    for i in range(packages // 10):
+        build_dir = root / 'build' / 'generated' / f'chunk{i}'
+        build_dir.mkdir(parents=True)
+        (build_dir / 'bundle.js').write_text('var a;\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Halstead file discovery')
+    parser.add_argument('--source-dirs', type=int, default=200, help='Source directories in the fixture')
+    parser.add_argument('--packages', type=int, default=3000, help='Packages under node_modules')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix='halstead-discovery-'))
+    try:
+        build_fixture(root, args.source_dirs, args.packages)
+
+        legacy = legacy_find(root, EXTENSIONS, EXCLUDES)
+        walked = list(iter_source_files(root, EXTENSIONS, EXCLUDES))
+        if sorted(legacy) != sorted(walked):
+            print(f"FAIL: previous implementation found {len(legacy)} files, single walk found {len(walked)}")
+            sys.exit(1)
+
+        legacy_time = min(timeit.repeat(lambda: legacy_find(root, EXTENSIONS, EXCLUDES),
+                                        number=1, repeat=args.repeat))
+        walk_time = min(timeit.repeat(lambda: list(iter_source_files(root, EXTENSIONS, EXCLUDES)),
+                                      number=1, repeat=args.repeat))
+
+        print(f"Fixture: {args.source_dirs} source directories, {args.packages} node_modules packages")
+        print(f"Files found: {len(walked)} (identical sets)")
+        print(f"Per-extension rglob: {legacy_time:.3f}s")
+        print(f"Single pruned walk:  {walk_time:.3f}s")
+        print(f"Speedup: {legacy_time / walk_time:.1f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
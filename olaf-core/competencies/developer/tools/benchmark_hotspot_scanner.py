@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the hotspot conditional scanner
+
+Compares the single-alternation COMPLEXITY_SCANNER used by hotspot_analyzer.py
+with the previous approach (one re.findall per pattern per line) on a
+generated corpus of C-family and Python source. With --compare-path, both
+also count the source files of a real tree, and the files whose totals differ
+are listed.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from hotspot_analyzer import HotspotAnalyzer, count_lines, scan_conditionals  # noqa: E402
+
+# Patterns and loop of the per-line implementation this scanner replaced
+LEGACY_PATTERNS = [
+    r'if\s*\(', r'else\s*{', r'else\s+if', r'switch\s*\(', r'case\s+[^:]*:',
+    r'for\s*\(', r'while\s*\(', r'do\s*{', r'\?\s*.*\s*:', r'&&', r'\|\|',
+    r'catch\s*\(', r'except\s*:', r'finally\s*:',
+]
+
+CORPUS_LINES = [
+    'if (value > threshold && !cached) {',
+    '} else if (retries < 3 || force) {',
+    '} else {',
+    'for (int i = 0; i < items.length; i++) {',
+    'while (queue.size() > 0) {',
+    'do {',
+    'switch (state) {',
+    '    case READY: return handle(state);',
+    'result = enabled ? compute(x) : fallback;',
+    '} catch (IOException e) {',
+    'try:',
+    'except:',
+    'finally:',
+    'total += price * quantity;',
+    'logger.debug("processing record " + id);',
+    '// plain comment without any indicator',
+    'return new Response(body, headers);',
+]
+
+
+def legacy_count(lines):
+    """Count indicators the way the per-line implementation did."""
+    count = 0
+    for line in lines:
+        for pattern in LEGACY_PATTERNS:
+            count += len(re.findall(pattern, line, re.IGNORECASE))
+    return count
+
+
+def generate_corpus(line_count: int, seed: int) -> str:
+    """Generate a pseudo-random source buffer of the requested size."""
+    rng = random.Random(seed)
+    return '\n'.join(rng.choice(CORPUS_LINES) for _ in range(line_count)) + '\n'
+
+
+def iter_source_files(root: str):
+    """Yield the files under root that the hotspot analyzer would scan."""
+    analyzer = HotspotAnalyzer(root, use_cache=False)
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if not analyzer.should_exclude_file(name))
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            if analyzer.is_source_file(os.path.relpath(path, root)):
+                yield path
+
+
+def compare_on_files(root: str, show: int) -> None:
+    """Count indicators in real files both ways and report where they differ."""
+    files = 0
+    legacy_total = 0
+    scanner_total = 0
+    differences = []
+    for path in iter_source_files(root):
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        legacy = legacy_count(content.splitlines(keepends=True))
+        scanned = scan_conditionals(content).total
+        files += 1
+        legacy_total += legacy
+        scanner_total += scanned
+        if legacy != scanned:
+            differences.append((abs(scanned - legacy), os.path.relpath(path, root), legacy, scanned))
+
+    print(f"Real files under {root}: {files:,}")
+    print(f"  Legacy per-pattern findall: {legacy_total:,} indicators")
+    print(f"  Single-alternation scanner: {scanner_total:,} indicators")
+    print(f"  Files with different totals: {len(differences):,}")
+    for _, path, legacy, scanned in sorted(differences, reverse=True)[:show]:
+        print(f"    {path}: {legacy} -> {scanned}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hotspot conditional scanner')
+    parser.add_argument('--lines', type=int, default=200000, help='Lines in the generated corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the corpus')
+    parser.add_argument('--compare-path', help='Also compare the two counts on the source files under this path')
+    parser.add_argument('--show', type=int, default=10, help='Differing files to list with --compare-path')
+    args = parser.parse_args()
+
+    content = generate_corpus(args.lines, args.seed)
+    lines = content.splitlines(keepends=True)
+
+    legacy_time = min(timeit.repeat(lambda: legacy_count(lines), number=1, repeat=args.repeat))
+    scanner_time = min(timeit.repeat(lambda: scan_conditionals(content), number=1, repeat=args.repeat))
+
+    breakdown = scan_conditionals(content)
+    print(f"Corpus: {count_lines(content):,} lines, {len(content):,} characters")
+    print(f"Legacy per-pattern findall: {legacy_time:.3f}s ({legacy_count(lines):,} indicators)")
+    print(f"Single-alternation scanner: {scanner_time:.3f}s ({breakdown.total:,} indicators)")
+    print(f"  {breakdown}")
+    print(f"Speedup: {legacy_time / scanner_time:.1f}x")
+
+    if args.compare_path:
+        compare_on_files(args.compare_path, args.show)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Halstead Engine Regression Suite
+
+Checks the single-pass HalsteadTokenizer used by analyze_halstead_metrics.py:
+
+1. Golden cases: small snippets with hand-counted operators and operands.
+   Any change in tokenizer behavior makes these fail.
+2. Comparison: runs the tokenizer and the previous per-pattern re.findall
+   engine over a repository, reporting per-metric drift and the speedup.
+   The previous engine double-counts overlapping matches ('==' also as two
+   '=', 'is' inside 'this', keywords inside strings and comments), so its
+   counts are expected to be higher; the comparison fails only if the
+   tokenizer ever reports more operators or operands than it.
+
+Exits with status 1 when any check fails.
+"""
+
+import argparse
+import math
+import re
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from analyze_halstead_metrics import (  # noqa: E402
+    find_files_to_analyze, get_halstead_tokenizer, get_language_from_extension,
+    get_language_patterns
+)
+
+# (language, source, unique operators, unique operands, total operators, total operands)
+GOLDEN_CASES = [
+    ('js', 'if (a === b && c != "x // y") { x += typeof y; }', 5, 7, 5, 7),
+    ('js', '// only a comment\n/* and a\n block */', 0, 0, 0, 0),
+    ('js', 'let s = `a ${b}` + 1.5e3;', 2, 4, 2, 4),
+    ('ts', 'const v = value as string;', 2, 4, 2, 4),
+    ('py', 'x = a is not None and b // 2 ** 3', 6, 6, 6, 6),
+    ('py', '# comment\ny = f"{x}" + r\'\\d\' + """doc\nstring"""', 2, 4, 3, 4),
+    ('py', 'this = isinstance(x, int)', 1, 4, 1, 4),
+    ('cs', 'if (obj is Foo) { var f = new Foo(); }', 3, 5, 3, 6),
+    ('java', 'x <<= 2; y = a >= b ? a : b;', 5, 5, 6, 7),
+    ('rb', 'a <=> b; c =~ /x/ and d', 4, 5, 5, 5),
+]
+
+
+def legacy_count_tokens(content, language):
+    """Count tokens the way the per-pattern re.findall engine did."""
+    patterns = get_language_patterns()
+    lang_patterns = patterns.get(language, patterns.get('py', {}))
+
+    operators = defaultdict(int)
+    operands = defaultdict(int)
+    for pattern in lang_patterns.get('operators', []):
+        for match in re.findall(pattern, content):
+            operators[match] += 1
+    for pattern in lang_patterns.get('operands', []):
+        for match in re.findall(pattern, content):
+            operands[match] += 1
+    return operators, operands
+
+
+def summarize(operators, operands):
+    """Reduce token counts to (n1, n2, N1, N2)."""
+    return len(operators), len(operands), sum(operators.values()), sum(operands.values())
+
+
+def volume(counts):
+    """Halstead volume from (n1, n2, N1, N2)."""
+    n1, n2, total_operators, total_operands = counts
+    if n1 == 0 or n2 == 0:
+        return 0.0
+    return (total_operators + total_operands) * math.log2(n1 + n2)
+
+
+def run_golden_cases():
+    """Check the tokenizer against hand-counted snippets."""
+    failures = 0
+    for language, source, *expected in GOLDEN_CASES:
+        actual = summarize(*get_halstead_tokenizer(language).count_tokens(source))
+        if actual != tuple(expected):
+            failures += 1
+            print(f"FAIL [{language}] {source!r}: expected {tuple(expected)}, got {actual}")
+    print(f"Golden cases: {len(GOLDEN_CASES) - failures}/{len(GOLDEN_CASES)} passed")
+    return failures
+
+
+def run_comparison(repo_path, max_files):
+    """Compare both engines over the files of a repository."""
+    extensions = ['cs', 'java', 'js', 'ts', 'py', 'rb', 'php', 'go', 'cpp', 'c', 'h', 'hpp']
+    excludes = ['node_modules', 'dist', 'bin', 'obj', 'build', 'target', 'vendor', 'packages']
+    files = find_files_to_analyze(repo_path, extensions, excludes, max_files)
+
+    contents = []
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            contents.append((file_path, get_language_from_extension(str(file_path)), f.read()))
+
+    start = time.perf_counter()
+    legacy = [summarize(*legacy_count_tokens(content, language)) for _, language, content in contents]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tokenized = [summarize(*get_halstead_tokenizer(language).count_tokens(content))
+                 for _, language, content in contents]
+    tokenizer_time = time.perf_counter() - start
+
+    failures = 0
+    volume_ratios = []
+    for (file_path, _, _), old, new in zip(contents, legacy, tokenized):
+        if new[2] > old[2] or new[3] > old[3]:
+            failures += 1
+            print(f"FAIL {file_path}: tokenizer counts {new} exceed previous engine {old}")
+        if volume(old) > 0:
+            volume_ratios.append(volume(new) / volume(old))
+
+    print(f"Compared {len(contents)} files")
+    if volume_ratios:
+        print(f"Volume tokenizer/previous: median {statistics.median(volume_ratios):.2f}, "
+              f"min {min(volume_ratios):.2f}, max {max(volume_ratios):.2f}")
+    print(f"Previous engine: {legacy_time:.3f}s, tokenizer: {tokenizer_time:.3f}s "
+          f"({legacy_time / max(tokenizer_time, 1e-9):.1f}x faster)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regression suite for the Halstead tokenizer')
+    parser.add_argument('--repo-path', default=None,
+                        help='Also compare both engines over the files of this repository')
+    parser.add_argument('--max-files', type=int, default=500,
+                        help='Maximum number of files to compare (0 for unlimited)')
+    args = parser.parse_args()
+
+    failures = run_golden_cases()
+    if args.repo_path:
+        failures += run_comparison(args.repo_path, args.max_files)
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
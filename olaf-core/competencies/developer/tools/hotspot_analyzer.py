@@ -10,18 +10,186 @@ Based on PowerShell identify-complexity-hotspots.ps1 from OLAF toolkit.
 
 import os
 import re
+import json
+import math
+import time
+import hashlib
+import itertools
 import subprocess
+import tempfile
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 import sys
 from pathlib import Path
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, NamedTuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, NamedTuple
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+try:
+    from file_metrics_cache import FileMetricsCache, make_cache_dir
+except ImportError:  # Copies of this tool shipped without the onboarding file cache
+    FileMetricsCache = None
+
+    def make_cache_dir(cache_dir: Path) -> None:
+        """Create a cache directory and keep its contents out of git (see file_metrics_cache)."""
+        if cache_dir.is_dir() and cache_dir.name != '.olaf-cache':
+            return
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        gitignore = cache_dir / '.gitignore'
+        if not gitignore.exists():
+            gitignore.write_text('*\n', encoding='utf-8')
+
+
+# Prefix marking the header line of each commit in the streamed git log output.
+# Numstat lines always start with a digit or '-', so they can never collide.
+COMMIT_MARKER = '\x1e'
+
+# Bump whenever the layout of the on-disk history cache changes
+HISTORY_CACHE_VERSION = 2
+
+# Namespace of the per-file [line count, conditional breakdown] in the file metrics cache
+CONDITIONALS_CACHE_NAMESPACE = 'hotspot-conditionals-v2'
+
+# Scoring modes: raw change counts, or changes weighted by recency and churn
+SCORING_MODES = ('recency', 'frequency')
+
+# Complexity indicators (simplified cyclomatic complexity), grouped by category.
+# Each entry is (group name, category, pattern). Patterns use [ \t] instead of
+# \s so a match never spans lines when the whole file is scanned at once, and
+# lookaheads keep 'else if' and ternaries from swallowing the tokens after them.
+# Like the per-line scan this replaced, a line counts at most one ternary (the
+# last '?' with a ':' after it), so a regex '(?:', an optional 'x?:' member or a
+# nested ternary does not raise the count beyond what that scan reported.
+COMPLEXITY_INDICATORS = [
+    ('else_if', 'branches', r'else[ \t]+(?=if)'),         # else if
+    ('else_block', 'branches', r'else[ \t]*{'),           # else blocks
+    ('if_stmt', 'branches', r'if[ \t]*\('),               # if statements
+    ('switch_stmt', 'branches', r'switch[ \t]*\('),       # switch statements
+    ('case_label', 'branches', r'case[ \t]+[^:\n]*:'),    # case statements
+    ('ternary', 'branches', r'\?(?![^\n]*\?[^\n]*:)(?=[^\n]*:)'),  # ternary operators
+    ('for_loop', 'loops', r'for[ \t]*\('),                # for loops
+    ('while_loop', 'loops', r'while[ \t]*\('),            # while loops
+    ('do_loop', 'loops', r'do[ \t]*{'),                   # do-while loops
+    ('logical_and', 'boolean_operators', r'&&'),          # logical AND
+    ('logical_or', 'boolean_operators', r'\|\|'),         # logical OR
+    ('catch_block', 'exception_handlers', r'catch[ \t]*\('),    # exception handling
+    ('except_block', 'exception_handlers', r'except[ \t]*:'),   # Python exception handling
+    ('finally_block', 'exception_handlers', r'finally[ \t]*:'), # finally blocks
+]
+
+# The leading lookahead lists every indicator's first character, letting the
+# scanner reject most positions without trying each alternative in turn.
+COMPLEXITY_SCANNER = re.compile(
+    '(?=[eiscfwd?&|])(?:'
+    + '|'.join(f'(?P<{name}>{pattern})' for name, _, pattern in COMPLEXITY_INDICATORS)
+    + ')',
+    re.IGNORECASE
+)
+
+INDICATOR_CATEGORIES = {name: category for name, category, _ in COMPLEXITY_INDICATORS}
+
+
+class FileChange(NamedTuple):
+    """Represents the lines touched in a single file by a single commit."""
+    path: str
+    lines_added: int
+    lines_deleted: int
+    old_path: Optional[str] = None  # Set when the commit renamed the file
+
+
+class CommitRecord(NamedTuple):
+    """Represents one commit parsed from the git log stream."""
+    sha: str
+    timestamp: int
+    author: str
+    changes: List[FileChange]
+
+
+class FileChangeStats:
+    """Accumulates change history for a single file.
+
+    Besides raw totals, each change is weighted by ``decay`` (the commit's
+    exponential time-decay factor, 1.0 for a commit made right now):
+
+    - ``weighted_changes``: sum of decay, a recency-weighted change count
+    - ``weighted_churn``: sum of decay x lines added and deleted
+    - ``weighted_activity``: sum of decay x log2(2 + lines churned), the
+      scoring basis; the log keeps mass edits from drowning out everything else
+    """
+
+    __slots__ = (
+        'change_count', 'lines_added', 'lines_deleted', 'authors',
+        'weighted_changes', 'weighted_churn', 'weighted_activity'
+    )
+
+    def __init__(self, change_count: int = 0):
+        self.change_count = change_count
+        self.lines_added = 0
+        self.lines_deleted = 0
+        self.authors: Set[str] = set()
+        self.weighted_changes = float(change_count)
+        self.weighted_churn = 0.0
+        self.weighted_activity = float(change_count)
+
+    def record(self, commit: CommitRecord, change: FileChange, decay: float = 1.0) -> None:
+        """Fold one commit's change to this file into the running totals."""
+        churn = change.lines_added + change.lines_deleted
+        self.change_count += 1
+        self.lines_added += change.lines_added
+        self.lines_deleted += change.lines_deleted
+        self.authors.add(commit.author)
+        self.weighted_changes += decay
+        self.weighted_churn += decay * churn
+        self.weighted_activity += decay * math.log2(2 + churn)
+
+
+class ConditionalBreakdown(NamedTuple):
+    """Counts of complexity indicators in a file, per category."""
+    branches: int = 0
+    loops: int = 0
+    boolean_operators: int = 0
+    exception_handlers: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.branches + self.loops + self.boolean_operators + self.exception_handlers
+
+
+def scan_conditionals(content: str) -> ConditionalBreakdown:
+    """Count complexity indicators with a single pass over the file buffer."""
+    counts = dict.fromkeys(ConditionalBreakdown._fields, 0)
+    indicator_counts = Counter(match.lastgroup for match in COMPLEXITY_SCANNER.finditer(content))
+    for name, count in indicator_counts.items():
+        counts[INDICATOR_CATEGORIES[name]] += count
+    return ConditionalBreakdown(**counts)
+
+
+def count_lines(content: str) -> int:
+    """Count lines the way readlines() would, without splitting the buffer."""
+    if not content:
+        return 0
+    return content.count('\n') + (0 if content.endswith('\n') else 1)
+
+
+def read_file_conditionals(file_path: str) -> Tuple[int, ConditionalBreakdown]:
+    """Count lines and per-category complexity indicators for a single file.
+
+    Kept at module level so it can be dispatched to process pool workers.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except (IOError, UnicodeDecodeError) as e:
+        logger.warning(f"Could not read {file_path}: {e}")
+        return 0, ConditionalBreakdown()
+    
+    return count_lines(content), scan_conditionals(content)
+
 
 class FileHotspot(NamedTuple):
     """Represents a code hotspot with change frequency and complexity metrics."""
@@ -31,22 +199,138 @@ class FileHotspot(NamedTuple):
     conditional_count: int
     conditional_density: float
     complexity_score: float
+    lines_added: int = 0
+    lines_deleted: int = 0
+    author_count: int = 0
+    conditional_breakdown: ConditionalBreakdown = ConditionalBreakdown()
+    recency_weighted_frequency: float = 0.0
+    weighted_churn: float = 0.0
+
+
+class CouplingPair(NamedTuple):
+    """Represents two files that tend to change in the same commits."""
+    file_a: str
+    file_b: str
+    shared_changes: int
+    coupling_degree: float  # shared changes / average changes of the two files, in %
+
+
+class ChangeCouplingAnalyzer:
+    """Counts how often pairs of files change together (logical coupling).
+
+    Pair counts live in a sparse dict keyed by (file_a, file_b). Commits
+    touching more than ``max_files_per_commit`` files (mass reformats,
+    vendoring, license headers) are skipped, since they would add O(n^2)
+    pairs that carry no design signal. When the dict grows past
+    ``max_pairs`` the rarest pairs are evicted (lossy counting), which
+    keeps memory fixed however long the history is; surviving counts may
+    undercount pairs that were evicted and later reappeared.
+    """
+
+    def __init__(self, max_files_per_commit: int = 50, max_pairs: int = 500000):
+        self.max_files_per_commit = max_files_per_commit
+        self.max_pairs = max_pairs
+        self.pair_counts: Dict[Tuple[str, str], int] = {}
+        self.file_changes: Counter = Counter()
+        self.commits_counted = 0
+        self.commits_skipped = 0
+        self.prune_floor = 0
+
+    def add_commit(self, file_paths: Iterable[str]) -> None:
+        """Record the set of files changed by one commit."""
+        files = sorted(set(file_paths))
+        if len(files) < 2:
+            self.file_changes.update(files)
+            return
+        if len(files) > self.max_files_per_commit:
+            self.commits_skipped += 1
+            return
+
+        self.commits_counted += 1
+        self.file_changes.update(files)
+        pair_counts = self.pair_counts
+        for i, file_a in enumerate(files):
+            for file_b in files[i + 1:]:
+                key = (file_a, file_b)
+                pair_counts[key] = pair_counts.get(key, 0) + 1
+
+        if len(pair_counts) > self.max_pairs:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Evict the rarest pairs until the dict is back under half its budget."""
+        target = self.max_pairs // 2
+        count_histogram = Counter(self.pair_counts.values())
+        remaining = len(self.pair_counts)
+        threshold = 0
+        while remaining > target:
+            threshold += 1
+            remaining -= count_histogram[threshold]
+
+        self.pair_counts = {
+            key: count for key, count in self.pair_counts.items() if count > threshold
+        }
+        self.prune_floor = max(self.prune_floor, threshold)
+        logger.debug(f"Pruned change-coupling pairs with {threshold} or fewer shared changes")
+
+    def top_pairs(self, limit: int = 20, min_shared_changes: int = 2,
+                  keep=None) -> List[CouplingPair]:
+        """Get the most strongly coupled pairs, strongest first.
+
+        ``keep`` is an optional predicate on a file path, e.g. to drop files
+        that no longer exist.
+        """
+        pairs = []
+        for (file_a, file_b), shared in self.pair_counts.items():
+            if shared < min_shared_changes:
+                continue
+            average_changes = (self.file_changes[file_a] + self.file_changes[file_b]) / 2
+            pairs.append(CouplingPair(
+                file_a=file_a,
+                file_b=file_b,
+                shared_changes=shared,
+                coupling_degree=round(shared / average_changes * 100, 1)
+            ))
+
+        pairs.sort(key=lambda p: (-p.coupling_degree, -p.shared_changes, p.file_a, p.file_b))
+        if keep is not None:
+            pairs = (p for p in pairs if keep(p.file_a) and keep(p.file_b))
+        return list(itertools.islice(pairs, limit))
 
 
 class HotspotAnalyzer:
     """Analyzes code hotspots by combining Git history and complexity metrics."""
     
-    def __init__(self, repo_path: str, output_file: str = None, months_to_analyze: int = 12):
+    def __init__(self, repo_path: str, output_file: str = None, months_to_analyze: int = 12,
+                 cache_dir: str = None, use_cache: bool = True, workers: int = 1, top: int = 50,
+                 scoring: str = 'recency', half_life_days: float = 90.0,
+                 max_coupling_files: int = 50, coupling_json: str = None):
         self.repo_path = Path(repo_path).resolve()
         self.output_file = output_file or self.repo_path / "complexity-hotspots.md"
         self.months_to_analyze = months_to_analyze
+        self.cache_dir = Path(cache_dir) if cache_dir else self.repo_path / '.olaf-cache'
+        self.use_cache = use_cache
+        self.file_metrics_cache = (FileMetricsCache(self.repo_path, self.cache_dir)
+                                   if FileMetricsCache and use_cache else None)
+        # Absolute path -> (line count, breakdown), filled by callers that already read the files
+        self.file_conditionals: Dict[str, Tuple[int, ConditionalBreakdown]] = {}
+        self.path_aliases: Dict[str, str] = {}
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.top = top
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {scoring}")
+        self.scoring = scoring
+        self.half_life_days = half_life_days
+        self.max_coupling_files = max_coupling_files
+        self.coupling_json = coupling_json
+        self.change_coupling = ChangeCouplingAnalyzer(max_coupling_files)
         self.file_extensions = [
             '.cs', '.java', '.js', '.jsx', '.ts', '.tsx', '.py', '.rb', 
             '.php', '.go', '.rs', '.cpp', '.c', '.h', '.hpp'
         ]
         self.exclude_patterns = [
             'node_modules', 'dist', 'bin', 'obj', 'build', 'target', 
-            'vendor', 'packages', '.git', '__pycache__', '.pytest_cache'
+            'vendor', 'packages', '.git', '__pycache__', '.pytest_cache', '.olaf-cache'
         ]
         
     def is_git_repository(self) -> bool:
@@ -70,11 +354,142 @@ class HotspotAnalyzer:
         extension = self.get_file_extension(file_path)
         return extension in self.file_extensions
     
-    def get_git_changed_files(self) -> Dict[str, int]:
-        """Get frequently changed files from Git history."""
+    def iter_git_log(self, revision_args: Iterable[str]) -> Iterator[CommitRecord]:
+        """Stream commits with their numstat from git log, one record at a time.
+
+        Output is read incrementally from a pipe, so memory use is bounded by
+        the largest single commit rather than by the size of the history.
+        """
+        cmd = [
+            'git', '-c', 'core.quotepath=off', 'log', *revision_args,
+            '--numstat', '--find-renames',
+            f'--pretty=format:{COMMIT_MARKER}%H%x09%at%x09%aN'
+        ]
+
+        # stderr goes to a temporary file rather than a pipe: git would block on a
+        # full stderr pipe while stdout is still being read here
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8', errors='replace') as stderr_file:
+            process = subprocess.Popen(
+                cmd,
+                cwd=self.repo_path,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True,
+                encoding='utf-8',
+                errors='replace'
+            )
+
+            try:
+                header = None
+                changes: List[FileChange] = []
+
+                for line in process.stdout:
+                    line = line.rstrip('\n')
+
+                    if line.startswith(COMMIT_MARKER):
+                        if header:
+                            yield CommitRecord(*header, changes)
+                        sha, timestamp, author = line[len(COMMIT_MARKER):].split('\t', 2)
+                        header = (sha, int(timestamp), author)
+                        changes = []
+                    elif line:
+                        change = self._parse_numstat_line(line)
+                        if change:
+                            changes.append(change)
+
+                if header:
+                    yield CommitRecord(*header, changes)
+
+                if process.wait() != 0:
+                    stderr_file.seek(0)
+                    raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr_file.read())
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+
+    @staticmethod
+    def _parse_numstat_line(line: str) -> Optional[FileChange]:
+        """Parse a tab-separated '<added> <deleted> <path>' numstat line."""
+        parts = line.split('\t', 2)
+        if len(parts) != 3:
+            return None
+
+        added, deleted, path = parts
+        old_path, path = HotspotAnalyzer._split_rename(path)
+        # Binary files report '-' for both counts. Paths are interned since the
+        # same few thousand strings recur across every commit and coupling pair.
+        return FileChange(
+            path=sys.intern(path),
+            lines_added=int(added) if added.isdigit() else 0,
+            lines_deleted=int(deleted) if deleted.isdigit() else 0,
+            old_path=old_path
+        )
+
+    @staticmethod
+    def _split_rename(path: str) -> Tuple[Optional[str], str]:
+        """Split numstat rename notation into (old path, new path).
+
+        Git prints renames either as 'old => new' or, when the paths share a
+        prefix or suffix, as 'dir/{old => new}/file'. Either side of the
+        braces may be empty, e.g. 'src/{ => core}/main.py'.
+        """
+        if ' => ' not in path:
+            return None, path
+
+        brace_start = path.find('{')
+        brace_end = path.find('}', brace_start + 1)
+        if brace_start != -1 and brace_end != -1 and ' => ' in path[brace_start:brace_end]:
+            prefix, suffix = path[:brace_start], path[brace_end + 1:]
+            old_part, new_part = path[brace_start + 1:brace_end].split(' => ', 1)
+            old_path = prefix + old_part + suffix
+            new_path = prefix + new_part + suffix
+        else:
+            old_path, new_path = path.split(' => ', 1)
+
+        # Collapse the doubled separator an empty brace side leaves behind
+        return (
+            re.sub(r'/{2,}', '/', old_path).lstrip('/'),
+            re.sub(r'/{2,}', '/', new_path).lstrip('/')
+        )
+
+    @staticmethod
+    def resolve_renames(commits: Iterable[CommitRecord],
+                        path_aliases: Dict[str, str]) -> Iterator[CommitRecord]:
+        """Rewrite every change onto the file's current path.
+
+        Commits must arrive newest first, as git log emits them: once a rename
+        is seen, every older change made under the old path is merged onto
+        the new one. ``path_aliases`` (old path -> current path) is updated in
+        place so callers can keep it across runs.
+        """
+        for commit in commits:
+            changes = []
+            for change in commit.changes:
+                path = path_aliases.get(change.path, change.path)
+                if change.old_path and change.old_path != path:
+                    path_aliases[change.old_path] = path
+                changes.append(FileChange(path, change.lines_added, change.lines_deleted))
+            yield commit._replace(changes=changes)
+
+    def get_decay_factor(self, age_seconds: float) -> float:
+        """Exponential time decay: a change loses half its weight every half-life."""
+        if self.half_life_days <= 0:
+            return 1.0
+        return 0.5 ** (max(age_seconds, 0) / (self.half_life_days * 86400))
+
+    def get_activity(self, stats: FileChangeStats) -> float:
+        """Change activity that feeds the score for the selected scoring mode."""
+        if self.scoring == 'frequency':
+            return stats.change_count
+        return stats.weighted_activity
+
+    def get_git_file_history(self) -> Dict[str, FileChangeStats]:
+        """Get per-file change counts, churn and authors from Git history."""
         if not self.is_git_repository():
             logger.warning("Not a Git repository, will analyze all source files")
-            return self._get_all_source_files()
+            return self._get_all_source_file_history()
         
         # Calculate date for git log
         since_date = datetime.now() - timedelta(days=30 * self.months_to_analyze)
@@ -83,40 +498,218 @@ class HotspotAnalyzer:
         logger.info(f"Analyzing Git history since {since_str}")
         
         try:
-            # Get changed files from git log
-            cmd = [
-                'git', 'log', f'--since={since_str}', 
-                '--name-only', '--pretty=format:'
-            ]
-            
-            result = subprocess.run(
-                cmd, 
-                cwd=self.repo_path, 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            
-            # Process git log output
-            changed_files = {}
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if line and self.is_source_file(line):
-                    changed_files[line] = changed_files.get(line, 0) + 1
+            if self.use_cache:
+                commits = self.refresh_history_cache(since_str)
+            else:
+                self.path_aliases = {}
+                commits = self.resolve_renames(
+                    self.iter_git_log([f'--since={since_str}']), self.path_aliases
+                )
+
+            file_history: Dict[str, FileChangeStats] = {}
+            commit_count = 0
+            now = time.time()
+            self.change_coupling = ChangeCouplingAnalyzer(self.max_coupling_files)
+
+            for commit in commits:
+                commit_count += 1
+                decay = self.get_decay_factor(now - commit.timestamp)
+                source_paths = []
+                for change in commit.changes:
+                    if not self.is_source_file(change.path):
+                        continue
+                    stats = file_history.get(change.path)
+                    if stats is None:
+                        stats = file_history[change.path] = FileChangeStats()
+                    stats.record(commit, change, decay)
+                    source_paths.append(change.path)
+                self.change_coupling.add_commit(source_paths)
             
-            if not changed_files:
+            if not file_history:
                 logger.warning("No Git history found, analyzing all source files")
-                return self._get_all_source_files()
+                return self._get_all_source_file_history()
             
-            logger.info(f"Found {len(changed_files)} changed files in Git history")
-            return changed_files
+            logger.info(f"Found {len(file_history)} changed files in {commit_count} commits")
+            return file_history
             
         except subprocess.CalledProcessError as e:
             logger.error(f"Git command failed: {e}")
-            return self._get_all_source_files()
+            return self._get_all_source_file_history()
         except FileNotFoundError:
             logger.error("Git not found in PATH")
-            return self._get_all_source_files()
+            return self._get_all_source_file_history()
+
+    def _run_git(self, args: List[str]) -> subprocess.CompletedProcess:
+        """Run a short git command in the repository."""
+        return subprocess.run(
+            ['git', *args],
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True,
+            check=False
+        )
+
+    def get_history_cache_path(self) -> Path:
+        """Get the cache file for this repository, keyed by its absolute path."""
+        repo_key = hashlib.sha1(str(self.repo_path).encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / f"hotspot-history-{repo_key}.json"
+
+    def _history_cache_filters(self) -> Dict[str, List[str]]:
+        """Describe the file filters that shaped the cached commit buckets."""
+        return {
+            'file_extensions': sorted(self.file_extensions),
+            'exclude_patterns': sorted(self.exclude_patterns)
+        }
+
+    def _load_history_cache(self) -> Optional[Dict]:
+        """Load the history cache, ignoring missing, corrupt or stale files."""
+        cache_path = self.get_history_cache_path()
+        if not cache_path.exists():
+            return None
+
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (IOError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable history cache {cache_path}: {e}")
+            return None
+
+        if cache.get('version') != HISTORY_CACHE_VERSION:
+            return None
+        if cache.get('filters') != self._history_cache_filters():
+            logger.info("File filters changed since last run, rebuilding history cache")
+            return None
+        return cache
+
+    def _save_history_cache(self, head_sha: str, since_timestamp: int,
+                            commits: List[CommitRecord], path_aliases: Dict[str, str]) -> None:
+        """Atomically write the commit buckets and the processed HEAD to disk."""
+        cache = {
+            'version': HISTORY_CACHE_VERSION,
+            'repo_path': str(self.repo_path),
+            'head': head_sha,
+            'since': since_timestamp,
+            'filters': self._history_cache_filters(),
+            # Old path -> path as of 'head'; cached buckets already use the latter
+            'aliases': path_aliases,
+            # Each bucket: [sha, timestamp, author, [[path, added, deleted], ...]]
+            'commits': [
+                [c.sha, c.timestamp, c.author,
+                 [[change.path, change.lines_added, change.lines_deleted] for change in c.changes]]
+                for c in commits
+            ]
+        }
+
+        cache_path = self.get_history_cache_path()
+        tmp_path = cache_path.with_suffix('.tmp')
+        try:
+            make_cache_dir(cache_path.parent)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, separators=(',', ':'))
+            os.replace(tmp_path, cache_path)
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not write history cache {cache_path}: {e}")
+
+    def _keep_source_changes(self, commits: Iterable[CommitRecord]) -> Iterator[CommitRecord]:
+        """Drop non-source paths so cached buckets only hold what gets scored.
+
+        Apply after resolve_renames so a file renamed into a source
+        extension keeps its earlier history.
+        """
+        for commit in commits:
+            changes = [change for change in commit.changes if self.is_source_file(change.path)]
+            if changes:
+                yield commit._replace(changes=changes)
+
+    def refresh_history_cache(self, since_str: str) -> List[CommitRecord]:
+        """Return the commits in the analysis window, parsing only new history.
+
+        Commits already recorded in the cache are reused; only
+        ``<cached HEAD>..HEAD`` is read from git, and commits that fell out
+        of the ``months_to_analyze`` window are aged out before saving.
+        Cached changes are stored under their current path, and the rename
+        alias map is persisted with them so renames found in new commits
+        only need to be applied on top.
+        """
+        head_result = self._run_git(['rev-parse', 'HEAD'])
+        if head_result.returncode != 0:
+            raise subprocess.CalledProcessError(
+                head_result.returncode, head_result.args, stderr=head_result.stderr
+            )
+        head_sha = head_result.stdout.strip()
+        since_timestamp = int(datetime.strptime(since_str, '%Y-%m-%d').timestamp())
+
+        cache = self._load_history_cache()
+        if cache and cache['since'] > since_timestamp:
+            logger.info("Analysis window grew since last run, rebuilding history cache")
+            cache = None
+        if cache and cache['head'] != head_sha:
+            # A rewritten history (rebase, force-push) invalidates the buckets
+            ancestor = self._run_git(['merge-base', '--is-ancestor', cache['head'], head_sha])
+            if ancestor.returncode != 0:
+                logger.info("Cached HEAD is no longer in history, rebuilding history cache")
+                cache = None
+
+        if cache:
+            commits = [
+                CommitRecord(sha, timestamp, author, [FileChange(*change) for change in changes])
+                for sha, timestamp, author, changes in cache['commits']
+                if timestamp >= since_timestamp
+            ]
+            aged_out = len(cache['commits']) - len(commits)
+            path_aliases = cache['aliases']
+
+            if cache['head'] == head_sha:
+                logger.info(f"History cache is up to date at {head_sha[:12]}")
+            else:
+                new_aliases: Dict[str, str] = {}
+                new_commits = list(self._keep_source_changes(self.resolve_renames(
+                    self.iter_git_log([f'--since={since_str}', f"{cache['head']}..{head_sha}"]),
+                    new_aliases
+                )))
+                logger.info(f"History cache: {len(new_commits)} new commits, {aged_out} aged out")
+
+                if new_aliases:
+                    # Every cached commit predates the new renames, so they apply as-is
+                    commits = [
+                        c._replace(changes=[
+                            change._replace(path=new_aliases.get(change.path, change.path))
+                            for change in c.changes
+                        ])
+                        for c in commits
+                    ]
+                    path_aliases = {
+                        old: new_aliases.get(current, current)
+                        for old, current in path_aliases.items()
+                    }
+                    path_aliases.update(new_aliases)
+
+                # git log lists newest first, keep the cache in the same order
+                commits = new_commits + commits
+        else:
+            path_aliases = {}
+            commits = list(self._keep_source_changes(self.resolve_renames(
+                self.iter_git_log([f'--since={since_str}', head_sha]), path_aliases
+            )))
+            logger.info(f"History cache built with {len(commits)} commits")
+
+        self._save_history_cache(head_sha, since_timestamp, commits, path_aliases)
+        self.path_aliases = path_aliases
+        return commits
+
+    def get_git_changed_files(self) -> Dict[str, int]:
+        """Get frequently changed files from Git history."""
+        return {
+            file_path: stats.change_count
+            for file_path, stats in self.get_git_file_history().items()
+        }
+
+    def _get_all_source_file_history(self) -> Dict[str, FileChangeStats]:
+        """Wrap the all-source-files fallback as change statistics."""
+        return {
+            file_path: FileChangeStats(change_count=weight)
+            for file_path, weight in self._get_all_source_files().items()
+        }
     
     def _get_all_source_files(self) -> Dict[str, int]:
         """Get all source files as fallback when Git history is unavailable."""
@@ -136,71 +729,85 @@ class HotspotAnalyzer:
     
     def analyze_file_complexity(self, file_path: Path) -> Tuple[int, int]:
         """Analyze complexity metrics for a single file."""
+        line_count, breakdown = self.analyze_file_conditionals(file_path)
+        return line_count, breakdown.total
+
+    def analyze_file_conditionals(self, file_path: Path) -> Tuple[int, ConditionalBreakdown]:
+        """Count lines and per-category complexity indicators for a single file."""
         if not file_path.exists():
-            return 0, 0
+            return 0, ConditionalBreakdown()
         
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.readlines()
-        except (IOError, UnicodeDecodeError) as e:
-            logger.warning(f"Could not read {file_path}: {e}")
-            return 0, 0
-        
-        if not content:
-            return 0, 0
-        
-        line_count = len(content)
-        conditional_count = 0
-        
-        # Complexity patterns (simplified cyclomatic complexity indicators)
-        complexity_patterns = [
-            r'if\s*\(',           # if statements
-            r'else\s*{',          # else blocks
-            r'else\s+if',         # else if
-            r'switch\s*\(',       # switch statements
-            r'case\s+[^:]*:',     # case statements
-            r'for\s*\(',          # for loops
-            r'while\s*\(',        # while loops
-            r'do\s*{',            # do-while loops
-            r'\?\s*.*\s*:',       # ternary operators
-            r'&&',                # logical AND
-            r'\|\|',              # logical OR
-            r'catch\s*\(',        # exception handling
-            r'except\s*:',        # Python exception handling
-            r'finally\s*:',       # finally blocks
-        ]
+        return read_file_conditionals(str(file_path))
+
+    def analyze_files_conditionals(self, file_paths: List[Path]) -> List[Tuple[int, ConditionalBreakdown]]:
+        """Analyze many files, in a process pool when more than one worker is set.
+
+        Files found in ``file_conditionals`` or unchanged since they were
+        cached are not reopened. Results are returned in the same order as
+        ``file_paths``.
+        """
+        cache = self.file_metrics_cache
+        cached = []
+        for file_path in file_paths:
+            hit = self.file_conditionals.get(str(file_path))
+            if hit is None and cache:
+                hit = cache.lookup(file_path, CONDITIONALS_CACHE_NAMESPACE)
+            cached.append(hit)
+        paths = [str(file_path) for file_path, hit in zip(file_paths, cached) if hit is None]
+        
+        if self.workers <= 1 or len(paths) <= 1:
+            computed = [read_file_conditionals(path) for path in paths]
+        else:
+            # A few chunks per worker balances load without per-file IPC overhead
+            chunksize = max(1, len(paths) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                computed = list(executor.map(read_file_conditionals, paths, chunksize=chunksize))
         
-        for line in content:
-            for pattern in complexity_patterns:
-                matches = len(re.findall(pattern, line, re.IGNORECASE))
-                conditional_count += matches
+        results = []
+        computed_iter = iter(computed)
+        for file_path, hit in zip(file_paths, cached):
+            if hit is None:
+                line_count, breakdown = next(computed_iter)
+                if cache:
+                    cache.store(file_path, CONDITIONALS_CACHE_NAMESPACE, [line_count, list(breakdown)])
+            else:
+                line_count, breakdown = hit[0], ConditionalBreakdown(*hit[1])
+            results.append((line_count, breakdown))
         
-        return line_count, conditional_count
+        if cache:
+            cache.save()
+        return results
     
     def analyze_hotspots(self) -> List[FileHotspot]:
         """Analyze code hotspots combining change frequency and complexity."""
-        changed_files = self.get_git_changed_files()
+        file_history = self.get_git_file_history()
         hotspots = []
         
-        # Analyze top changed files (limit to avoid excessive processing)
-        top_files = sorted(changed_files.items(), key=lambda x: x[1], reverse=True)[:50]
+        # Rank by change activity, breaking ties by path so the selection is stable
+        ranked_files = sorted(file_history.items(), key=lambda x: (-self.get_activity(x[1]), x[0]))
+        top_files = []
+        for file_path, stats in ranked_files:
+            if self.top > 0 and len(top_files) >= self.top:
+                break
+            if (self.repo_path / file_path).exists():
+                top_files.append((file_path, stats))
         
-        logger.info(f"Analyzing complexity for {len(top_files)} files")
+        logger.info(f"Analyzing complexity for {len(top_files)} files with {self.workers} worker(s)")
         
-        for file_path, change_frequency in top_files:
-            full_path = self.repo_path / file_path
-            
-            if not full_path.exists():
-                continue
-            
-            line_count, conditional_count = self.analyze_file_complexity(full_path)
+        file_metrics = self.analyze_files_conditionals(
+            [self.repo_path / file_path for file_path, _ in top_files]
+        )
+        
+        for (file_path, stats), (line_count, breakdown) in zip(top_files, file_metrics):
+            change_frequency = stats.change_count
+            conditional_count = breakdown.total
             
             if line_count == 0:
                 continue
             
             # Calculate metrics
             conditional_density = conditional_count / line_count if line_count > 0 else 0
-            complexity_score = change_frequency * conditional_density * 100
+            complexity_score = self.get_activity(stats) * conditional_density * 100
             
             hotspot = FileHotspot(
                 file_path=file_path,
@@ -208,19 +815,41 @@ class HotspotAnalyzer:
                 line_count=line_count,
                 conditional_count=conditional_count,
                 conditional_density=round(conditional_density, 3),
-                complexity_score=round(complexity_score, 1)
+                complexity_score=round(complexity_score, 1),
+                lines_added=stats.lines_added,
+                lines_deleted=stats.lines_deleted,
+                author_count=len(stats.authors),
+                conditional_breakdown=breakdown,
+                recency_weighted_frequency=round(stats.weighted_changes, 2),
+                weighted_churn=round(stats.weighted_churn, 1)
             )
             
             hotspots.append(hotspot)
         
-        # Sort by complexity score (highest first)
-        return sorted(hotspots, key=lambda x: x.complexity_score, reverse=True)
+        # Sort by complexity score (highest first), ties by path for stable output
+        return sorted(hotspots, key=lambda x: (-x.complexity_score, x.file_path))
     
-    def generate_report(self, hotspots: List[FileHotspot]) -> str:
+    def get_coupled_pairs(self, limit: int = 20) -> List[CouplingPair]:
+        """Get the most strongly coupled pairs of files that still exist."""
+        return self.change_coupling.top_pairs(
+            limit=limit, keep=lambda file_path: (self.repo_path / file_path).exists()
+        )
+
+    def generate_report(self, hotspots: List[FileHotspot],
+                        coupled_pairs: Optional[List[CouplingPair]] = None) -> str:
         """Generate comprehensive hotspot analysis report."""
         timestamp = datetime.now().strftime("%Y%m%d-%H%M")
         since_date = (datetime.now() - timedelta(days=30 * self.months_to_analyze)).strftime('%Y-%m-%d')
         
+        if self.scoring == 'frequency':
+            score_formula = "Change frequency × conditional density × 100"
+        else:
+            score_formula = (
+                "Recency- and churn-weighted change activity × conditional density × 100. "
+                f"Each change counts for 2^(-age / {self.half_life_days:g} days) × log2(2 + lines churned), "
+                "so recent and larger changes weigh more than old, trivial ones"
+            )
+        
         report = f"""# Complexity Hotspots Analysis
 
 Analysis performed on: {timestamp}  
@@ -238,12 +867,12 @@ This analysis identified {len(hotspots)} potential complexity hotspots by combin
 
 Files with high change frequency and complexity (top 20):
 
-| File | Change Frequency | Lines | Conditionals | Conditional Density | Complexity Score |
-|------|-----------------|-------|-------------|-------------------|----------------|
+| File | Change Frequency | Recency-Weighted Changes | Weighted Churn | Lines | Conditionals | Conditional Density | Complexity Score |
+|------|-----------------|--------------------------|----------------|-------|-------------|-------------------|----------------|
 """
         
         for hotspot in hotspots[:20]:
-            report += f"| {hotspot.file_path} | {hotspot.change_frequency} | {hotspot.line_count} | {hotspot.conditional_count} | {hotspot.conditional_density} | {hotspot.complexity_score} |\n"
+            report += f"| {hotspot.file_path} | {hotspot.change_frequency} | {hotspot.recency_weighted_frequency} | {hotspot.weighted_churn} | {hotspot.line_count} | {hotspot.conditional_count} | {hotspot.conditional_density} | {hotspot.complexity_score} |\n"
         
         # Calculate statistics
         if hotspots:
@@ -259,6 +888,21 @@ Files with high change frequency and complexity (top 20):
 - **Maximum Complexity Score**: {max_score}
 - **High-Risk Files** (>1.5x average): {high_risk_count}
 
+## Complexity Indicator Breakdown
+
+Conditional statements found in the analyzed files, by category:
+
+| Category | Count | % of Conditionals |
+|----------|-------|-------------------|
+"""
+            
+            total_conditionals = sum(h.conditional_count for h in hotspots)
+            for category in ConditionalBreakdown._fields:
+                count = sum(getattr(h.conditional_breakdown, category) for h in hotspots)
+                percent = round(count / total_conditionals * 100, 1) if total_conditionals > 0 else 0
+                report += f"| {category.replace('_', ' ').title()} | {count} | {percent}% |\n"
+            
+            report += f"""
 ## Risk Categories
 
 Based on complexity scores, files are categorized as:
@@ -280,6 +924,30 @@ Based on complexity scores, files are categorized as:
                 score_range = f"{round(min_score, 1)}-{round(max_score, 1) if max_score != float('inf') else '∞'}"
                 report += f"| {risk_level} | {score_range} | {count} | {recommendation} |\n"
         
+        coupling = self.change_coupling
+        report += f"""
+## Change Coupling
+
+Files that are frequently changed in the same commit, which often reveals hidden
+dependencies. Coupling degree is shared changes divided by the average number of
+changes of the two files. Commits touching more than {coupling.max_files_per_commit} source files
+were ignored ({coupling.commits_skipped} commits).
+"""
+        if coupling.prune_floor:
+            report += f"""To stay within the memory budget, pairs seen {coupling.prune_floor} time(s) or fewer were evicted
+along the way, so counts near that floor are approximate.
+"""
+        report += """
+"""
+        
+        if coupled_pairs:
+            report += "| File A | File B | Shared Changes | Coupling Degree |\n"
+            report += "|--------|--------|----------------|-----------------|\n"
+            for pair in coupled_pairs:
+                report += f"| {pair.file_a} | {pair.file_b} | {pair.shared_changes} | {pair.coupling_degree}% |\n"
+        else:
+            report += "No file pairs changed together often enough to be reported.\n"
+        
         report += f"""
 ## Analysis Methodology
 
@@ -287,7 +955,7 @@ This report identifies potential complexity hotspots by combining:
 
 1. **Change Frequency**: How often a file has been modified in the last {self.months_to_analyze} months
 2. **Conditional Density**: The ratio of conditional statements to total lines of code
-3. **Complexity Score**: Change frequency × conditional density × 100
+3. **Complexity Score**: {score_formula}
 
 Higher scores indicate files that are both frequently changed and complex, which may benefit from refactoring.
 
@@ -331,15 +999,23 @@ For files with **Critical** risk scores:
         
         critical_hotspots = [h for h in hotspots if h.complexity_score > (sum(h.complexity_score for h in hotspots) / len(hotspots) * 1.5)] if hotspots else []
         
+        previous_paths = defaultdict(list)
+        for old_path, current_path in self.path_aliases.items():
+            previous_paths[current_path].append(old_path)
+        
         if critical_hotspots:
             for hotspot in critical_hotspots[:10]:  # Top 10 critical
                 report += f"""
 **{hotspot.file_path}**
 - Complexity Score: {hotspot.complexity_score}
-- Changed {hotspot.change_frequency} times in {self.months_to_analyze} months
+- Changed {hotspot.change_frequency} times in {self.months_to_analyze} months by {hotspot.author_count} author(s)
+- Churn: +{hotspot.lines_added}/-{hotspot.lines_deleted} lines
 - {hotspot.line_count} lines with {hotspot.conditional_count} conditional statements
 - Conditional density: {hotspot.conditional_density}
+- Breakdown: {hotspot.conditional_breakdown.branches} branches, {hotspot.conditional_breakdown.loops} loops, {hotspot.conditional_breakdown.boolean_operators} boolean operators, {hotspot.conditional_breakdown.exception_handlers} exception handlers
 """
+                if previous_paths.get(hotspot.file_path):
+                    report += f"- Previously: {', '.join(sorted(previous_paths[hotspot.file_path]))}\n"
         else:
             report += "\nNo files identified as critical risk based on current thresholds.\n"
         
@@ -363,7 +1039,8 @@ For files with **Critical** risk scores:
         logger.info(f"Starting hotspot analysis of: {self.repo_path}")
         
         hotspots = self.analyze_hotspots()
-        report = self.generate_report(hotspots)
+        coupled_pairs = self.get_coupled_pairs()
+        report = self.generate_report(hotspots, coupled_pairs)
         
         # Save report
         output_path = Path(self.output_file)
@@ -372,7 +1049,23 @@ For files with **Critical** risk scores:
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(report)
         
+        # Save coupled pairs as JSON next to the report unless told otherwise
+        coupling_path = Path(self.coupling_json) if self.coupling_json else \
+            output_path.with_name(f"{output_path.stem}-coupling.json")
+        coupling_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(coupling_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'repository': str(self.repo_path),
+                'months_analyzed': self.months_to_analyze,
+                'max_files_per_commit': self.change_coupling.max_files_per_commit,
+                'commits_skipped': self.change_coupling.commits_skipped,
+                'prune_floor': self.change_coupling.prune_floor,
+                'pairs': [pair._asdict() for pair in coupled_pairs]
+            }, f, indent=2)
+        
         logger.info(f"Analysis complete. Report saved to: {output_path}")
+        logger.info(f"Change coupling saved to: {coupling_path}")
 
 
 def main():
@@ -381,6 +1074,22 @@ def main():
     parser.add_argument('repo_path', help='Path to Git repository')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
     parser.add_argument('-m', '--months', type=int, default=12, help='Months of history to analyze')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Directory for the history and file metrics caches (default: <repo>/.olaf-cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-read the full history window and every file without caching')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Worker processes for file complexity analysis (0 = all CPUs)')
+    parser.add_argument('--top', type=int, default=50,
+                        help='Number of most-changed files to analyze (0 = all changed files)')
+    parser.add_argument('--scoring', choices=SCORING_MODES, default='recency',
+                        help='Score raw change counts or recency/churn-weighted changes (default: recency)')
+    parser.add_argument('--half-life-days', type=float, default=90.0,
+                        help='Half-life of a change in recency scoring, in days (0 = no decay)')
+    parser.add_argument('--max-coupling-files', type=int, default=50,
+                        help='Ignore commits touching more source files than this in change coupling')
+    parser.add_argument('--coupling-json', default=None,
+                        help='Change coupling JSON output path (default: <report>-coupling.json)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -392,7 +1101,13 @@ def main():
         logger.error(f"Repository path does not exist: {args.repo_path}")
         sys.exit(1)
     
-    analyzer = HotspotAnalyzer(args.repo_path, args.output, args.months)
+    analyzer = HotspotAnalyzer(
+        args.repo_path, args.output, args.months,
+        cache_dir=args.cache_dir, use_cache=not args.no_cache,
+        workers=args.workers, top=args.top,
+        scoring=args.scoring, half_life_days=args.half_life_days,
+        max_coupling_files=args.max_coupling_files, coupling_json=args.coupling_json
+    )
     analyzer.run_analysis()
 
 
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+JSONL streaming of the Halstead metrics analyzer
+
+With --jsonl - the records are piped to other tools, so nothing but JSON may
+reach stdout, whichever process the line comes from.
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+
+FILES = {
+    'main.py': 'def main():\n    return 1 + 2\n',
+    'empty.py': '',
+    'blank.py': '\n\n',
+    'src/app.js': 'function app() {\n  return 2;\n}\n',
+}
+
+# Spawned workers start from a fresh interpreter and do not inherit the
+# parent's redirected stdout, unlike forked ones
+RUN_WITH_SPAWN = (
+    "import multiprocessing, sys\n"
+    "multiprocessing.set_start_method('spawn')\n"
+    f"sys.path.insert(0, {str(TOOLS_DIR)!r})\n"
+    "import analyze_halstead_metrics\n"
+    "sys.argv = ['analyze_halstead_metrics.py'] + sys.argv[1:]\n"
+    "analyze_halstead_metrics.main()\n"
+)
+
+
+class JsonlStdoutTest(unittest.TestCase):
+    """Streams records to stdout from a spawn process pool."""
+
+    def setUp(self):
+        self.repo_path = Path(tempfile.mkdtemp(prefix='halstead-fixture-'))
+        self.addCleanup(shutil.rmtree, self.repo_path)
+        for name, content in FILES.items():
+            file_path = self.repo_path / name
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(content, encoding='utf-8')
+
+    def test_stdout_is_only_json(self):
+        result = subprocess.run(
+            [sys.executable, '-c', RUN_WITH_SPAWN, '--repo-path', str(self.repo_path),
+             '--jsonl', '-', '-j', '2', '--exclude-patterns', 'node_modules'],
+            capture_output=True, text=True, timeout=120, check=True)
+        
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual(sorted(record['file'] for record in records),
+                         sorted(str(Path(name)) for name in FILES))
+        self.assertIn('empty.py', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ComplexityAnalyzer backends
+
+- python: compares the default AST backend, the opt-in indentation
+  heuristic and its previous version (re-created here with its per-function
+  line copies) on a generated corpus of Python modules, reporting run time and
+  peak memory.
+- brace: compares the lexer-based brace-language backend with the previous
+  raw per-line regex scan on a generated JavaScript file whose strings,
+  template literals and comments contain braces and keywords, reporting run
+  time and how many functions each one segments.
+"""
+
+import argparse
+import random
+import re
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from complexity_analyzer import ComplexityAnalyzer  # noqa: E402
+
+FUNCTION_BODIES = [
+    "    if value and not cached:\n        return compute(value)\n    return None\n",
+    "    for item in items:\n        if item.ready or force:\n            process(item)\n        elif item.failed:\n            retry(item)\n",
+    "    try:\n        return load(path)\n    except IOError:\n        return default\n    finally:\n        close(path)\n",
+    "    while queue:\n        item = queue.pop()\n        total += item.size if item else 0\n    return total\n",
+    "    return [x for x in values if x > limit and x != skip]\n",
+    "    # plain assignment\n    result = first + second\n    return result\n",
+]
+
+# Each body adds exactly one decision point; the literals must not count
+BRACE_FUNCTION_BODIES = [
+    "  if (value > limit) {\n    log(\"closing } early\");\n  }\n",
+    "  // while (true) { never runs\n  const label = value ? 'open {' : '';\n",
+    "  /* switch (mode) {\n     case 1: */\n  for (const item of items) { total += item; }\n",
+    "  const text = `row ${value} }`;\n  return value && text;\n",
+]
+
+LEGACY_BRACE_PATTERNS = [
+    r'if\s*\(', r'else\s+if', r'else\b', r'switch\s*\(', r'case\s+', r'for\s*\(',
+    r'foreach\s*\(', r'while\s*\(', r'do\s*{', r'\?\s*', r'\|\|', r'&&',
+    r'except\b', r'catch\b', r'finally\b',
+]
+
+
+def legacy_python_complexity(content):
+    """Count complexity the way the indentation heuristic did, line copies included."""
+    functions = []
+    indent_stack = []
+    for i, line in enumerate(content):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip())
+        func_match = re.match(r'def\s+(\w+)\s*\(', stripped)
+        if func_match:
+            indent_stack.append({'name': func_match.group(1), 'start_line': i + 1,
+                                 'lines': [], 'complexity': 1, 'indent_level': indent})
+        if indent_stack:
+            current_function = indent_stack[-1]
+            current_function['lines'].append(line)
+            if re.search(r'^\s*(?:if|elif|else|for|while|except|finally)\b', line):
+                current_function['complexity'] += 1
+            current_function['complexity'] += len(re.findall(r'\band\b', line)) + len(re.findall(r'\bor\b', line))
+            if i + 1 < len(content):
+                next_line = content[i + 1]
+                next_stripped = next_line.strip()
+                if next_stripped and not next_stripped.startswith('#'):
+                    if len(next_line) - len(next_line.lstrip()) <= current_function['indent_level']:
+                        functions.append(indent_stack.pop())
+            else:
+                functions.append(current_function)
+    return functions
+
+
+def legacy_brace_complexity(content, function_pattern):
+    """Segment functions the way the raw per-line scan did, line copies included."""
+    functions = []
+    current_function = None
+    brace_count = 0
+    for i, line in enumerate(content):
+        if current_function is None and re.search(function_pattern, line):
+            current_function = {'start_line': i + 1, 'lines': [], 'complexity': 1}
+            brace_count = 0
+        if current_function is not None:
+            current_function['lines'].append(line)
+            brace_count += line.count('{') - line.count('}')
+            for pattern in LEGACY_BRACE_PATTERNS:
+                current_function['complexity'] += len(re.findall(pattern, line))
+            if brace_count == 0 and '}' in line:
+                functions.append(current_function)
+                current_function = None
+    return functions
+
+
+def generate_brace_file(line_count: int, rng: random.Random) -> Tuple[str, int]:
+    """Generate a JavaScript file of about line_count lines and its function count."""
+    parts = []
+    lines = 0
+    functions = 0
+    while lines < line_count:
+        body = rng.choice(BRACE_FUNCTION_BODIES)
+        parts.append(f"function handler{functions}(value, items, limit) {{\n{body}}}\n\n")
+        lines += body.count('\n') + 3
+        functions += 1
+    return ''.join(parts), functions
+
+
+def generate_module(function_count: int, rng: random.Random) -> str:
+    """Generate one module with a mix of functions and methods."""
+    parts = []
+    for i in range(function_count):
+        body = rng.choice(FUNCTION_BODIES)
+        if i % 5 == 0:
+            parts.append(f"class Service{i}:\n")
+            parts.append(f"    def method_{i}(self, value, items, queue, path):\n")
+            parts.append(''.join('    ' + line + '\n' for line in body.splitlines()))
+        else:
+            parts.append(f"def function_{i}(value, items, queue, path):\n{body}")
+        parts.append("\n")
+    return ''.join(parts)
+
+
+def measure(label, func, modules, repeat):
+    """Time func over every module and record its peak allocation."""
+    elapsed = min(timeit.repeat(lambda: [func(module) for module in modules], number=1, repeat=repeat))
+
+    tracemalloc.start()
+    for module in modules:
+        func(module)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label}: {elapsed:.3f}s, peak {peak / 1024:.0f} KiB")
+    return elapsed
+
+
+def run_python_benchmark(args):
+    """Compare the Python backends."""
+    rng = random.Random(args.seed)
+    modules = [generate_module(args.functions, rng) for _ in range(args.modules)]
+    analyzer = ComplexityAnalyzer('.')
+
+    print(f"Python corpus: {args.modules} modules, {sum(module.count(chr(10)) for module in modules):,} lines")
+    measure('Previous indentation heuristic',
+            lambda source: legacy_python_complexity(source.splitlines(keepends=True)),
+            modules, args.repeat)
+    heuristic_time = measure('Indentation heuristic',
+                             lambda source: analyzer._analyze_python_complexity(source.splitlines(keepends=True)),
+                             modules, args.repeat)
+    ast_time = measure('AST backend', analyzer._analyze_python_ast, modules, args.repeat)
+    print(f"AST backend time relative to heuristic: {ast_time / heuristic_time:.1f}x")
+
+
+def run_brace_benchmark(args):
+    """Compare the brace-language backends."""
+    rng = random.Random(args.seed)
+    source, expected = generate_brace_file(args.lines, rng)
+    analyzer = ComplexityAnalyzer('.')
+    function_pattern = ComplexityAnalyzer.FUNCTION_PATTERNS['js']
+    lines = source.splitlines(keepends=True)
+
+    legacy_time = min(timeit.repeat(lambda: legacy_brace_complexity(lines, function_pattern),
+                                    number=1, repeat=args.repeat))
+    lexer_time = min(timeit.repeat(lambda: analyzer._analyze_brace_language_complexity(source, 'js'),
+                                   number=1, repeat=args.repeat))
+    legacy = legacy_brace_complexity(lines, function_pattern)
+    lexed = analyzer._analyze_brace_language_complexity(source, 'js')
+
+    print(f"JavaScript file: {len(lines):,} lines, {expected} functions of complexity 2")
+    print(f"Raw per-line scan: {legacy_time:.3f}s, {len(legacy)} functions, "
+          f"{sum(1 for func in legacy if func['complexity'] == 2)} with complexity 2")
+    print(f"Lexer backend:     {lexer_time:.3f}s, {len(lexed)} functions, "
+          f"{sum(1 for func in lexed if func.complexity == 2)} with complexity 2")
+    print(f"Speedup: {legacy_time / lexer_time:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ComplexityAnalyzer backends')
+    parser.add_argument('--backend', choices=['python', 'brace', 'all'], default='all',
+                        help='Backend to benchmark')
+    parser.add_argument('--modules', type=int, default=200, help='Generated Python modules')
+    parser.add_argument('--functions', type=int, default=200, help='Functions per Python module')
+    parser.add_argument('--lines', type=int, default=10000, help='Lines in the generated JavaScript file')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the corpus')
+    args = parser.parse_args()
+
+    if args.backend in ('python', 'all'):
+        run_python_benchmark(args)
+    if args.backend in ('brace', 'all'):
+        run_brace_benchmark(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the per-file metrics storage of RepoSizeMetricsCalculator
+
+Builds the metrics of a generated repository layout both as the previous
+list of FileMetrics tuples and as a FileMetricsTable, and reports the
+memory each one retains, the peak while building it, and the time taken
+to summarize it. Both summaries must be identical.
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from repo_size_metrics_calculator import FileMetrics, RepoSizeMetricsCalculator  # noqa: E402
+
+FILE_NAMES = ['index.js', 'README.md', '__init__.py', 'package.json', 'utils.ts', 'test_main.py']
+EXTENSIONS = ['.py', '.js', '.ts', '.md', '.json', '.png', '.txt', '.yaml']
+
+
+def generate_rows(file_count: int, rng: random.Random):
+    """Yield (path, size, lines, binary, category) rows of a layout with deep, shared directories."""
+    calculator = RepoSizeMetricsCalculator('.', use_cache=False)
+    directory = 'src'
+    for i in range(file_count):
+        if i % 20 == 0:
+            depth = rng.randint(2, 7)
+            directory = os.sep.join(f"module_{rng.randint(0, 50)}" for _ in range(depth))
+        if rng.random() < 0.3:
+            name = rng.choice(FILE_NAMES)
+        else:
+            name = f"component_{i}{rng.choice(EXTENSIONS)}"
+        path = f"{directory}{os.sep}{name}"
+        is_binary = name.endswith('.png')
+        size = rng.randint(10, 500000)
+        yield (path, size, 0 if is_binary else size // 40, is_binary,
+               calculator.get_file_category(Path(name)))
+
+
+def measure(label, build, summarize):
+    """Build a store, then report its retained and peak memory and the summary time."""
+    gc.collect()
+    tracemalloc.start()
+    store = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    summary = summarize(store)
+    elapsed = time.perf_counter() - start
+
+    print(f"{label}: retained {retained / (1024 * 1024):.1f} MiB, "
+          f"peak {peak / (1024 * 1024):.1f} MiB, summary {elapsed:.2f}s")
+    return retained, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-file metrics storage')
+    parser.add_argument('--files', type=int, default=500000, help='Number of generated files')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the layout')
+    args = parser.parse_args()
+
+    calculator = RepoSizeMetricsCalculator('.', use_cache=False)
+    calculator.get_git_repository_size = lambda: {}  # Only the file aggregation is measured
+
+    def summarize(store):
+        summary = calculator.summarize_file_metrics(store)
+        largest = [(row.path, row.size_bytes) for row in summary['largest_files']]
+        return summary['category_stats'], summary['total_size_bytes'], summary['total_lines'], largest
+
+    def build_tuples():
+        return [FileMetrics(*row) for row in generate_rows(args.files, random.Random(args.seed))]
+
+    def build_table():
+        table = calculator.new_table()
+        for row in generate_rows(args.files, random.Random(args.seed)):
+            table.append(*row)
+        return table
+
+    print(f"{args.files:,} files")
+    tuple_memory, tuple_summary = measure('List of FileMetrics', build_tuples, summarize)
+    table_memory, table_summary = measure('FileMetricsTable   ', build_table, summarize)
+    print(f"Memory reduction: {tuple_memory / table_memory:.1f}x")
+    print(f"Summaries identical: {tuple_summary == table_summary}")
+
+
+if __name__ == '__main__':
+    main()
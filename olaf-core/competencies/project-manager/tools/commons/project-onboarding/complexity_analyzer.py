@@ -10,18 +10,26 @@ Based on PowerShell analyze-cyclomatic-complexity.ps1 from OLAF toolkit.
 
 import os
 import re
+import ast
 import json
 import argparse
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, NamedTuple
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple, NamedTuple
 import logging
 
+from file_metrics_cache import CACHE_DIR_NAME, FileMetricsCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Namespace of the per-file function list in the file metrics cache
+COMPLEXITY_CACHE_NAMESPACE = 'complexity-v2'
+
 
 class FunctionComplexity(NamedTuple):
     """Represents complexity metrics for a function."""
@@ -33,6 +41,131 @@ class FunctionComplexity(NamedTuple):
     complexity_density: float
 
 
+# Python backends: exact McCabe complexity from the syntax tree, or the
+# indentation heuristic at about a third of the time and far less memory
+PYTHON_BACKENDS = ('ast', 'heuristic')
+
+# Brace languages whose comments and string literals are blanked before scanning
+LEXED_LANGUAGES = {'cs', 'java', 'js', 'ts', 'go', 'rs', 'cpp', 'c', 'php'}
+
+# Any character other than a newline, used to blank literals in place
+NON_NEWLINE = re.compile(r'[^\n]')
+
+
+@lru_cache(maxsize=None)
+def get_literal_pattern(language: str) -> 're.Pattern':
+    """Build the comment and string literal alternation for a brace language.
+    
+    Alternatives are tried leftmost-first at each position, so a quote inside
+    a comment or a comment marker inside a string is consumed by whichever
+    literal started first, which is what a character-by-character state
+    machine over the source would do.
+    """
+    alternatives = [
+        r'//[^\n]*',
+        r'/\*.*?(?:\*/|\Z)',
+        r'"(?:\\.|[^"\\\n])*"?',
+    ]
+    if language == 'cs':
+        alternatives.insert(0, r'@"(?:""|[^"])*"?')
+    if language == 'cpp':
+        alternatives.insert(0, r'R"([^(\s]*)\(.*?\)\1"')
+    if language == 'php':
+        alternatives.append(r'#[^\n]*')
+    
+    if language in ('js', 'ts', 'php'):
+        # Single-quoted strings of any length
+        alternatives.append(r"'(?:\\.|[^'\\\n])*'?")
+    else:
+        # Character literals only, so Rust lifetimes ('a) are left alone
+        alternatives.append(r"'(?:\\.[^'\n]*|[^'\\\n])'")
+    
+    if language in ('js', 'ts'):
+        # Template literals, including their ${...} substitutions
+        alternatives.append(r'`(?:\\.|[^`\\])*`')
+    elif language == 'go':
+        alternatives.append(r'`[^`]*`')
+    
+    # Every alternative starts with one of these characters
+    return re.compile(r'(?=[/"\'`@R#])(?:' + '|'.join(alternatives) + ')', re.DOTALL)
+
+
+def strip_comments_and_strings(source: str, language: str) -> str:
+    """Blank comments and string literals in one pass, keeping line breaks.
+    
+    The result has the same length and line numbering as the source, so
+    brace counting and keyword matching only ever see code.
+    """
+    return get_literal_pattern(language).sub(lambda m: NON_NEWLINE.sub(' ', m.group()), source)
+
+
+class PythonComplexityVisitor(ast.NodeVisitor):
+    """Computes McCabe complexity for every function in one walk of a Python AST.
+
+    Each function, method and nested function is reported separately under its
+    qualified name (``Class.method``, ``outer.inner``). Decision points count
+    towards the innermost enclosing function; lambdas and comprehensions count
+    towards the function they appear in. Code outside any function is ignored.
+    """
+    
+    def __init__(self):
+        self.functions: List[FunctionComplexity] = []
+        self._scopes: List[str] = []
+        self._complexity: List[int] = []
+    
+    def _add(self, amount: int = 1) -> None:
+        if self._complexity:
+            self._complexity[-1] += amount
+    
+    def _visit_scope(self, node: ast.AST) -> None:
+        self._scopes.append(node.name)
+        self.generic_visit(node)
+        self._scopes.pop()
+    
+    def _visit_function(self, node: ast.AST) -> None:
+        self._complexity.append(1)  # Base complexity
+        self._visit_scope(node)
+        complexity = self._complexity.pop()
+        
+        end_line = getattr(node, 'end_lineno', None) or max(
+            getattr(child, 'lineno', node.lineno) for child in ast.walk(node))
+        line_count = end_line - node.lineno + 1
+        
+        self.functions.append(FunctionComplexity(
+            name='.'.join(self._scopes + [node.name]),
+            start_line=node.lineno,
+            end_line=end_line,
+            line_count=line_count,
+            complexity=complexity,
+            complexity_density=round(complexity / line_count, 3)
+        ))
+    
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+    visit_ClassDef = _visit_scope
+    
+    def _visit_decision(self, node: ast.AST) -> None:
+        self._add()
+        self.generic_visit(node)
+    
+    # elif is a nested If, so it is counted by the same rule
+    visit_If = _visit_decision
+    visit_IfExp = _visit_decision
+    visit_For = _visit_decision
+    visit_AsyncFor = _visit_decision
+    visit_While = _visit_decision
+    visit_ExceptHandler = _visit_decision
+    visit_match_case = _visit_decision
+    
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        self._add(len(node.values) - 1)
+        self.generic_visit(node)
+    
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        self._add(1 + len(node.ifs))
+        self.generic_visit(node)
+
+
 class ComplexityAnalyzer:
     """Analyzes cyclomatic complexity for source code files."""
     
@@ -52,24 +185,28 @@ class ComplexityAnalyzer:
         'default': r'(?:function\s+)?(\w+)\s*\([^)]*\)\s*\{'
     }
     
-    # Complexity-increasing patterns (language-agnostic)
+    # Complexity-increasing patterns (language-agnostic). They are matched as
+    # one alternation, so 'else if' is a single decision point and the
+    # longer alternatives must come first.
     COMPLEXITY_PATTERNS = [
-        r'if\s*\(',
-        r'else\s+if',
-        r'else\b',
-        r'switch\s*\(',
-        r'case\s+',
-        r'for\s*\(',
-        r'foreach\s*\(',
-        r'while\s*\(',
-        r'do\s*{',
-        r'\?\s*',
+        r'\belse\s+if\b',
+        r'\belse\b',
+        r'\b(?:if|switch|for|foreach|while|catch)\s*\(',
+        r'\bcase\s',
+        r'\bdo\s*{',
+        r'\?\??(?![.:])',  # Not ?. chaining or TypeScript optional members
         r'\|\|',
         r'&&',
-        r'except\b',
-        r'catch\b',
-        r'finally\b'
+        r'\b(?:except|catch|finally)\b'
     ]
+    COMPLEXITY_SCANNER = re.compile('|'.join(COMPLEXITY_PATTERNS))
+    
+    # Control-flow keywords the C-family function patterns would mistake for names
+    NON_FUNCTION_NAMES = {
+        'if', 'else', 'for', 'foreach', 'while', 'do', 'switch', 'case', 'catch',
+        'return', 'using', 'lock', 'synchronized', 'fixed', 'sizeof', 'typeof',
+        'new', 'throw', 'await', 'match', 'loop'
+    }
     
     # File extensions to language mapping
     LANGUAGE_MAP = {
@@ -92,13 +229,21 @@ class ComplexityAnalyzer:
         '.hpp': 'cpp'
     }
     
-    def __init__(self, repo_path: str, output_file: str = None, complexity_threshold: int = 10):
+    def __init__(self, repo_path: str, output_file: str = None, complexity_threshold: int = 10,
+                 workers: int = 1, cache_dir: str = None, use_cache: bool = True,
+                 python_backend: str = 'ast'):
+        if python_backend not in PYTHON_BACKENDS:
+            raise ValueError(f"Unknown Python backend: {python_backend}")
+        self.python_backend = python_backend
         self.repo_path = Path(repo_path).resolve()
         self.output_file = output_file or self.repo_path / "cyclomatic-complexity.md"
         self.complexity_threshold = complexity_threshold
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
         self.exclude_patterns = [
             'node_modules', 'dist', 'bin', 'obj', 'build', 'target', 
-            'vendor', 'packages', '.git', '__pycache__', '.pytest_cache'
+            'vendor', 'packages', '.git', '__pycache__', '.pytest_cache', CACHE_DIR_NAME
         ]
         
     def should_exclude_file(self, file_path: Path) -> bool:
@@ -119,27 +264,67 @@ class ComplexityAnalyzer:
         
         return sorted(source_files)
     
-    def analyze_file_complexity(self, file_path: Path) -> List[FunctionComplexity]:
-        """Analyze cyclomatic complexity for a single file."""
+    def _read_source(self, file_path: Path) -> Optional[str]:
+        """Read a source file, or return None if it cannot be read."""
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.readlines()
+                return f.read()
         except (IOError, UnicodeDecodeError) as e:
             logger.warning(f"Could not read {file_path}: {e}")
-            return []
+            return None
+    
+    def analyze_file(self, file_path: Path) -> List[FunctionComplexity]:
+        """Analyze one file, falling back to file-level complexity if it has no functions.
         
-        if not content:
-            return []
+        The file is read once; both analyses work on the same buffer.
+        """
+        return self.analyze_file_source(file_path, self._read_source(file_path))
+    
+    def analyze_file_source(self, file_path: Path, source: Optional[str]) -> List[FunctionComplexity]:
+        """Analyze the already-read source of a file, with the file-level fallback."""
+        if not source:
+            return [FunctionComplexity("File_Level", 1, 1, 0, 0, 0.0)]
         
         language = self.LANGUAGE_MAP.get(file_path.suffix.lower(), 'default')
+        functions = self.analyze_source_complexity(source, language, file_path)
+        
+        # No functions found, use file-level complexity
+        return functions or [self._file_level_complexity(source, language)]
+    
+    def analyze_file_complexity(self, file_path: Path) -> List[FunctionComplexity]:
+        """Analyze cyclomatic complexity for a single file."""
+        source = self._read_source(file_path)
+        if not source:
+            return []
         
+        language = self.LANGUAGE_MAP.get(file_path.suffix.lower(), 'default')
+        return self.analyze_source_complexity(source, language, file_path)
+    
+    def analyze_source_complexity(self, source: str, language: str,
+                                  file_path: Path = None) -> List[FunctionComplexity]:
+        """Analyze cyclomatic complexity for source text in the given language."""
         if language == 'py':
-            return self._analyze_python_complexity(content)
+            if self.python_backend == 'ast':
+                try:
+                    return self._analyze_python_ast(source)
+                except (SyntaxError, ValueError, RecursionError) as e:
+                    logger.debug(f"Could not parse {file_path}, using indentation heuristic: {e}")
+            return self._analyze_python_complexity(source.splitlines(keepends=True))
         else:
-            return self._analyze_brace_language_complexity(content, language)
+            return self._analyze_brace_language_complexity(source, language)
+    
+    def _analyze_python_ast(self, source: str) -> List[FunctionComplexity]:
+        """Analyze Python files from their syntax tree (McCabe complexity per function)."""
+        visitor = PythonComplexityVisitor()
+        visitor.visit(ast.parse(source))
+        return sorted(visitor.functions, key=lambda func: func.start_line)
     
     def _analyze_python_complexity(self, content: List[str]) -> List[FunctionComplexity]:
-        """Analyze Python files using indentation-based parsing."""
+        """Analyze Python files using indentation-based parsing.
+        
+        Used for files the AST backend cannot parse, e.g. Python 2 sources,
+        and for every file with --backend heuristic.
+        """
         functions = []
         current_function = None
         indent_stack = []
@@ -163,7 +348,6 @@ class ComplexityAnalyzer:
                     'name': function_name,
                     'start_line': i + 1,
                     'end_line': 0,
-                    'lines': [],
                     'complexity': 1,  # Base complexity
                     'indent_level': indent
                 }
@@ -173,7 +357,6 @@ class ComplexityAnalyzer:
             # Process lines within functions
             if indent_stack:
                 current_function = indent_stack[-1]
-                current_function['lines'].append(line)
                 
                 # Count complexity-increasing constructs
                 if re.search(r'^\s*(?:if|elif|else|for|while|except|finally)\b', line):
@@ -224,13 +407,21 @@ class ComplexityAnalyzer:
         
         return functions
     
-    def _analyze_brace_language_complexity(self, content: List[str], language: str) -> List[FunctionComplexity]:
-        """Analyze brace-based languages (C, Java, JavaScript, etc.)."""
+    def _analyze_brace_language_complexity(self, source: str, language: str) -> List[FunctionComplexity]:
+        """Analyze brace-based languages (C, Java, JavaScript, etc.).
+        
+        Comments and string literals are blanked first, so braces and keywords
+        inside them neither end functions early nor add complexity.
+        """
         functions = []
         current_function = None
         brace_count = 0
         in_function = False
         
+        if language in LEXED_LANGUAGES:
+            source = strip_comments_and_strings(source, language)
+        content = source.split('\n')
+        
         function_pattern = self.FUNCTION_PATTERNS.get(language, self.FUNCTION_PATTERNS['default'])
         
         for i, line in enumerate(content):
@@ -248,29 +439,26 @@ class ComplexityAnalyzer:
                     if not function_name:
                         function_name = f"Anonymous_Function_Line_{i+1}"
                     
-                    current_function = {
-                        'name': function_name,
-                        'start_line': i + 1,
-                        'end_line': 0,
-                        'lines': [],
-                        'complexity': 1  # Base complexity
-                    }
-                    
-                    in_function = True
-                    brace_count = 0
+                    # Control-flow statements such as 'if (x) {' are not functions
+                    if function_name not in self.NON_FUNCTION_NAMES:
+                        current_function = {
+                            'name': function_name,
+                            'start_line': i + 1,
+                            'end_line': 0,
+                            'complexity': 1  # Base complexity
+                        }
+                        
+                        in_function = True
+                        brace_count = 0
             
             if in_function:
-                current_function['lines'].append(line)
-                
                 # Count braces
                 open_braces = line.count('{')
                 close_braces = line.count('}')
                 brace_count += open_braces - close_braces
                 
                 # Count complexity patterns
-                for pattern in self.COMPLEXITY_PATTERNS:
-                    matches = len(re.findall(pattern, line))
-                    current_function['complexity'] += matches
+                current_function['complexity'] += len(self.COMPLEXITY_SCANNER.findall(line))
                 
                 # Check if function has ended
                 if brace_count == 0 and '}' in line:
@@ -294,23 +482,21 @@ class ComplexityAnalyzer:
     
     def calculate_file_level_complexity(self, file_path: Path) -> FunctionComplexity:
         """Calculate file-level complexity if no functions found."""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.readlines()
-        except (IOError, UnicodeDecodeError):
-            return FunctionComplexity("File_Level", 1, 1, 0, 0, 0.0)
-        
-        if not content:
+        source = self._read_source(file_path)
+        if not source:
             return FunctionComplexity("File_Level", 1, 1, 0, 0, 0.0)
         
-        file_complexity = 1  # Base complexity
+        language = self.LANGUAGE_MAP.get(file_path.suffix.lower(), 'default')
+        return self._file_level_complexity(source, language)
+    
+    def _file_level_complexity(self, source: str, language: str) -> FunctionComplexity:
+        """Calculate file-level complexity from source text."""
+        if language in LEXED_LANGUAGES:
+            source = strip_comments_and_strings(source, language)
         
-        for line in content:
-            for pattern in self.COMPLEXITY_PATTERNS:
-                matches = len(re.findall(pattern, line))
-                file_complexity += matches
+        file_complexity = 1 + len(self.COMPLEXITY_SCANNER.findall(source))  # Base complexity
         
-        line_count = len(content)
+        line_count = len(source.splitlines())
         complexity_density = round(file_complexity / line_count, 3) if line_count > 0 else 0.0
         
         return FunctionComplexity(
@@ -322,30 +508,72 @@ class ComplexityAnalyzer:
             complexity_density=complexity_density
         )
     
-    def analyze_repository(self) -> Dict:
-        """Analyze entire repository for complexity."""
+    def _analyze_chunk(self, file_paths: List[Path]) -> List[List[FunctionComplexity]]:
+        """Analyze a batch of files; one work unit for the process pool."""
+        return [self.analyze_file(file_path) for file_path in file_paths]
+    
+    def _log_progress(self, files_done: int, total_files: int) -> None:
+        """Default progress callback: log roughly every tenth of the files."""
+        step = max(1, total_files // 10)
+        if files_done == total_files or files_done // step != (files_done - 1) // step:
+            logger.info(f"Analyzed {files_done}/{total_files} files")
+    
+    def analyze_repository(self, progress_callback: Callable[[int, int], None] = None) -> Dict:
+        """Analyze entire repository for complexity.
+        
+        Files unchanged since the previous run are taken from the file metrics
+        cache. The others are split into chunks that are analyzed in a process
+        pool when more than one worker is configured. progress_callback is
+        called with (files_done, total_files) as each chunk completes.
+        """
         logger.info(f"Analyzing repository: {self.repo_path}")
+        progress_callback = progress_callback or self._log_progress
         
         source_files = self.get_source_files()
-        logger.info(f"Found {len(source_files)} source files")
+        logger.info(f"Found {len(source_files)} source files, using {self.workers} worker(s)")
         
-        all_results = []
-        files_analyzed = 0
+        cache = FileMetricsCache(self.repo_path, self.cache_dir, self.use_cache)
+        # Python results depend on the backend, so each one has its own entries
+        cache_namespace = f"{COMPLEXITY_CACHE_NAMESPACE}-{self.python_backend}"
+        file_functions: Dict[Path, List[FunctionComplexity]] = {}
+        for file_path in source_files:
+            cached = cache.lookup(file_path, cache_namespace)
+            if cached is not None:
+                file_functions[file_path] = [FunctionComplexity(*func) for func in cached]
+        pending_files = [file_path for file_path in source_files if file_path not in file_functions]
+        
+        chunk_size = max(1, min(64, len(pending_files) // (self.workers * 4)))
+        chunks = [pending_files[i:i + chunk_size] for i in range(0, len(pending_files), chunk_size)]
+        files_done = len(file_functions)
+        
+        def collect(chunk: List[Path], results: List[List[FunctionComplexity]]) -> None:
+            nonlocal files_done
+            for file_path, functions in zip(chunk, results):
+                file_functions[file_path] = functions
+                cache.store(file_path, cache_namespace, [list(func) for func in functions])
+            files_done += len(chunk)
+            progress_callback(files_done, len(source_files))
+        
+        if self.workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                collect(chunk, self._analyze_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self._analyze_chunk, chunk): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    collect(futures[future], future.result())
+        cache.save()
         
+        return self.build_analysis_data(source_files, file_functions)
+    
+    def build_analysis_data(self, source_files: List[Path],
+                            file_functions: Dict[Path, List[FunctionComplexity]]) -> Dict:
+        """Flatten per-file function lists, in source_files order, into report rows."""
+        all_results = []
         for file_path in source_files:
-            files_analyzed += 1
-            if files_analyzed % 50 == 0:
-                logger.info(f"Analyzed {files_analyzed}/{len(source_files)} files")
-            
             relative_path = file_path.relative_to(self.repo_path)
-            functions = self.analyze_file_complexity(file_path)
-            
-            if not functions:
-                # No functions found, use file-level complexity
-                file_complexity = self.calculate_file_level_complexity(file_path)
-                functions = [file_complexity]
             
-            for func in functions:
+            for func in file_functions[file_path]:
                 all_results.append({
                     'file': str(relative_path),
                     'function': func.name,
@@ -486,9 +714,14 @@ This analysis provides approximate cyclomatic complexity. For more accurate resu
         
         return report
     
-    def run_analysis(self) -> None:
-        """Run complete complexity analysis."""
-        analysis_data = self.analyze_repository()
+    def run_analysis(self, analysis_data: Dict = None) -> None:
+        """Run complete complexity analysis.
+        
+        analysis_data may be supplied by a caller that already analyzed the
+        files (see onboarding_pipeline.py); otherwise the tree is walked.
+        """
+        if analysis_data is None:
+            analysis_data = self.analyze_repository()
         report = self.generate_report(analysis_data)
         
         # Save report
@@ -507,6 +740,14 @@ def main():
     parser.add_argument('repo_path', help='Path to repository')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
     parser.add_argument('-t', '--threshold', type=int, default=10, help='Complexity threshold')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='Worker processes for file analysis (0 = all CPUs)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Directory for the file metrics cache (default: <repo>/.olaf-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Reanalyze every file without caching')
+    parser.add_argument('--backend', choices=PYTHON_BACKENDS, default='ast',
+                        help='Python analysis: exact McCabe complexity from the syntax tree, or the '
+                             'indentation heuristic, about 3x faster (default: ast)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -518,7 +759,9 @@ def main():
         logger.error(f"Repository path does not exist: {args.repo_path}")
         sys.exit(1)
     
-    analyzer = ComplexityAnalyzer(args.repo_path, args.output, args.threshold)
+    analyzer = ComplexityAnalyzer(args.repo_path, args.output, args.threshold, args.workers,
+                                  cache_dir=args.cache_dir, use_cache=not args.no_cache,
+                                  python_backend=args.backend)
     analyzer.run_analysis()
 
 
@@ -5,26 +5,190 @@ Analyzes contributor patterns, bus factor, and knowledge distribution risks for
 """
 
 import argparse
+import hashlib
 import subprocess
+import tempfile
 import json
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from pathlib import Path
+from typing import NamedTuple, Tuple
 import re
 
+from file_metrics_cache import CACHE_DIR_NAME, make_cache_dir
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Bump whenever the layout of the on-disk cache changes
+CONTRIBUTOR_CACHE_VERSION = 2
+
+# Separators of the structured git log format; they never occur in names or paths
+RECORD_SEPARATOR = '\x1e'
+FIELD_SEPARATOR = '\x1f'
+
+
+class CommitRecord(NamedTuple):
+    """One commit of the analysis period"""
+    sha: str
+    timestamp: int  # Committer time, which --since filters on
+    author: str
+    email: str
+    date: str  # YYYY-MM-DD
+    files: Tuple[str, ...]
+
+
+class IdentityResolver:
+    """Clusters (name, email) aliases of the same person into one identity
+    
+    Names and emails are read with .mailmap applied (%aN/%aE, git blame), which
+    is where one person's different emails are merged. Aliases are clustered by
+    email only, so two people who share a name stay apart; aliases with no email
+    or a placeholder one only join aliases of the same name and email. Each
+    identity is shown under its most frequent name and email. Ties go to a
+    tidy spelling (single spaces, not all lower case), then to the most
+    recently used one. Identities shown under the same name get their email
+    appended.
+    """
+    
+    # Shared defaults that say nothing about who made a commit
+    PLACEHOLDER_EMAILS = frozenset({
+        'you@example.com', 'your@email.com', 'email@example.com', 'user@example.com',
+        'root@localhost', 'root@localhost.localdomain', 'none@none', 'unknown'
+    })
+    
+    def __init__(self):
+        self._alias_commits = Counter()
+        self._alias_last_seen = {}
+    
+    @classmethod
+    def is_placeholder_email(cls, email):
+        """Whether an email is shared by unrelated people (defaults, generic noreply)"""
+        email = email.strip().lower()
+        local, _, domain = email.partition('@')
+        # Per-user addresses such as 123+name@users.noreply.github.com are not placeholders
+        return (email in cls.PLACEHOLDER_EMAILS
+                or local in ('noreply', 'no-reply')
+                or domain.endswith('(none)'))
+    
+    @classmethod
+    def _cluster_key(cls, name, email):
+        if email.strip() and not cls.is_placeholder_email(email):
+            return ('email', email.strip().lower())
+        return ('alias', ' '.join(name.split()).casefold(), email.strip().lower())
+    
+    @staticmethod
+    def _is_tidy(name):
+        return name == ' '.join(name.split()) and name != name.lower()
+    
+    def add(self, name, email, commits=1, timestamp=0):
+        """Record commits made under one alias, the latest of them at timestamp"""
+        alias = (name, email)
+        self._alias_last_seen[alias] = max(self._alias_last_seen.get(alias, timestamp), timestamp)
+        self._alias_commits[alias] += commits
+    
+    def resolve(self):
+        """Map every alias to its identity's display name, and list each identity's aliases"""
+        clusters = defaultdict(list)
+        for alias in self._alias_commits:
+            clusters[self._cluster_key(*alias)].append(alias)
+        
+        identities = []
+        for members in clusters.values():
+            name_commits = Counter()
+            email_commits = Counter()
+            name_last_seen = Counter()
+            email_last_seen = Counter()
+            for alias in members:
+                name, email = alias
+                name_commits[name] += self._alias_commits[alias]
+                email_commits[email] += self._alias_commits[alias]
+                name_last_seen[name] = max(name_last_seen[name], self._alias_last_seen[alias])
+                email_last_seen[email] = max(email_last_seen[email], self._alias_last_seen[alias])
+            display_name = max(name_commits, key=lambda n: (name_commits[n], self._is_tidy(n), name_last_seen[n], n))
+            display_email = max(email_commits, key=lambda e: (email_commits[e], email_last_seen[e], e))
+            identities.append((display_name, display_email, members))
+        
+        name_counts = Counter(display_name for display_name, _, _ in identities)
+        canonical = {}
+        aliases = {}
+        emails = {}
+        for display_name, display_email, members in identities:
+            if name_counts[display_name] > 1:
+                display_name = f"{display_name} <{display_email}>"
+            for alias in members:
+                canonical[alias] = display_name
+            aliases[display_name] = sorted(members)
+            emails[display_name] = display_email
+        return canonical, aliases, emails
+
+
+class BotClassifier:
+    """Classifies identities as automation with one precompiled matcher
+    
+    Patterns match whole words, "bot" suffixes and "ci-"/"ci_" prefixes, so that
+    names such as "Lucia" or "Abbott" are not taken for CI or bots.
+    Allowlisted names or emails are always human, denylisted ones always
+    automation; a surname ending in "bot" needs the allowlist.
+    """
+    
+    BOT_PATTERN = re.compile(
+        r'\[bot\]'
+        r'|\bbots?\b'
+        r'|bot\b'
+        r'|^(?:github-actions|renovate|dependabot|greenkeeper|snyk)\b'
+        r'|\bautomation\b'
+        r'|\bci\b'
+        r'|\bci[-_]'
+        r'|circleci'
+        r'|buildbot'
+        r'|\bdeploy(?:er|ment|s)?\b',
+        re.IGNORECASE
+    )
+    
+    def __init__(self, allowlist=(), denylist=()):
+        self.allowlist = {entry.strip().lower() for entry in allowlist}
+        self.denylist = {entry.strip().lower() for entry in denylist}
+    
+    def is_bot(self, aliases):
+        """Whether an identity, given as its (name, email) aliases, is automation"""
+        values = [value.strip().lower() for alias in aliases for value in alias]
+        if any(value in self.denylist for value in values):
+            return True
+        if any(value in self.allowlist for value in values):
+            return False
+        return any(self.BOT_PATTERN.search(value) for value in values if value)
+
+
 class ContributorAnalyzer:
-    def __init__(self, repo_path, analysis_period_months=12, output_file=None):
+    # Files considered for ownership analysis
+    OWNERSHIP_PATTERNS = ('*.py', '*.js', '*.ts', '*.tsx', '*.java', '*.cpp', '*.c', '*.h')
+    
+    def __init__(self, repo_path, analysis_period_months=12, output_file=None,
+                 blame_workers=4, blame_sample=0, sample_by='hotness',
+                 bot_allowlist=(), bot_denylist=(), cache_dir=None, use_cache=True):
         self.repo_path = Path(repo_path).resolve()
         self.analysis_period_months = analysis_period_months
         self.output_file = output_file
+        # git blame runs in subprocesses, so threads are enough to keep several busy
+        self.blame_workers = blame_workers if blame_workers > 0 else (os.cpu_count() or 1)
+        self.blame_sample = blame_sample  # 0 = every matching file
+        self.sample_by = sample_by
+        self.ownership_candidates = 0
+        self.bot_classifier = BotClassifier(bot_allowlist, bot_denylist)
+        self.history = None
         self.since_date = (datetime.now() - timedelta(days=30 * analysis_period_months)).strftime('%Y-%m-%d')
+        self.cache_dir = Path(cache_dir) if cache_dir else self.repo_path / CACHE_DIR_NAME
+        self.use_cache = use_cache
+        # Commits and per-file blame results persisted between runs
+        self.cache = None
+        # Blob SHA of each tracked file whose worktree matches the index
+        self.file_blobs = {}
         
         # Verify repository exists and is a git repo
         if not self.repo_path.exists():
@@ -52,57 +216,222 @@ class ContributorAnalyzer:
             logger.error(f"Error: {e.stderr}")
             return ""
     
+    def iter_commits(self, revision_args=()):
+        """Stream commit records of the analysis period from a single git log pass"""
+        log_cmd = [
+            'git', '-c', 'core.quotepath=off', 'log',
+            f'--since={self.since_date}', '--date=short', '--name-only',
+            f'--pretty=format:{RECORD_SEPARATOR}%H{FIELD_SEPARATOR}%ct{FIELD_SEPARATOR}'
+            f'%aN{FIELD_SEPARATOR}%aE{FIELD_SEPARATOR}%ad',
+            *revision_args
+        ]
+        # stderr goes to a temporary file rather than a pipe: git would block on a
+        # full stderr pipe while stdout is still being read here
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8', errors='replace') as stderr_file:
+            process = subprocess.Popen(
+                log_cmd,
+                cwd=self.repo_path,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True,
+                encoding='utf-8',
+                errors='replace'
+            )
+            
+            header = None
+            files = []
+            try:
+                for line in process.stdout:
+                    line = line.rstrip('\n')
+                    if line.startswith(RECORD_SEPARATOR):
+                        if header:
+                            yield CommitRecord(*header, tuple(files))
+                        sha, timestamp, author, email, date = line[1:].split(FIELD_SEPARATOR)
+                        header = (sha, int(timestamp), author, email, date)
+                        files = []
+                    elif line:
+                        files.append(line)
+                if header:
+                    yield CommitRecord(*header, tuple(files))
+            finally:
+                process.stdout.close()
+                process.wait()
+            
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                logger.error(f"Git command failed: {' '.join(log_cmd)}")
+                logger.error(f"Error: {stderr_file.read()}")
+    
+    def collect_history(self):
+        """Build every history aggregate in memory from one pass over the commits"""
+        if self.history is not None:
+            return self.history
+        
+        resolver = IdentityResolver()
+        alias_days = defaultdict(Counter)
+        file_changes = Counter()
+        total_commits = 0
+        
+        commits = self.refresh_commit_cache() if self.use_cache else self.iter_commits()
+        for commit in commits:
+            total_commits += 1
+            resolver.add(commit.author, commit.email, timestamp=commit.timestamp)
+            alias_days[(commit.author, commit.email)][commit.date] += 1
+            file_changes.update(commit.files)
+        
+        canonical, aliases, contributor_emails = resolver.resolve()
+        
+        # Aggregate per resolved identity
+        contributor_commits = Counter()
+        contributor_days = defaultdict(Counter)
+        for alias, days in alias_days.items():
+            contributor_commits[canonical[alias]] += sum(days.values())
+            contributor_days[canonical[alias]].update(days)
+        
+        self.history = {
+            'total_commits': total_commits,
+            'contributor_commits': contributor_commits,
+            'contributor_emails': contributor_emails,
+            'contributor_aliases': aliases,
+            'alias_names': canonical,
+            'email_names': {email.lower(): name for (_, email), name in canonical.items()
+                            if email and not IdentityResolver.is_placeholder_email(email)},
+            'contributor_days': contributor_days,  # Per-day commit histogram of each contributor
+            'file_changes': file_changes
+        }
+        return self.history
+    
+    def resolve_author(self, name, email):
+        """Identity name of a (mailmapped) author, as resolved from the analysis period"""
+        history = self.collect_history()
+        return (history['alias_names'].get((name, email))
+                or history['email_names'].get(email.lower())
+                or name)
+    
+    def get_cache_path(self):
+        """Get the cache file for this repository, keyed by its absolute path"""
+        repo_key = hashlib.sha1(str(self.repo_path).encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / f"contributors-{repo_key}.json"
+    
+    def _mailmap_key(self):
+        """Hash of the .mailmap, which shapes every cached author name"""
+        try:
+            return hashlib.sha1((self.repo_path / '.mailmap').read_bytes()).hexdigest()
+        except OSError:
+            return None
+    
+    def _load_cache(self):
+        """Load the cache, ignoring missing, corrupt or outdated files"""
+        cache_path = self.get_cache_path()
+        if not cache_path.exists():
+            return None
+        
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (IOError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable contributor cache {cache_path}: {e}")
+            return None
+        
+        if cache.get('version') != CONTRIBUTOR_CACHE_VERSION:
+            return None
+        if cache.get('mailmap') != self._mailmap_key():
+            logger.info(".mailmap changed since last run, rebuilding contributor cache")
+            return None
+        return cache
+    
+    def save_cache(self):
+        """Atomically write the commits and blame results to disk"""
+        if not self.use_cache or self.cache is None:
+            return
+        
+        if self.file_blobs:
+            # Keep only the entries of files still at the blamed blob
+            self.cache['blame'] = {path: entry for path, entry in self.cache['blame'].items()
+                                   if self.file_blobs.get(path) == entry[0]}
+        
+        cache_path = self.get_cache_path()
+        tmp_path = cache_path.with_suffix('.tmp')
+        try:
+            make_cache_dir(cache_path.parent)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, separators=(',', ':'))
+            os.replace(tmp_path, cache_path)
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not write contributor cache {cache_path}: {e}")
+    
+    def refresh_commit_cache(self):
+        """Return the commits of the analysis period, reading only history new since the last run"""
+        head_sha = self.run_git_command(['git', 'rev-parse', 'HEAD'])
+        since_timestamp = int(datetime.strptime(self.since_date, '%Y-%m-%d').timestamp())
+        
+        cache = self._load_cache()
+        if cache and cache['since'] > since_timestamp:
+            logger.info("Analysis window grew since last run, rebuilding contributor cache")
+            cache = None
+        if cache and cache['head'] != head_sha:
+            # A rewritten history (rebase, force-push) invalidates commits and blame alike
+            ancestor = subprocess.run(['git', 'merge-base', '--is-ancestor', cache['head'], head_sha],
+                                      cwd=self.repo_path, capture_output=True)
+            if ancestor.returncode != 0:
+                logger.info("Cached HEAD is no longer in history, rebuilding contributor cache")
+                cache = None
+        
+        if cache:
+            commits = [CommitRecord(sha, timestamp, author, email, date, tuple(files))
+                       for sha, timestamp, author, email, date, files in cache['commits']
+                       if timestamp >= since_timestamp]
+            aged_out = len(cache['commits']) - len(commits)
+            if cache['head'] == head_sha:
+                logger.info(f"Contributor cache is up to date at {head_sha[:12]}")
+            else:
+                new_commits = list(self.iter_commits([f"{cache['head']}..{head_sha}"]))
+                logger.info(f"Contributor cache: {len(new_commits)} new commits, {aged_out} aged out")
+                # git log lists newest first, keep the cache in the same order
+                commits = new_commits + commits
+                # A file changed since the last run may be back at a cached blob with other authors
+                touched = {path for commit in new_commits for path in commit.files}
+                cache['blame'] = {path: entry for path, entry in cache['blame'].items() if path not in touched}
+            blame = cache['blame']
+        else:
+            commits = list(self.iter_commits([head_sha] if head_sha else []))
+            blame = {}
+            logger.info(f"Contributor cache built with {len(commits)} commits")
+        
+        self.cache = {
+            'version': CONTRIBUTOR_CACHE_VERSION,
+            'repo_path': str(self.repo_path),
+            'head': head_sha,
+            'since': since_timestamp,
+            'mailmap': self._mailmap_key(),
+            # Each commit: [sha, timestamp, author, email, date, [path, ...]]
+            'commits': [list(commit) for commit in commits],
+            # Path -> [blob SHA, [[author, email, lines], ...]]; reused while the path is still at that
+            # blob and no new commit touched it, since identical blobs at other paths blame differently
+            'blame': blame
+        }
+        return commits
+    
     def get_contributor_stats(self):
         """Get basic contributor statistics"""
         logger.info("Analyzing contributor statistics...")
         
-        # Get all commits since analysis period
-        total_commits_cmd = ['git', 'log', '--oneline', f'--since={self.since_date}']
-        total_commits = len(self.run_git_command(total_commits_cmd).split('\n')) if self.run_git_command(total_commits_cmd) else 0
-        
-        # Get contributor commit counts
-        contributors_cmd = ['git', 'log', '--pretty=format:%an', f'--since={self.since_date}']
-        contributors_output = self.run_git_command(contributors_cmd)
-        
-        if not contributors_output:
+        history = self.collect_history()
+        if not history['contributor_commits']:
             return {}, 0, {}
         
-        contributor_commits = Counter(contributors_output.split('\n'))
-        
-        # Get contributor emails for identification
-        contributors_with_email_cmd = ['git', 'log', '--pretty=format:%an|%ae', f'--since={self.since_date}']
-        contributors_with_email = self.run_git_command(contributors_with_email_cmd)
-        
-        contributor_emails = {}
-        for line in contributors_with_email.split('\n'):
-            if '|' in line:
-                name, email = line.split('|', 1)
-                contributor_emails[name] = email
-        
-        return contributor_commits, total_commits, contributor_emails
+        return history['contributor_commits'], history['total_commits'], history['contributor_emails']
     
     def identify_bots_and_automation(self, contributor_commits, contributor_emails):
         """Identify automated contributors (bots, CI/CD)"""
-        bot_patterns = [
-            r'.*\[bot\].*',
-            r'.*bot.*',
-            r'github-actions.*',
-            r'renovate.*',
-            r'dependabot.*',
-            r'.*automation.*',
-            r'.*ci.*',
-            r'.*deploy.*'
-        ]
+        aliases = self.collect_history()['contributor_aliases']
         
         bots = {}
         humans = {}
         
         for contributor, commits in contributor_commits.items():
-            email = contributor_emails.get(contributor, '')
-            is_bot = any(re.match(pattern, contributor.lower()) or re.match(pattern, email.lower()) 
-                        for pattern in bot_patterns)
-            
-            if is_bot:
+            identity_aliases = aliases.get(contributor) or [(contributor, contributor_emails.get(contributor, ''))]
+            if self.bot_classifier.is_bot(identity_aliases):
                 bots[contributor] = commits
             else:
                 humans[contributor] = commits
@@ -129,68 +458,177 @@ class ContributorAnalyzer:
         
         return bus_factor, critical_contributors
     
+    def get_ownership_files(self):
+        """List tracked source files, ordered by the sampling criterion (heaviest first)"""
+        files_cmd = ['git', '-c', 'core.quotepath=off', 'ls-files', '-s', '--'] + list(self.OWNERSHIP_PATTERNS)
+        files_output = self.run_git_command(files_cmd)
+        
+        if not files_output:
+            return []
+        
+        # <mode> <blob> <stage>\t<path>
+        entries = [line.split('\t', 1) for line in files_output.split('\n') if '\t' in line]
+        files = list(dict.fromkeys(path for _, path in entries))
+        
+        if self.use_cache:
+            # Files whose worktree differs from the index are blamed afresh and not cached
+            dirty_output = self.run_git_command(['git', '-c', 'core.quotepath=off', 'diff-files', '--name-only'])
+            dirty = set(dirty_output.split('\n')) if dirty_output else set()
+            self.file_blobs = {path: meta.split(' ')[1] for meta, path in entries if path not in dirty}
+        
+        if self.sample_by == 'hotness':
+            # Files changed most often in the analysis period first
+            weights = self.collect_history()['file_changes']
+        else:
+            weights = {}
+            for file_path in files:
+                try:
+                    weights[file_path] = os.path.getsize(self.repo_path / file_path)
+                except OSError:
+                    weights[file_path] = 0
+        
+        files.sort(key=lambda f: (-weights.get(f, 0), f))
+        return files
+    
+    def blame_file(self, file_path):
+        """Count lines per (author, email) of one file by streaming git blame --incremental"""
+        commit_authors = {}
+        commit_emails = {}
+        author_lines = Counter()
+        current_commit = None
+        current_lines = 0
+        
+        # See iter_commits: stderr must not sit in a pipe nobody reads yet
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8', errors='replace') as stderr_file:
+            process = subprocess.Popen(
+                ['git', '-c', 'core.quotepath=off', 'blame', '--incremental', '--', file_path],
+                cwd=self.repo_path,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True,
+                encoding='utf-8',
+                errors='replace'
+            )
+            try:
+                for line in process.stdout:
+                    line = line.rstrip('\n')
+                    if current_commit is None:
+                        # Group header: <sha> <source line> <result line> <line count>
+                        fields = line.split(' ')
+                        if len(fields) == 4:
+                            current_commit = fields[0]
+                            current_lines = int(fields[3])
+                    elif line.startswith('author '):
+                        # Author details only accompany the first group of each commit
+                        commit_authors[current_commit] = line[7:]
+                    elif line.startswith('author-mail '):
+                        commit_emails[current_commit] = line[12:].strip('<>')
+                    elif line.startswith('filename '):
+                        # Last line of every group
+                        author = (commit_authors.get(current_commit, 'Unknown'), commit_emails.get(current_commit, ''))
+                        author_lines[author] += current_lines
+                        current_commit = None
+            finally:
+                process.stdout.close()
+                process.wait()
+            
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                logger.warning(f"Could not analyze ownership for {file_path}: {stderr_file.read().strip()}")
+                return None
+        
+        return author_lines
+    
     def analyze_file_ownership(self):
-        """Analyze file ownership patterns using git blame"""
+        """Analyze file ownership patterns using parallel git blame workers"""
         logger.info("Analyzing file ownership patterns...")
         
-        # Get list of files in repository
-        files_cmd = ['git', 'ls-files', '--', '*.py', '*.js', '*.ts', '*.tsx', '*.java', '*.cpp', '*.c', '*.h']
-        files_output = self.run_git_command(files_cmd)
+        self.collect_history()
+        files = self.get_ownership_files()
+        self.ownership_candidates = len(files)
         
-        if not files_output:
+        if not files:
             return {}
         
-        files = [f for f in files_output.split('\n') if f.strip()]
-        file_ownership = {}
-        
-        # Analyze ownership for a sample of files (limit to avoid performance issues)
-        sample_files = files[:50] if len(files) > 50 else files
+        sample_files = files[:self.blame_sample] if self.blame_sample > 0 else files
         
+        # Reuse the blame of files still at the blob blamed in an earlier run
+        results = {}
+        cached_blame = self.cache['blame'] if self.cache is not None else {}
         for file_path in sample_files:
-            try:
-                blame_cmd = ['git', 'blame', '--line-porcelain', file_path]
-                blame_output = self.run_git_command(blame_cmd)
-                
-                if blame_output:
-                    authors = []
-                    for line in blame_output.split('\n'):
-                        if line.startswith('author '):
-                            author = line[7:]  # Remove 'author ' prefix
-                            authors.append(author)
-                    
-                    if authors:
-                        author_counts = Counter(authors)
-                        total_lines = len(authors)
-                        file_ownership[file_path] = {
-                            'total_lines': total_lines,
-                            'authors': dict(author_counts),
-                            'primary_author': author_counts.most_common(1)[0] if author_counts else None
-                        }
-            except Exception as e:
-                logger.warning(f"Could not analyze ownership for {file_path}: {e}")
-                continue
+            blob = self.file_blobs.get(file_path)
+            entry = cached_blame.get(file_path)
+            if blob and entry and entry[0] == blob:
+                results[file_path] = Counter({(author, email): lines for author, email, lines in entry[1]})
+        
+        to_blame = [file_path for file_path in sample_files if file_path not in results]
+        logger.info(f"Running git blame on {len(to_blame)} of {len(files)} files "
+                    f"with {self.blame_workers} workers (sampled by {self.sample_by}, "
+                    f"{len(results)} reused from cache)")
+        
+        with ThreadPoolExecutor(max_workers=self.blame_workers) as executor:
+            futures = {executor.submit(self.blame_file, file_path): file_path for file_path in to_blame}
+            for completed, future in enumerate(as_completed(futures), 1):
+                file_path = futures[future]
+                try:
+                    results[file_path] = future.result()
+                except Exception as e:
+                    logger.warning(f"Could not analyze ownership for {file_path}: {e}")
+                    continue
+                blob = self.file_blobs.get(file_path)
+                if blob and results[file_path] is not None and self.cache is not None:
+                    cached_blame[file_path] = [blob, [[author, email, lines]
+                                                      for (author, email), lines in results[file_path].items()]]
+                if completed % 500 == 0:
+                    logger.info(f"Blamed {completed}/{len(to_blame)} files")
+        
+        # Keep the sampling order so reports are stable across runs
+        file_ownership = {}
+        for file_path in sample_files:
+            alias_counts = results.get(file_path)
+            if alias_counts:
+                author_counts = Counter()
+                for (author, email), lines in alias_counts.items():
+                    author_counts[self.resolve_author(author, email)] += lines
+                file_ownership[file_path] = {
+                    'total_lines': sum(author_counts.values()),
+                    'authors': dict(author_counts),
+                    'primary_author': author_counts.most_common(1)[0]
+                }
         
         return file_ownership
     
+    def calculate_ownership_bus_factor(self, file_ownership, bot_names=()):
+        """Calculate bus factor over blamed lines - minimum authors owning 50% of the code"""
+        author_lines = Counter()
+        for ownership in file_ownership.values():
+            author_lines.update(ownership['authors'])
+        for bot in bot_names:
+            author_lines.pop(bot, None)
+        
+        return self.calculate_bus_factor(dict(author_lines), sum(author_lines.values()))
+    
     def analyze_commit_patterns(self, human_commits):
         """Analyze commit patterns over time"""
         logger.info("Analyzing commit patterns...")
         
+        contributor_days = self.collect_history()['contributor_days']
+        
         # Get commit dates for top contributors
         top_contributors = sorted(human_commits.items(), key=lambda x: x[1], reverse=True)[:10]
         
         commit_patterns = {}
         for contributor, _ in top_contributors:
-            dates_cmd = ['git', 'log', '--author=' + contributor, '--pretty=format:%ad', '--date=short', f'--since={self.since_date}']
-            dates_output = self.run_git_command(dates_cmd)
+            daily_commits = contributor_days.get(contributor)
             
-            if dates_output:
-                dates = dates_output.split('\n')
+            if daily_commits:
+                days = sorted(daily_commits)
                 commit_patterns[contributor] = {
-                    'total_commits': len(dates),
-                    'first_commit': min(dates) if dates else None,
-                    'last_commit': max(dates) if dates else None,
-                    'commit_dates': dates
+                    'total_commits': sum(daily_commits.values()),
+                    'first_commit': days[0],
+                    'last_commit': days[-1],
+                    'commit_dates': [day for day in days for _ in range(daily_commits[day])],
+                    'daily_commits': {day: daily_commits[day] for day in days}
                 }
         
         return commit_patterns
@@ -255,6 +693,7 @@ class ContributorAnalyzer:
         
         if not contributor_commits:
             logger.warning("No commits found in the specified period")
+            self.save_cache()
             return
         
         # Separate humans from bots
@@ -267,6 +706,8 @@ class ContributorAnalyzer:
         
         # Analyze file ownership
         file_ownership = self.analyze_file_ownership()
+        ownership_bus_factor, ownership_contributors = self.calculate_ownership_bus_factor(file_ownership, bot_commits)
+        self.save_cache()
         
         # Analyze commit patterns
         commit_patterns = self.analyze_commit_patterns(human_commits)
@@ -279,7 +720,8 @@ class ContributorAnalyzer:
             total_commits, total_human_commits, total_bot_commits,
             human_commits, bot_commits, contributor_emails,
             bus_factor, critical_contributors, file_ownership,
-            commit_patterns, risk_assessment
+            commit_patterns, risk_assessment,
+            ownership_bus_factor, ownership_contributors
         )
         
         # Save report
@@ -295,11 +737,14 @@ class ContributorAnalyzer:
     def create_markdown_report(self, total_commits, total_human_commits, total_bot_commits,
                              human_commits, bot_commits, contributor_emails,
                              bus_factor, critical_contributors, file_ownership,
-                             commit_patterns, risk_assessment):
+                             commit_patterns, risk_assessment,
+                             ownership_bus_factor=0, ownership_contributors=()):
         """Create formatted markdown report"""
         
         timestamp = datetime.now().strftime("%Y%m%d-%H%M")
         
+        alias_count = len(self.collect_history()['alias_names'])
+        
         report = f"""# Critical Contributors Analysis
 
 Analysis performed on: {timestamp}  
@@ -320,6 +765,7 @@ This analysis identified contributor concentration risks by analyzing:
 - **Human Commits**: {total_human_commits:,} ({total_human_commits/total_commits*100:.1f}%)
 - **Automated Commits**: {total_bot_commits:,} ({total_bot_commits/total_commits*100:.1f}%)
 - **Unique Human Contributors**: {len(human_commits)}
+- **Resolved Identities**: {alias_count} name/email aliases merged into {len(human_commits) + len(bot_commits)} contributors
 - **Bus Factor**: {bus_factor}
 
 ## Top Human Contributors
@@ -358,6 +804,15 @@ This analysis identified contributor concentration risks by analyzing:
             report += f"{i}. **{contributor}**: {commits} commits ({percentage*100:.1f}%)\n"
         
         report += f"""
+**Ownership Bus Factor: {ownership_bus_factor}** - Minimum contributors owning 50% of the blamed lines
+
+### Critical Owners (50% of blamed lines)
+"""
+        
+        for i, (contributor, lines, percentage) in enumerate(ownership_contributors, 1):
+            report += f"{i}. **{contributor}**: {lines:,} lines ({percentage*100:.1f}%)\n"
+        
+        report += f"""
 
 ## Automated Contributors
 
@@ -377,11 +832,16 @@ This analysis identified contributor concentration risks by analyzing:
             
             report += f"| {bot} | {commits} | {purpose} |\n"
         
+        if self.blame_sample > 0 and self.blame_sample < self.ownership_candidates:
+            sample_note = " (sample of the largest files)" if self.sample_by == 'size' else " (sample of the most changed files)"
+        else:
+            sample_note = ""
+        
         report += f"""
 
 ## File Ownership Analysis
 
-Analyzed {len(file_ownership)} files for ownership concentration:
+Analyzed {len(file_ownership)} of {self.ownership_candidates} source files for ownership concentration{sample_note}:
 
 ### High Ownership Concentration Files
 """
@@ -464,10 +924,11 @@ Analyzed {len(file_ownership)} files for ownership concentration:
 
 This analysis uses the following approach:
 1. **Commit Analysis**: Examines commit history over {self.analysis_period_months} months
-2. **Bot Detection**: Identifies automated contributors using pattern matching
-3. **Bus Factor Calculation**: Determines minimum contributors for 50% of work
-4. **File Ownership**: Analyzes code ownership using git blame
-5. **Risk Assessment**: Combines metrics to assess overall project risk
+2. **Identity Resolution**: Applies .mailmap and merges aliases sharing an email
+3. **Bot Detection**: Identifies automated contributors with whole-word pattern matching and allow/deny lists
+4. **Bus Factor Calculation**: Determines minimum contributors for 50% of work
+5. **File Ownership**: Analyzes code ownership using parallel git blame over the tracked source files
+6. **Risk Assessment**: Combines metrics to assess overall project risk
 
 ---
 *Generated by OLAF Contributor Analyzer*
@@ -481,6 +942,19 @@ def main():
     parser.add_argument('-m', '--months', type=int, default=12, 
                        help='Analysis period in months (default: 12)')
     parser.add_argument('-o', '--output', help='Output file path (default: stdout)')
+    parser.add_argument('--blame-workers', type=int, default=4,
+                       help='Concurrent git blame processes (default: 4, 0 = all CPUs)')
+    parser.add_argument('--blame-sample', type=int, default=0,
+                       help='Blame only this many files (default: 0 = all source files)')
+    parser.add_argument('--sample-by', choices=['hotness', 'size'], default='hotness',
+                       help='Files kept by --blame-sample: most changed in the period or largest (default: hotness)')
+    parser.add_argument('--bot-allow', action='append', default=[], metavar='NAME_OR_EMAIL',
+                       help='Never classify this contributor name or email as automation (repeatable)')
+    parser.add_argument('--bot-deny', action='append', default=[], metavar='NAME_OR_EMAIL',
+                       help='Always classify this contributor name or email as automation (repeatable)')
+    parser.add_argument('--cache-dir', help='Directory for the contributor cache (default: <repo>/.olaf-cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-read the full history window and re-blame every file instead of reusing the cache')
     parser.add_argument('-v', '--verbose', action='store_true', 
                        help='Enable verbose logging')
     
@@ -490,7 +964,14 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     try:
-        analyzer = ContributorAnalyzer(args.repo_path, args.months, args.output)
+        analyzer = ContributorAnalyzer(args.repo_path, args.months, args.output,
+                                       blame_workers=args.blame_workers,
+                                       blame_sample=args.blame_sample,
+                                       sample_by=args.sample_by,
+                                       bot_allowlist=args.bot_allow,
+                                       bot_denylist=args.bot_deny,
+                                       cache_dir=args.cache_dir,
+                                       use_cache=not args.no_cache)
         analyzer.generate_report()
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
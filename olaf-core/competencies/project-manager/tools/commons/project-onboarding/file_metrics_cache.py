@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Per-File Metrics Cache for Project Onboarding
+
+Shared by the onboarding analyzers so that files which did not change since
+the previous run are not reopened. Each analyzer stores its metrics for a
+file under its own namespace; all namespaces of a file are invalidated
+together when the file changes.
+
+A cached entry is valid when the file's size and modification time still
+match. When only the modification time moved (fresh clone, branch switch),
+the entry is still reused if the file is tracked, its index blob hash is
+the one recorded with the entry and git reports no worktree change for it.
+"""
+
+import os
+import json
+import hashlib
+import subprocess
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the layout of the on-disk cache changes
+FILE_METRICS_CACHE_VERSION = 1
+
+# Default cache directory, created inside the analyzed repository; the
+# analyzers exclude it from their walks
+CACHE_DIR_NAME = '.olaf-cache'
+
+# Least recently used entries beyond this are evicted when saving
+DEFAULT_MAX_ENTRIES = 200000
+
+
+def make_cache_dir(cache_dir: Path) -> None:
+    """Create a cache directory and keep its contents out of git.
+    
+    A .gitignore matching everything is written into the default cache
+    directory and into any directory created here, so the cache never shows
+    up as untracked in the analyzed repository. An existing directory given
+    with --cache-dir is left as it is.
+    """
+    cache_dir = Path(cache_dir)
+    if cache_dir.is_dir() and cache_dir.name != CACHE_DIR_NAME:
+        return
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    gitignore = cache_dir / '.gitignore'
+    if not gitignore.exists():
+        gitignore.write_text('*\n', encoding='utf-8')
+
+
+class FileMetricsCache:
+    """Size/mtime-keyed cache of per-file analyzer metrics with LRU eviction."""
+    
+    def __init__(self, repo_path: str, cache_dir: str = None, enabled: bool = True,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.repo_path = Path(repo_path).resolve()
+        self.cache_dir = Path(cache_dir) if cache_dir else self.repo_path / CACHE_DIR_NAME
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        # path -> {'size', 'mtime_ns', 'blob', 'metrics': {namespace: value}}, oldest use first
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        # Stat results taken at lookup time, so stored metrics are never newer than their key
+        self._stats: Dict[str, os.stat_result] = {}
+        self._index_blobs: Optional[Dict[str, str]] = None
+        self._dirty_paths: Set[str] = set()
+        self._modified = False
+        
+        if self.enabled:
+            self._load()
+    
+    def get_cache_path(self) -> Path:
+        """Get the cache file for this repository, keyed by its absolute path."""
+        repo_key = hashlib.sha1(str(self.repo_path).encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / f"file-metrics-{repo_key}.json"
+    
+    def _load(self) -> None:
+        """Load the cache, ignoring missing, corrupt or outdated files."""
+        cache_path = self.get_cache_path()
+        if not cache_path.exists():
+            return
+        
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (IOError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable file metrics cache {cache_path}: {e}")
+            return
+        
+        if cache.get('version') != FILE_METRICS_CACHE_VERSION:
+            return
+        self._entries = OrderedDict(cache.get('entries', {}))
+    
+    def save(self) -> None:
+        """Evict least recently used entries and atomically write the cache to disk."""
+        if not self.enabled:
+            return
+        
+        logger.info(f"File metrics cache: {self.hits} hits, {self.misses} misses")
+        if not self._modified:
+            return
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        
+        cache = {
+            'version': FILE_METRICS_CACHE_VERSION,
+            'repo_path': str(self.repo_path),
+            'entries': self._entries
+        }
+        
+        cache_path = self.get_cache_path()
+        tmp_path = cache_path.with_suffix('.tmp')
+        try:
+            make_cache_dir(cache_path.parent)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, separators=(',', ':'))
+            os.replace(tmp_path, cache_path)
+            self._modified = False
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not write file metrics cache {cache_path}: {e}")
+    
+    def _relative_key(self, file_path: Path) -> str:
+        """Cache key of a file: its POSIX path relative to the repository."""
+        return Path(os.path.relpath(os.path.abspath(file_path), self.repo_path)).as_posix()
+    
+    def _load_git_index(self) -> None:
+        """Read index blob hashes and the paths whose worktree differs from the index."""
+        self._index_blobs = {}
+        try:
+            result = subprocess.run(
+                ['git', 'ls-files', '-s', '-z'],
+                cwd=self.repo_path, capture_output=True, check=True
+            )
+            for record in result.stdout.decode('utf-8', errors='replace').split('\0'):
+                # <mode> <blob> <stage>\t<path>
+                meta, _, path = record.partition('\t')
+                if path:
+                    self._index_blobs[path] = meta.split(' ')[1]
+            
+            # Compares stat data only, so touched files are reported too; that
+            # only costs a recomputation, never a stale hit
+            result = subprocess.run(
+                ['git', 'diff-files', '--name-only', '--relative', '-z'],
+                cwd=self.repo_path, capture_output=True, check=True
+            )
+            self._dirty_paths = set(result.stdout.decode('utf-8', errors='replace').split('\0'))
+        except (subprocess.CalledProcessError, FileNotFoundError, IndexError):
+            self._index_blobs = {}
+            self._dirty_paths = set()
+    
+    def _clean_blob(self, key: str) -> Optional[str]:
+        """Index blob hash of a tracked file whose worktree matches the index."""
+        if self._index_blobs is None:
+            self._load_git_index()
+        if key in self._dirty_paths:
+            return None
+        return self._index_blobs.get(key)
+    
+    def lookup(self, file_path: Path, namespace: str, stat: os.stat_result = None) -> Any:
+        """Return the cached metrics of a file for a namespace, or None on a miss.
+        
+        stat may be passed by callers that already took it, e.g. in a worker thread.
+        """
+        if not self.enabled:
+            return None
+        
+        key = self._relative_key(file_path)
+        if stat is None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+        self._stats[key] = stat
+        
+        entry = self._entries.get(key)
+        if entry is not None and entry['size'] == stat.st_size:
+            if entry['mtime_ns'] != stat.st_mtime_ns:
+                blob = entry.get('blob')
+                if blob and blob == self._clean_blob(key):
+                    # Same content with a new mtime; re-key so the fast path applies next time
+                    entry['mtime_ns'] = stat.st_mtime_ns
+                    self._modified = True
+                else:
+                    entry = None
+            
+            if entry is not None and namespace in entry['metrics']:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['metrics'][namespace]
+        
+        self.misses += 1
+        return None
+    
+    def store(self, file_path: Path, namespace: str, value: Any) -> None:
+        """Record JSON-serialisable metrics of a file for a namespace."""
+        if not self.enabled:
+            return
+        
+        key = self._relative_key(file_path)
+        stat = self._stats.pop(key, None)
+        if stat is None:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return
+        
+        entry = self._entries.get(key)
+        if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            entry = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'blob': self._clean_blob(key),
+                'metrics': {}
+            }
+            self._entries[key] = entry
+        
+        entry['metrics'][namespace] = value
+        self._entries.move_to_end(key)
+        self._modified = True
@@ -9,18 +9,99 @@ Based on PowerShell detect-project-type.ps1 from OLAF toolkit.
 """
 
 import os
+import re
 import json
 import argparse
 import sys
+from array import array
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 
+from file_metrics_cache import CACHE_DIR_NAME, FileMetricsCache
+from text_metrics import BINARY_EXTENSIONS, count_file_lines
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Namespace of the per-file line count in the file metrics cache
+LINES_CACHE_NAMESPACE = 'language-lines-v1'
+
+# Example files listed per language in the report
+FILE_EXAMPLES_PER_LANGUAGE = 5
+
+
+def file_extension(name: str) -> str:
+    """Lower-cased extension of a file name, as Path(name).suffix.lower() returns it."""
+    dot = name.rfind('.')
+    return name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+
+
+class LanguageDistribution:
+    """Language code and line count of every counted file, in two typed arrays.
+    
+    Files are only appended while the tree is walked; the per-language
+    totals are computed from the arrays once, in summarize().
+    """
+    
+    def __init__(self, languages: Iterable[str]):
+        self.languages = list(languages)
+        self.language_codes = array('B')
+        self.line_counts = array('Q')
+        self.extensions: Dict[str, int] = {}  # extension -> language code
+        self.file_examples: List[List[str]] = [[] for _ in self.languages]
+        self.total_files = 0  # All files walked, with or without a language
+    
+    def add(self, relative_path: str, language_code: int, extension: str, lines: int) -> None:
+        """Count one file of a matched language and its lines."""
+        self.language_codes.append(language_code)
+        self.line_counts.append(lines)
+        if extension not in self.extensions:
+            self.extensions[extension] = language_code
+        
+        file_examples = self.file_examples[language_code]
+        if len(file_examples) < FILE_EXAMPLES_PER_LANGUAGE:
+            file_examples.append(relative_path)
+    
+    def totals(self) -> Tuple[List[int], List[int]]:
+        """File count and line total of each language code, from one pass over the arrays."""
+        try:
+            import numpy as np
+        except ImportError:
+            file_counts = [0] * len(self.languages)
+            line_totals = [0] * len(self.languages)
+            for language_code, lines in zip(self.language_codes, self.line_counts):
+                file_counts[language_code] += 1
+                line_totals[language_code] += lines
+            return file_counts, line_totals
+        
+        codes = np.frombuffer(self.language_codes, dtype=np.uint8)
+        lines = np.frombuffer(self.line_counts, dtype=np.uint64)
+        file_counts = np.bincount(codes, minlength=len(self.languages))
+        # Weighted sums are floats, exact for totals below 2**53 lines
+        line_totals = np.bincount(codes, weights=lines, minlength=len(self.languages)).round().astype(np.int64)
+        return file_counts.tolist(), line_totals.tolist()
+    
+    def summarize(self) -> Dict:
+        """Per-language file counts, lines, extensions and examples, JSON-serializable."""
+        file_counts, line_totals = self.totals()
+        language_stats = {}
+        for language_code, language in enumerate(self.languages):
+            language_stats[language] = {
+                'file_count': file_counts[language_code],
+                'total_lines': line_totals[language_code],
+                'extensions': [extension for extension, code in self.extensions.items() if code == language_code]
+            }
+        
+        return {
+            'language_stats': language_stats,
+            'file_examples': dict(zip(self.languages, self.file_examples)),
+            'total_files': self.total_files,
+            'total_loc': sum(self.line_counts)
+        }
+
 
 class LanguageDistributionAnalyzer:
     """Analyzes programming language distribution and project characteristics."""
@@ -44,6 +125,11 @@ class LanguageDistributionAnalyzer:
         "Other": []  # Catch-all for unrecognized extensions
     }
     
+    # Extension -> language, so each file needs one lookup instead of a scan of LANGUAGE_MAP
+    EXTENSION_LANGUAGES = {
+        extension: language for language, extensions in LANGUAGE_MAP.items() for extension in extensions
+    }
+    
     # Configuration file patterns for project type detection
     CONFIG_PATTERNS = {
         "Node.js": ["package.json", "yarn.lock", "package-lock.json", "pnpm-lock.yaml"],
@@ -60,95 +146,106 @@ class LanguageDistributionAnalyzer:
         "Kubernetes": ["*.yaml", "*.yml"]  # In k8s context
     }
     
-    def __init__(self, project_path: str, output_file: str = None):
+    def __init__(self, project_path: str, output_file: str = None, cache_dir: str = None,
+                 use_cache: bool = True):
         self.project_path = Path(project_path).resolve()
         self.output_file = output_file or self.project_path / "language-distribution.md"
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
         self.exclude_patterns = [
             'node_modules', 'dist', 'bin', 'obj', 'build', 'target', 
             'vendor', 'packages', '.git', '__pycache__', '.pytest_cache',
-            '.next', '.turbo', '.cache', 'coverage', 'out', 'tmp'
+            '.next', '.turbo', '.cache', 'coverage', 'out', 'tmp', CACHE_DIR_NAME
         ]
+        self.language_codes = {language: code for code, language in enumerate(self.LANGUAGE_MAP)}
+        self.extension_codes = {
+            extension: self.language_codes[language] for extension, language in self.EXTENSION_LANGUAGES.items()
+        }
         
     def should_exclude_path(self, path: Path) -> bool:
         """Check if path should be excluded from analysis."""
         path_str = str(path)
         return any(pattern in path_str for pattern in self.exclude_patterns)
     
-    def get_all_files(self) -> List[Path]:
-        """Get all files in the project, excluding specified patterns."""
-        all_files = []
-        
-        for root, dirs, files in os.walk(self.project_path):
+    def iter_files(self) -> Iterator[Tuple[str, str, str]]:
+        """Yield (path, relative path, file name) of every file outside the excluded patterns.
+        
+        None of the patterns contain a path separator, so a path matches one
+        exactly when its directory or its file name does; the directory is
+        checked once for all of its files.
+        """
+        exclude = re.compile('|'.join(map(re.escape, self.exclude_patterns)))
+        project_root = str(self.project_path)
+        prefix_length = len(os.path.join(project_root, ''))
+        
+        for root, dirs, files in os.walk(project_root):
+            if exclude.search(root):
+                dirs[:] = []
+                continue
             # Remove excluded directories from traversal
-            dirs[:] = [d for d in dirs if not any(pattern in d for pattern in self.exclude_patterns)]
+            dirs[:] = [d for d in dirs if not exclude.search(d)]
             
+            directory = os.path.join(root, '')
+            relative_directory = directory[prefix_length:]
             for file in files:
-                file_path = Path(root) / file
-                if not self.should_exclude_path(file_path):
-                    all_files.append(file_path)
-        
-        return all_files
+                if not exclude.search(file):
+                    yield directory + file, relative_directory + file, file
+    
+    def get_all_files(self) -> List[Path]:
+        """Get all files in the project, excluding specified patterns."""
+        return [Path(path) for path, _, _ in self.iter_files()]
+    
+    def match_language(self, file_path: Path) -> Optional[str]:
+        """Language a file counts towards, or None for files without an extension."""
+        extension = file_path.suffix.lower()
+        return self.EXTENSION_LANGUAGES.get(extension, "Other" if extension else None)
+    
+    def match_language_code(self, extension: str) -> Optional[int]:
+        """Code of the language of a lower-cased extension in a LanguageDistribution."""
+        if not extension:
+            return None
+        return self.extension_codes.get(extension, self.language_codes["Other"])
+    
+    def new_distribution(self) -> LanguageDistribution:
+        """Create an empty distribution for add_to_distribution."""
+        return LanguageDistribution(self.LANGUAGE_MAP)
+    
+    def add_to_distribution(self, distribution: LanguageDistribution, relative_path: str,
+                            language: str, lines: int) -> None:
+        """Count one file of a matched language and its lines."""
+        distribution.add(relative_path, self.language_codes[language],
+                         file_extension(os.path.basename(relative_path)), lines)
+    
+    def finish_distribution(self, distribution: LanguageDistribution) -> Dict:
+        """Aggregate the collected files into per-language statistics."""
+        return distribution.summarize()
     
     def analyze_language_distribution(self) -> Dict:
         """Analyze language distribution across all files."""
-        all_files = self.get_all_files()
-        language_stats = {}
-        file_examples = {}
-        total_loc = 0
-        
-        # Initialize language counters
-        for language in self.LANGUAGE_MAP.keys():
-            language_stats[language] = {
-                'file_count': 0,
-                'total_lines': 0,
-                'extensions': set()
-            }
-            file_examples[language] = []
-        
-        logger.info(f"Analyzing {len(all_files)} files...")
-        
-        for file_path in all_files:
-            extension = file_path.suffix.lower()
-            
-            # Find matching language
-            matched_language = None
-            for language, extensions in self.LANGUAGE_MAP.items():
-                if extension in extensions:
-                    matched_language = language
-                    break
-            
-            if not matched_language and extension:
-                matched_language = "Other"
+        distribution = self.new_distribution()
+        cache = FileMetricsCache(self.project_path, self.cache_dir, self.use_cache)
+        
+        for file_path, relative_path, name in self.iter_files():
+            distribution.total_files += 1
+            extension = file_extension(name)
+            language_code = self.match_language_code(extension)
+            if language_code is None:
+                continue  # Files without an extension are counted but never opened
             
-            if matched_language:
-                # Count lines of code
+            # Count lines of code, unless binary or unchanged since the last run
+            lines = 0 if extension in BINARY_EXTENSIONS else cache.lookup(file_path, LINES_CACHE_NAMESPACE)
+            if lines is None:
                 try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = len(f.readlines())
-                        language_stats[matched_language]['total_lines'] += lines
-                        total_loc += lines
-                except (IOError, UnicodeDecodeError):
+                    lines = count_file_lines(file_path)
+                    cache.store(file_path, LINES_CACHE_NAMESPACE, lines)
+                except (IOError, OSError):
                     lines = 0
-                
-                # Update statistics
-                language_stats[matched_language]['file_count'] += 1
-                language_stats[matched_language]['extensions'].add(extension)
-                
-                # Store file examples (limit to 5 per language)
-                if len(file_examples[matched_language]) < 5:
-                    relative_path = file_path.relative_to(self.project_path)
-                    file_examples[matched_language].append(str(relative_path))
-        
-        # Convert sets to lists for JSON serialization
-        for language in language_stats:
-            language_stats[language]['extensions'] = list(language_stats[language]['extensions'])
+            
+            distribution.add(relative_path, language_code, extension, lines)
         
-        return {
-            'language_stats': language_stats,
-            'file_examples': file_examples,
-            'total_files': len(all_files),
-            'total_loc': total_loc
-        }
+        logger.info(f"Analyzed {distribution.total_files} files")
+        cache.save()
+        return self.finish_distribution(distribution)
     
     def detect_project_types(self) -> Dict:
         """Detect project types based on configuration files."""
@@ -468,13 +565,18 @@ This project has a **focused technology stack** with few languages:
         
         return report
     
-    def run_analysis(self) -> None:
-        """Run complete language distribution analysis."""
+    def run_analysis(self, language_analysis: Dict = None) -> None:
+        """Run complete language distribution analysis.
+        
+        language_analysis may be supplied by a caller that already counted
+        the files (see onboarding_pipeline.py); otherwise the tree is walked.
+        """
         logger.info(f"Starting language distribution analysis of: {self.project_path}")
         
         # Analyze language distribution
-        logger.info("Analyzing language distribution...")
-        language_analysis = self.analyze_language_distribution()
+        if language_analysis is None:
+            logger.info("Analyzing language distribution...")
+            language_analysis = self.analyze_language_distribution()
         
         # Detect project types
         logger.info("Detecting project types...")
@@ -516,6 +618,9 @@ def main():
     parser.add_argument('project_path', help='Path to project directory')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Directory for the file metrics cache (default: <project>/.olaf-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Recount every file without caching')
     
     args = parser.parse_args()
     
@@ -526,7 +631,8 @@ def main():
         logger.error(f"Project path does not exist: {args.project_path}")
         sys.exit(1)
     
-    analyzer = LanguageDistributionAnalyzer(args.project_path, args.output)
+    analyzer = LanguageDistributionAnalyzer(args.project_path, args.output,
+                                            cache_dir=args.cache_dir, use_cache=not args.no_cache)
     analyzer.run_analysis()
 
 
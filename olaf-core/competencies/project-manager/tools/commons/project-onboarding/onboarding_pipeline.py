@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Single-Traversal Onboarding Pipeline
+
+Walks the repository once, reads each file once and hands the buffer to
+pluggable per-file visitors, then writes the reports of the individual
+onboarding tools:
+
+- language:     language_distribution_analyzer.py -> language-distribution.md
+- size:         repo_size_metrics_calculator.py   -> repo-size-metrics.md
+- complexity:   complexity_analyzer.py            -> cyclomatic-complexity.md
+- conditionals: hotspot_analyzer.py               -> complexity-hotspots.md
+
+Each visitor applies its tool's own exclude patterns and file selection, so
+the reports match those of the standalone scripts.
+"""
+
+import os
+import argparse
+import itertools
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+import logging
+
+from complexity_analyzer import ComplexityAnalyzer, FunctionComplexity
+from hotspot_analyzer import HotspotAnalyzer, count_lines, scan_conditionals
+from language_distribution_analyzer import LanguageDistributionAnalyzer
+from repo_size_metrics_calculator import RepoSizeMetricsCalculator
+from text_metrics import BINARY_EXTENSIONS, READ_CHUNK_SIZE, count_text_lines
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class FileRecord:
+    """One file of the walk: its size, line count, first chunk and, when a visitor parses it, its text.
+    
+    Files are measured in a chunked read; only files some visitor parses
+    are held in memory whole, and binary files are not read at all.
+    """
+
+    __slots__ = ('path', 'relative_path', 'size', 'line_count', 'head', 'readable', 'data', '_text')
+
+    def __init__(self, path: Path, relative_path: str):
+        self.path = path
+        self.relative_path = relative_path
+        self.size = 0
+        self.line_count = 0  # Number of lines readlines() would return
+        self.head = b''  # First READ_CHUNK_SIZE bytes
+        self.readable = True
+        self.data: Optional[bytes] = None  # Whole contents, only for files read with keep_data
+        self._text = None
+
+    def stat(self) -> None:
+        """Take the size from stat, without opening the file."""
+        try:
+            self.size = self.path.stat().st_size
+        except OSError:
+            self.readable = False
+
+    def read(self, keep_data: bool) -> None:
+        """Read the file once in chunks, counting its lines and keeping its first chunk.
+        
+        The whole contents are only kept, in data, when keep_data is set.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                self.size = os.fstat(f.fileno()).st_size
+                self.head = f.read(READ_CHUNK_SIZE)
+                chunks = itertools.chain((self.head,), iter(lambda: f.read(READ_CHUNK_SIZE), b''))
+                if keep_data:
+                    self.data = b''.join(chunks)
+                    self.size = len(self.data)
+                    chunks = (self.data,)
+                self.line_count = count_text_lines(chunks)
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not read {self.path}: {e}")
+            self.head = b''
+            self.data = None
+            self.line_count = 0
+            self.stat()
+            self.readable = False
+
+    @property
+    def text(self) -> Optional[str]:
+        """Contents as open(..., 'r', encoding='utf-8', errors='ignore').read() returns them."""
+        if self._text is None and self.data is not None:
+            text = self.data.decode('utf-8', errors='ignore')
+            self._text = text.replace('\r\n', '\n').replace('\r', '\n')  # Universal newlines
+        return self._text
+
+
+class FileVisitor:
+    """Base class for per-file visitors; subclasses wrap one onboarding tool."""
+
+    name = ''
+    # Whether visit() needs the whole text of the file rather than its line count
+    reads_text = False
+
+    def __init__(self, repo_path: Path, output_dir: Path, use_cache: bool = True):
+        self.repo_path = repo_path
+        self.output_dir = output_dir
+        self.use_cache = use_cache
+
+    @property
+    def exclude_patterns(self) -> List[str]:
+        """Patterns of the wrapped tool; directories matching all visitors are never entered."""
+        raise NotImplementedError
+
+    def accepts(self, record: FileRecord) -> bool:
+        """Whether the wrapped tool would analyze this file."""
+        raise NotImplementedError
+
+    def visit(self, record: FileRecord) -> None:
+        """Collect the metrics of one accepted file."""
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        """Write the wrapped tool's report from the collected metrics."""
+        raise NotImplementedError
+
+
+class LanguageVisitor(FileVisitor):
+    """Counts files and lines per language for the language distribution report."""
+
+    name = 'language'
+
+    def __init__(self, repo_path: Path, output_dir: Path, use_cache: bool = True):
+        super().__init__(repo_path, output_dir, use_cache)
+        self.analyzer = LanguageDistributionAnalyzer(
+            str(repo_path), str(output_dir / "language-distribution.md"), use_cache=False)
+        self.distribution = self.analyzer.new_distribution()
+
+    @property
+    def exclude_patterns(self) -> List[str]:
+        return self.analyzer.exclude_patterns
+
+    def accepts(self, record: FileRecord) -> bool:
+        return not self.analyzer.should_exclude_path(record.path)
+
+    def visit(self, record: FileRecord) -> None:
+        self.distribution.total_files += 1
+        language = self.analyzer.match_language(record.path)
+        if language:
+            lines = 0 if record.path.suffix.lower() in BINARY_EXTENSIONS else record.line_count
+            self.analyzer.add_to_distribution(self.distribution, record.relative_path, language, lines)
+
+    def finish(self) -> None:
+        self.analyzer.run_analysis(self.analyzer.finish_distribution(self.distribution))
+
+
+class SizeVisitor(FileVisitor):
+    """Measures size, lines and binary content for the repository size report."""
+
+    name = 'size'
+
+    def __init__(self, repo_path: Path, output_dir: Path, use_cache: bool = True):
+        super().__init__(repo_path, output_dir, use_cache)
+        self.calculator = RepoSizeMetricsCalculator(
+            str(repo_path), str(output_dir / "repo-size-metrics.md"), use_cache=False)
+        self.aggregator = self.calculator.new_aggregator()
+
+    @property
+    def exclude_patterns(self) -> List[str]:
+        return self.calculator.exclude_patterns
+
+    def accepts(self, record: FileRecord) -> bool:
+        return not self.calculator.should_exclude_path(record.path)
+
+    def visit(self, record: FileRecord) -> None:
+        is_binary = not record.readable or self.calculator.is_binary_content(record.path, record.head)
+        self.aggregator.add(
+            record.relative_path,
+            record.size,
+            0 if is_binary else record.line_count,
+            is_binary,
+            self.calculator.get_file_category(record.path)
+        )
+
+    def finish(self) -> None:
+        self.calculator.run_analysis(self.calculator.build_analysis_data(self.aggregator))
+
+
+class ComplexityVisitor(FileVisitor):
+    """Computes per-function cyclomatic complexity for the complexity report."""
+
+    name = 'complexity'
+    reads_text = True
+
+    def __init__(self, repo_path: Path, output_dir: Path, use_cache: bool = True):
+        super().__init__(repo_path, output_dir, use_cache)
+        self.analyzer = ComplexityAnalyzer(
+            str(repo_path), str(output_dir / "cyclomatic-complexity.md"), use_cache=False)
+        self.file_functions: Dict[Path, List[FunctionComplexity]] = {}
+
+    @property
+    def exclude_patterns(self) -> List[str]:
+        return self.analyzer.exclude_patterns
+
+    def accepts(self, record: FileRecord) -> bool:
+        return (record.path.suffix in self.analyzer.LANGUAGE_MAP
+                and not self.analyzer.should_exclude_file(record.path))
+
+    def visit(self, record: FileRecord) -> None:
+        self.file_functions[record.path] = self.analyzer.analyze_file_source(record.path, record.text)
+
+    def finish(self) -> None:
+        source_files = sorted(self.file_functions)
+        self.analyzer.run_analysis(self.analyzer.build_analysis_data(source_files, self.file_functions))
+
+
+class ConditionalsVisitor(FileVisitor):
+    """Counts conditionals of source files for the hotspot report."""
+
+    name = 'conditionals'
+    reads_text = True
+
+    def __init__(self, repo_path: Path, output_dir: Path, use_cache: bool = True):
+        super().__init__(repo_path, output_dir, use_cache)
+        # The history cache still applies; files themselves come from the walk
+        self.analyzer = HotspotAnalyzer(
+            str(repo_path), str(output_dir / "complexity-hotspots.md"), use_cache=use_cache)
+
+    @property
+    def exclude_patterns(self) -> List[str]:
+        return self.analyzer.exclude_patterns
+
+    def accepts(self, record: FileRecord) -> bool:
+        return self.analyzer.is_source_file(record.relative_path)
+
+    def visit(self, record: FileRecord) -> None:
+        text = record.text or ''
+        self.analyzer.file_conditionals[str(record.path)] = (count_lines(text), scan_conditionals(text))
+
+    def finish(self) -> None:
+        self.analyzer.run_analysis()
+
+
+VISITORS: Dict[str, Type[FileVisitor]] = {
+    visitor.name: visitor for visitor in (LanguageVisitor, SizeVisitor, ComplexityVisitor, ConditionalsVisitor)
+}
+
+
+class OnboardingPipeline:
+    """Runs several onboarding visitors over one walk of the repository."""
+
+    def __init__(self, repo_path: str, visitors: List[FileVisitor]):
+        self.repo_path = Path(repo_path).resolve()
+        self.visitors = visitors
+        # Only directories every visitor excludes can be skipped entirely
+        self.exclude_patterns = sorted(set.intersection(*(set(v.exclude_patterns) for v in visitors)))
+
+    def walk(self):
+        """Yield (path, relative path) of every file outside commonly excluded directories."""
+        for root, dirs, files in os.walk(self.repo_path):
+            # Remove excluded directories from traversal
+            dirs[:] = [d for d in dirs if not any(pattern in d for pattern in self.exclude_patterns)]
+
+            for file in files:
+                file_path = Path(root) / file
+                yield file_path, str(file_path.relative_to(self.repo_path))
+
+    def run(self) -> None:
+        """Read each file at most once, fan it out to the visitors, then write every report.
+        
+        Binary files are only stat'ed, and files no visitor parses are
+        streamed in chunks rather than held in memory.
+        """
+        logger.info(f"Running {', '.join(v.name for v in self.visitors)} over: {self.repo_path}")
+
+        files_read = 0
+        bytes_read = 0
+        for file_path, relative_path in self.walk():
+            record = FileRecord(file_path, relative_path)
+            interested = [visitor for visitor in self.visitors if visitor.accepts(record)]
+            if not interested:
+                continue
+
+            keep_data = any(visitor.reads_text for visitor in interested)
+            if not keep_data and file_path.suffix.lower() in BINARY_EXTENSIONS:
+                record.stat()
+            else:
+                record.read(keep_data)
+                files_read += 1
+                bytes_read += record.size
+                if files_read % 1000 == 0:
+                    logger.info(f"Read {files_read} files")
+
+            for visitor in interested:
+                visitor.visit(record)
+
+        logger.info(f"Read {files_read} files ({bytes_read / (1024 * 1024):.1f} MB) in one pass")
+
+        for visitor in self.visitors:
+            visitor.finish()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Run the onboarding analyzers over a single walk of the repository')
+    parser.add_argument('repo_path', help='Path to repository')
+    parser.add_argument('-o', '--output-dir', help='Directory for the reports (default: repository root)', default=None)
+    parser.add_argument('--visitors', nargs='+', choices=list(VISITORS), default=list(VISITORS),
+                        help='Visitors to run (default: all)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-read the full Git history for hotspots')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    if not os.path.exists(args.repo_path):
+        logger.error(f"Repository path does not exist: {args.repo_path}")
+        sys.exit(1)
+
+    repo_path = Path(args.repo_path).resolve()
+    output_dir = Path(args.output_dir).resolve() if args.output_dir else repo_path
+    visitors = [VISITORS[name](repo_path, output_dir, use_cache=not args.no_cache) for name in args.visitors]
+
+    OnboardingPipeline(str(repo_path), visitors).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -9,18 +9,193 @@ Built from scratch for OLAF toolkit project onboarding workflow.
 """
 
 import os
+import asyncio
+import heapq
+import itertools
 import subprocess
 import argparse
 import sys
+import threading
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, NamedTuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, NamedTuple
 import logging
 
+from file_metrics_cache import CACHE_DIR_NAME, FileMetricsCache
+from text_metrics import BINARY_EXTENSIONS, READ_CHUNK_SIZE, count_text_lines
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Namespace of the per-file [line count, binary flag] in the file metrics cache
+SIZE_CACHE_NAMESPACE = 'size-metrics-v1'
+
+# Files handed to a worker thread at a time, so task overhead stays small
+FILES_PER_TASK = 256
+
+# Where the files to measure come from
+SOURCE_MODES = ('worktree', 'git-index')
+
+# Index entries that are not files of this repository (submodule commits)
+GITLINK_MODE = '160000'
+
+# Entries of the largest files and directories tables
+TOP_K = 20
+
+# Size thresholds of the recommendations
+LARGE_FILE_BYTES = 10 * 1024 * 1024
+SMALL_FILE_BYTES = 1024
+
+# Repositories whose Git metadata is collected at the same time
+GIT_METADATA_CONCURRENCY = 16
+
+# Ref namespaces counted as branches (as `git branch -a` lists them) and as tags
+BRANCH_REF_PREFIXES = (b'refs/heads/', b'refs/remotes/')
+TAG_REF_PREFIX = b'refs/tags/'
+
+
+def new_git_info() -> Dict:
+    """Git metadata of a directory that is not a repository."""
+    return {
+        'is_git_repo': False,
+        'git_dir_size_bytes': 0,
+        'loose_object_count': 0,
+        'loose_object_bytes': 0,
+        'pack_count': 0,
+        'pack_bytes': 0,
+        'commit_count': 0,
+        'branch_count': 0,
+        'tag_count': 0,
+        'remote_count': 0,
+        'command_timings': {}
+    }
+
+
+async def _git_lines(repo_path: Path, args: List[str], timings: Dict[str, float]):
+    """Run a git command and yield its output lines as they arrive.
+    
+    The wall-clock time of the command is recorded in timings under its
+    subcommand name; a failing command raises CalledProcessError once its
+    output has been consumed.
+    """
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        'git', *args,
+        cwd=repo_path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    finished = False
+    try:
+        async for line in process.stdout:
+            yield line.rstrip(b'\n')
+        finished = True
+    finally:
+        if not finished and process.returncode is None:
+            process.kill()  # The caller stopped reading early
+        returncode = await process.wait()
+        timings[args[0]] = time.perf_counter() - start
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, ['git'] + args)
+
+
+async def _count_objects(repo_path: Path, git_info: Dict) -> None:
+    """Object store size, as git reports it (sizes are in KiB)."""
+    try:
+        counts = {}
+        async for line in _git_lines(repo_path, ['count-objects', '-v'], git_info['command_timings']):
+            key, _, value = line.decode().partition(': ')
+            counts[key] = value
+        git_info['loose_object_count'] = int(counts.get('count', 0))
+        git_info['loose_object_bytes'] = int(counts.get('size', 0)) * 1024
+        git_info['pack_count'] = int(counts.get('packs', 0))
+        git_info['pack_bytes'] = int(counts.get('size-pack', 0)) * 1024
+        git_info['git_dir_size_bytes'] = (git_info['loose_object_bytes'] + git_info['pack_bytes']
+                                          + int(counts.get('size-garbage', 0)) * 1024)
+    except (subprocess.CalledProcessError, ValueError, FileNotFoundError):
+        pass
+
+
+async def _count_commits(repo_path: Path, git_info: Dict) -> None:
+    """Commits reachable from any ref."""
+    try:
+        async for line in _git_lines(repo_path, ['rev-list', '--all', '--count'], git_info['command_timings']):
+            git_info['commit_count'] = int(line)
+    except (subprocess.CalledProcessError, ValueError, FileNotFoundError):
+        pass
+
+
+async def _count_refs(repo_path: Path, git_info: Dict) -> None:
+    """Branches and tags, counted from one stream of ref names."""
+    branch_count = 0
+    tag_count = 0
+    try:
+        async for refname in _git_lines(repo_path, ['for-each-ref', '--format=%(refname)'],
+                                        git_info['command_timings']):
+            if refname.startswith(BRANCH_REF_PREFIXES):
+                branch_count += 1
+            elif refname.startswith(TAG_REF_PREFIX):
+                tag_count += 1
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return
+    git_info['branch_count'] = branch_count
+    git_info['tag_count'] = tag_count
+
+
+async def _count_remotes(repo_path: Path, git_info: Dict) -> None:
+    """Configured remotes."""
+    try:
+        remote_count = 0
+        async for line in _git_lines(repo_path, ['remote'], git_info['command_timings']):
+            if line.strip():
+                remote_count += 1
+        git_info['remote_count'] = remote_count
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        pass
+
+
+async def collect_git_metadata(repo_path: Path) -> Dict:
+    """Collect the Git metadata of one repository.
+    
+    The git commands are independent, so they run as concurrent
+    subprocesses; git_info['command_timings'] holds the seconds each took.
+    """
+    git_info = new_git_info()
+    if not (Path(repo_path) / '.git').exists():
+        return git_info
+    
+    git_info['is_git_repo'] = True
+    await asyncio.gather(
+        _count_objects(repo_path, git_info),
+        _count_commits(repo_path, git_info),
+        _count_refs(repo_path, git_info),
+        _count_remotes(repo_path, git_info)
+    )
+    return git_info
+
+
+async def collect_git_metadata_many(repo_paths: Iterable[Path],
+                                    concurrency: int = GIT_METADATA_CONCURRENCY) -> Dict[str, Dict]:
+    """Collect the Git metadata of many repositories, keyed by path.
+    
+    At most `concurrency` repositories are queried at a time, which bounds
+    the git processes running at once to four times that.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    
+    async def collect(repo_path):
+        async with semaphore:
+            return await collect_git_metadata(repo_path)
+    
+    repo_paths = [str(repo_path) for repo_path in repo_paths]
+    results = await asyncio.gather(*(collect(repo_path) for repo_path in repo_paths))
+    return dict(zip(repo_paths, results))
+
 
 class FileMetrics(NamedTuple):
     """Represents metrics for a single file."""
@@ -31,6 +206,216 @@ class FileMetrics(NamedTuple):
     file_type: str
 
 
+class FileMetricsTable:
+    """Columnar store of per-file metrics.
+    
+    Paths are split into a directory, interned once for all of its files,
+    and a file name kept in one UTF-8 buffer. Sizes, line counts, category
+    codes and binary flags live in typed arrays, so a file costs a few dozen
+    bytes instead of a FileMetrics tuple with its own path string and ints.
+    """
+    
+    def __init__(self, categories: Iterable[str]):
+        self.categories = list(categories)
+        self._category_codes = {category: code for code, category in enumerate(self.categories)}
+        self.directories: List[str] = []
+        self._directory_ids: Dict[str, int] = {}
+        self.directory_ids = array('I')
+        self._names = bytearray()
+        self._name_offsets = array('Q', [0])
+        self.sizes = array('Q')
+        self.line_counts = array('Q')
+        self.category_codes = array('B')
+        self.binary_flags = array('B')
+    
+    def __len__(self) -> int:
+        return len(self.sizes)
+    
+    def __iter__(self) -> Iterator[FileMetrics]:
+        return (self.row(index) for index in range(len(self)))
+    
+    def append(self, path: str, size_bytes: int, line_count: int, is_binary: bool, file_type: str) -> None:
+        """Add the metrics of one file."""
+        directory, _, name = path.rpartition(os.sep)
+        directory_id = self._directory_ids.get(directory)
+        if directory_id is None:
+            directory_id = self._directory_ids[directory] = len(self.directories)
+            self.directories.append(directory)
+        
+        self.directory_ids.append(directory_id)
+        self._names += name.encode('utf-8', errors='surrogateescape')
+        self._name_offsets.append(len(self._names))
+        self.sizes.append(size_bytes)
+        self.line_counts.append(line_count)
+        self.category_codes.append(self._category_codes[file_type])
+        self.binary_flags.append(is_binary)
+    
+    def extend(self, file_metrics: Iterable[FileMetrics]) -> None:
+        """Add FileMetrics rows."""
+        for metrics in file_metrics:
+            self.append(*metrics)
+    
+    def name(self, index: int) -> str:
+        """File name of one file."""
+        return self._names[self._name_offsets[index]:self._name_offsets[index + 1]].decode(
+            'utf-8', errors='surrogateescape')
+    
+    def path(self, index: int) -> str:
+        """Relative path of one file."""
+        name = self.name(index)
+        directory = self.directories[self.directory_ids[index]]
+        return f"{directory}{os.sep}{name}" if directory else name
+    
+    def row(self, index: int) -> FileMetrics:
+        """Metrics of one file as a FileMetrics tuple."""
+        return FileMetrics(
+            path=self.path(index),
+            size_bytes=self.sizes[index],
+            line_count=self.line_counts[index],
+            is_binary=bool(self.binary_flags[index]),
+            file_type=self.categories[self.category_codes[index]]
+        )
+    
+    def export(self, output_path: Path) -> None:
+        """Write the columns to a Parquet (needs pyarrow) or NPZ (needs numpy) file."""
+        suffix = Path(output_path).suffix.lower()
+        if suffix == '.parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            
+            table = pa.table({
+                'directory': pa.DictionaryArray.from_arrays(
+                    pa.array(self.directory_ids, type=pa.uint32()), pa.array(self.directories, type=pa.string())),
+                'name': pa.array([self.name(index) for index in range(len(self))], type=pa.string()),
+                'size_bytes': pa.array(self.sizes, type=pa.uint64()),
+                'line_count': pa.array(self.line_counts, type=pa.uint64()),
+                'is_binary': pa.array(self.binary_flags, type=pa.uint8()).cast(pa.bool_()),
+                'file_type': pa.DictionaryArray.from_arrays(
+                    pa.array(self.category_codes, type=pa.uint8()), pa.array(self.categories, type=pa.string()))
+            })
+            pq.write_table(table, str(output_path))
+        elif suffix == '.npz':
+            import numpy as np
+            
+            np.savez_compressed(
+                str(output_path),
+                directories=np.array(self.directories, dtype=str),
+                directory_ids=np.frombuffer(self.directory_ids, dtype=np.uint32),
+                names=np.frombuffer(bytes(self._names), dtype=np.uint8),
+                name_offsets=np.frombuffer(self._name_offsets, dtype=np.uint64),
+                size_bytes=np.frombuffer(self.sizes, dtype=np.uint64),
+                line_count=np.frombuffer(self.line_counts, dtype=np.uint64),
+                categories=np.array(self.categories, dtype=str),
+                category_codes=np.frombuffer(self.category_codes, dtype=np.uint8),
+                is_binary=np.frombuffer(self.binary_flags, dtype=np.uint8).astype(bool)
+            )
+        else:
+            raise ValueError(f"Unsupported export format: {output_path} (use .parquet or .npz)")
+
+
+class SizeAggregator:
+    """Streaming aggregation of per-file metrics for the size report.
+    
+    Files are added one at a time as they are measured. Only category
+    counters, a min-heap of the K largest files and the totals of
+    directories up to rollup_depth levels are kept, so memory does not grow
+    with the number of files and a summary can be taken at any point.
+    """
+    
+    def __init__(self, top_k: int = TOP_K, rollup_depth: int = 2):
+        self.top_k = top_k
+        self.rollup_depth = rollup_depth
+        self.total_files = 0
+        self.large_file_count = 0
+        self.small_file_count = 0
+        # Per category, in order of first appearance: [file count, size, lines, binary files, max lines]
+        self.category_totals: Dict[str, List[int]] = {}
+        # (size, -sequence, row) of the largest files; the smallest of them is on top
+        self._largest_files: List[Tuple[int, int, FileMetrics]] = []
+        # Directory -> [file count, size, lines], subdirectories included
+        self.directory_totals: Dict[str, List[int]] = {}
+        self._last_directory = None
+        self._last_rollups: List[List[int]] = []
+    
+    def add(self, path: str, size_bytes: int, line_count: int, is_binary: bool, file_type: str) -> None:
+        """Fold the metrics of one file into the aggregates."""
+        self.total_files += 1
+        if size_bytes > LARGE_FILE_BYTES:
+            self.large_file_count += 1
+        elif size_bytes < SMALL_FILE_BYTES:
+            self.small_file_count += 1
+        
+        totals = self.category_totals.get(file_type)
+        if totals is None:
+            totals = self.category_totals[file_type] = [0, 0, 0, 0, 0]
+        totals[0] += 1
+        totals[1] += size_bytes
+        totals[2] += line_count
+        totals[3] += is_binary
+        if line_count > totals[4]:
+            totals[4] = line_count
+        
+        # Ties keep the file seen first, as a stable sort by size would
+        entry = (size_bytes, -self.total_files)
+        if len(self._largest_files) < self.top_k:
+            heapq.heappush(self._largest_files, entry + (FileMetrics(path, size_bytes, line_count, is_binary, file_type),))
+        elif entry > self._largest_files[0][:2]:
+            heapq.heapreplace(self._largest_files, entry + (FileMetrics(path, size_bytes, line_count, is_binary, file_type),))
+        
+        for rollup in self._directory_rollups(path.rpartition(os.sep)[0]):
+            rollup[0] += 1
+            rollup[1] += size_bytes
+            rollup[2] += line_count
+    
+    def add_rows(self, file_metrics: Iterable[FileMetrics]) -> None:
+        """Fold FileMetrics rows into the aggregates."""
+        for metrics in file_metrics:
+            self.add(*metrics)
+    
+    def _directory_rollups(self, directory: str) -> List[List[int]]:
+        """Totals of a directory and of its ancestors up to rollup_depth levels."""
+        # Walks yield the files of a directory together, so this is mostly a cache hit
+        if directory != self._last_directory:
+            self._last_directory = directory
+            parts = directory.split(os.sep)[:self.rollup_depth] if directory else []
+            self._last_rollups = [
+                self.directory_totals.setdefault(os.sep.join(parts[:depth]), [0, 0, 0])
+                for depth in range(1, len(parts) + 1)
+            ]
+        return self._last_rollups
+    
+    @property
+    def total_size_bytes(self) -> int:
+        return sum(totals[1] for totals in self.category_totals.values())
+    
+    @property
+    def total_lines(self) -> int:
+        return sum(totals[2] for totals in self.category_totals.values())
+    
+    def category_stats(self) -> Dict[str, Dict[str, int]]:
+        """Statistics per category."""
+        return {
+            category: {
+                'file_count': file_count,
+                'total_size_bytes': size_bytes,
+                'total_lines': line_count,
+                'binary_files': binary_files,
+                'max_lines': max_lines
+            }
+            for category, (file_count, size_bytes, line_count, binary_files, max_lines)
+            in self.category_totals.items()
+        }
+    
+    def largest_files(self) -> List[FileMetrics]:
+        """The K largest files, largest first."""
+        return [row for _, _, row in sorted(self._largest_files, reverse=True)]
+    
+    def largest_directories(self) -> List[Tuple[str, int, int, int]]:
+        """(directory, files, size, lines) of the K largest rolled-up directories."""
+        largest = heapq.nlargest(self.top_k, self.directory_totals.items(), key=lambda item: (item[1][1], item[0]))
+        return [(directory, files, size_bytes, lines) for directory, (files, size_bytes, lines) in largest]
+
+
 class RepoSizeMetricsCalculator:
     """Calculates comprehensive repository size and complexity metrics."""
     
@@ -68,22 +453,29 @@ class RepoSizeMetricsCalculator:
     }
     
     # Binary file extensions (files we shouldn't count lines for)
-    BINARY_EXTENSIONS = {
-        '.png', '.jpg', '.jpeg', '.gif', '.ico', '.webp', '.bmp', '.tiff',
-        '.mp4', '.avi', '.mov', '.mp3', '.wav', '.ogg', '.flac',
-        '.zip', '.tar', '.gz', '.bz2', '.7z', '.rar',
-        '.exe', '.dll', '.so', '.dylib', '.bin', '.app',
-        '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
-        '.sqlite', '.db', '.parquet'
-    }
+    BINARY_EXTENSIONS = BINARY_EXTENSIONS
     
-    def __init__(self, repo_path: str, output_file: str = None):
+    def __init__(self, repo_path: str, output_file: str = None, cache_dir: str = None,
+                 use_cache: bool = True, workers: int = 8, source: str = 'worktree',
+                 export_file: str = None, rollup_depth: int = 2, snapshot_every: int = 0):
+        if source not in SOURCE_MODES:
+            raise ValueError(f"Unknown source: {source}")
         self.repo_path = Path(repo_path).resolve()
+        self.source = source
+        self.export_file = export_file
+        self.rollup_depth = rollup_depth
+        # Rewrite the report every this many files while the analysis runs (0 = only at the end)
+        self.snapshot_every = snapshot_every
+        self._git_info = None
         self.output_file = output_file or self.repo_path / "repo-size-metrics.md"
+        self.file_metrics_cache = FileMetricsCache(self.repo_path, cache_dir, use_cache)
+        # stat and read release the GIL, so threads overlap the I/O of many files
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self._cache_lock = threading.Lock()
         self.exclude_patterns = [
             'node_modules', 'dist', 'bin', 'obj', 'build', 'target', 
             'vendor', 'packages', '.git', '__pycache__', '.pytest_cache',
-            '.next', '.turbo', '.cache', 'coverage', 'out', 'tmp'
+            '.next', '.turbo', '.cache', 'coverage', 'out', 'tmp', CACHE_DIR_NAME
         ]
         
     def should_exclude_path(self, path: Path) -> bool:
@@ -100,13 +492,23 @@ class RepoSizeMetricsCalculator:
         # For unknown extensions, check content (sample first 1024 bytes)
         try:
             with open(file_path, 'rb') as f:
-                chunk = f.read(1024)
-                if b'\0' in chunk:  # Null bytes indicate binary
-                    return True
+                return self.is_binary_content(file_path, f.read(1024))
         except (IOError, OSError):
             return True  # Assume binary if can't read
-        
-        return False
+    
+    def is_binary_content(self, file_path: Path, head: bytes) -> bool:
+        """Determine if a file is binary from its extension and its first 1024 bytes."""
+        if file_path.suffix.lower() in self.BINARY_EXTENSIONS:
+            return True
+        return b'\0' in head[:1024]  # Null bytes indicate binary
+    
+    def new_aggregator(self) -> SizeAggregator:
+        """Create an empty streaming aggregation for the size report."""
+        return SizeAggregator(TOP_K, self.rollup_depth)
+    
+    def new_table(self) -> FileMetricsTable:
+        """Create an empty per-file metrics table with this calculator's categories."""
+        return FileMetricsTable(list(self.FILE_CATEGORIES) + ['Other'])
     
     def get_file_category(self, file_path: Path) -> str:
         """Categorize file based on extension."""
@@ -118,26 +520,47 @@ class RepoSizeMetricsCalculator:
         
         return 'Other'
     
-    def count_lines_in_file(self, file_path: Path) -> int:
-        """Count lines in a text file."""
-        if self.is_binary_file(file_path):
-            return 0
+    def measure_file(self, file_path: Path) -> Tuple[int, bool]:
+        """Count lines and detect binary content in a single read of the file.
+        
+        Returns (line count, is binary).
+        """
+        if file_path.suffix.lower() in self.BINARY_EXTENSIONS:
+            return 0, True
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return sum(1 for _ in f)
-        except (IOError, UnicodeDecodeError):
-            return 0
+            with open(file_path, 'rb') as f:
+                head = f.read(READ_CHUNK_SIZE)
+                if self.is_binary_content(file_path, head):
+                    return 0, True
+                
+                chunks = iter(lambda: f.read(READ_CHUNK_SIZE), b'')
+                return count_text_lines(itertools.chain((head,), chunks)), False
+        except (IOError, OSError):
+            return 0, True  # Assume binary if can't read
+    
+    def count_lines_in_file(self, file_path: Path) -> int:
+        """Count lines in a text file."""
+        return self.measure_file(file_path)[0]
     
     def analyze_file(self, file_path: Path) -> FileMetrics:
         """Analyze a single file and return its metrics."""
         try:
-            size_bytes = file_path.stat().st_size
+            stat = file_path.stat()
+            size_bytes = stat.st_size
         except (OSError, IOError):
+            stat = None
             size_bytes = 0
         
-        is_binary = self.is_binary_file(file_path)
-        line_count = 0 if is_binary else self.count_lines_in_file(file_path)
+        # The cache is shared by the worker threads; only its bookkeeping is locked
+        with self._cache_lock:
+            cached = self.file_metrics_cache.lookup(file_path, SIZE_CACHE_NAMESPACE, stat)
+        if cached is not None:
+            line_count, is_binary = cached
+        else:
+            line_count, is_binary = self.measure_file(file_path)
+            with self._cache_lock:
+                self.file_metrics_cache.store(file_path, SIZE_CACHE_NAMESPACE, [line_count, is_binary])
         file_type = self.get_file_category(file_path)
         
         relative_path = file_path.relative_to(self.repo_path)
@@ -150,103 +573,73 @@ class RepoSizeMetricsCalculator:
             file_type=file_type
         )
     
+    def analyze_files(self, file_paths: List[Path]) -> List[FileMetrics]:
+        """Analyze a batch of files in one worker thread."""
+        return [self.analyze_file(file_path) for file_path in file_paths]
+    
     def get_git_repository_size(self) -> Dict:
         """Get Git repository size information."""
-        git_info = {
-            'is_git_repo': False,
-            'git_dir_size_bytes': 0,
-            'commit_count': 0,
-            'branch_count': 0,
-            'tag_count': 0,
-            'remote_count': 0
-        }
-        
-        git_dir = self.repo_path / '.git'
-        if not git_dir.exists():
-            return git_info
-        
-        git_info['is_git_repo'] = True
+        git_info = asyncio.run(collect_git_metadata(self.repo_path))
+        for command, seconds in sorted(git_info['command_timings'].items()):
+            logger.debug(f"git {command}: {seconds:.3f}s")
+        return git_info
+    
+    def analyze_repository(self) -> Dict:
+        """Analyze entire repository for size metrics.
         
-        # Calculate .git directory size
-        try:
-            git_size = 0
-            for root, dirs, files in os.walk(git_dir):
-                for file in files:
-                    file_path = Path(root) / file
-                    try:
-                        git_size += file_path.stat().st_size
-                    except (OSError, IOError):
-                        continue
-            git_info['git_dir_size_bytes'] = git_size
-        except (OSError, IOError):
-            pass
+        Files are aggregated as they are measured; the full per-file table
+        is only kept when it is exported.
+        """
+        logger.info(f"Analyzing repository: {self.repo_path} (source: {self.source})")
         
-        # Get Git statistics using git commands
-        try:
-            # Commit count
-            result = subprocess.run(
-                ['git', 'rev-list', '--all', '--count'],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            git_info['commit_count'] = int(result.stdout.strip())
-        except (subprocess.CalledProcessError, ValueError, FileNotFoundError):
-            pass
+        index_entries = None
+        if self.source == 'git-index':
+            try:
+                index_entries = self.get_index_entries()
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                logger.warning("Could not read the Git index, will analyze the working tree")
+                self.source = 'worktree'
         
-        try:
-            # Branch count
-            result = subprocess.run(
-                ['git', 'branch', '-a'],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            branches = [line.strip() for line in result.stdout.split('\n') if line.strip()]
-            git_info['branch_count'] = len(branches)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            pass
+        aggregator = self.new_aggregator()
+        table = self.new_table() if self.export_file else None
+        if self.source == 'git-index':
+            rows = self.iter_git_index_metrics(index_entries)
+        else:
+            rows = self.iter_worktree_metrics()
         
-        try:
-            # Tag count
-            result = subprocess.run(
-                ['git', 'tag'],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            tags = [line.strip() for line in result.stdout.split('\n') if line.strip()]
-            git_info['tag_count'] = len(tags)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            pass
+        for metrics in rows:
+            aggregator.add(*metrics)
+            if table is not None:
+                table.append(*metrics)
+            if self.snapshot_every and aggregator.total_files % self.snapshot_every == 0:
+                self.write_report(self.build_analysis_data(aggregator, table, partial=True))
         
-        try:
-            # Remote count
-            result = subprocess.run(
-                ['git', 'remote'],
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            remotes = [line.strip() for line in result.stdout.split('\n') if line.strip()]
-            git_info['remote_count'] = len(remotes)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            pass
+        logger.info(f"Analyzed {aggregator.total_files} files")
+        if self.source == 'worktree':
+            self.file_metrics_cache.save()
         
-        return git_info
+        return self.build_analysis_data(aggregator, table)
     
-    def analyze_repository(self) -> Dict:
-        """Analyze entire repository for size metrics."""
-        logger.info(f"Analyzing repository: {self.repo_path}")
-        
-        all_files = []
-        file_metrics = []
-        
-        # Get all files
+    def iter_worktree_metrics(self) -> Iterator[FileMetrics]:
+        """Measure the files of the working tree, in walk order, on the thread pool."""
+        analyzed = 0
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch in self.iter_file_batches():
+                pending.append(executor.submit(self.analyze_files, batch))
+                # Bound the batches in flight so results are consumed as the walk goes
+                if len(pending) >= 2 * self.workers:
+                    batch_metrics = pending.popleft().result()
+                    yield from batch_metrics
+                    analyzed += len(batch_metrics)
+                    if analyzed % 10240 < FILES_PER_TASK:
+                        logger.info(f"Analyzed {analyzed} files")
+            while pending:
+                yield from pending.popleft().result()
+    
+    def iter_file_batches(self) -> Iterator[List[Path]]:
+        """Walk the repository and yield the files to analyze in batches."""
+        batch = []
         for root, dirs, files in os.walk(self.repo_path):
             # Remove excluded directories from traversal
             dirs[:] = [d for d in dirs if not any(pattern in d for pattern in self.exclude_patterns)]
@@ -254,51 +647,178 @@ class RepoSizeMetricsCalculator:
             for file in files:
                 file_path = Path(root) / file
                 if not self.should_exclude_path(file_path):
-                    all_files.append(file_path)
+                    batch.append(file_path)
+                    if len(batch) == FILES_PER_TASK:
+                        yield batch
+                        batch = []
+        if batch:
+            yield batch
+    
+    def _run_git_bytes(self, args: List[str], input_data: bytes = None) -> bytes:
+        """Run a git command in the repository and return its raw output."""
+        return subprocess.run(
+            ['git', *args],
+            cwd=self.repo_path,
+            input=input_data,
+            capture_output=True,
+            check=True
+        ).stdout
+    
+    def get_index_entries(self) -> List[Tuple[str, str]]:
+        """List (relative path, blob SHA) of every tracked file in the Git index."""
+        entries = {}
+        for record in self._run_git_bytes(['ls-files', '-s', '-z']).split(b'\0'):
+            # <mode> <blob> <stage>\t<path>
+            meta, _, path = record.partition(b'\t')
+            if not path:
+                continue
+            mode, blob, _ = meta.decode('ascii').split(' ')
+            if mode == GITLINK_MODE:
+                continue
+            # Conflicted paths have several stages; any of them describes the file
+            entries.setdefault(path.decode('utf-8', errors='replace'), blob)
+        return list(entries.items())
+    
+    def get_blob_sizes(self, blobs: List[str]) -> Dict[str, int]:
+        """Get blob sizes from git cat-file --batch-check without reading their contents."""
+        if not blobs:
+            return {}
         
-        logger.info(f"Found {len(all_files)} files to analyze")
+        output = self._run_git_bytes(['cat-file', '--batch-check'], '\n'.join(blobs).encode('ascii') + b'\n')
+        sizes = {}
+        for line in output.decode('ascii', errors='replace').splitlines():
+            fields = line.split(' ')
+            if len(fields) == 3:  # <sha> <type> <size>; missing objects are '<sha> missing'
+                sizes[fields[0]] = int(fields[2])
+        return sizes
+    
+    def iter_blob_measurements(self, blobs: List[str]) -> Iterator[Tuple[str, int, int, bool]]:
+        """Stream blobs through git cat-file --batch and yield (blob, size, lines, is binary).
         
-        # Analyze each file
-        total_size_bytes = 0
-        total_lines = 0
-        category_stats = {}
+        Contents are read in chunks straight from the object store, so the
+        working tree is never touched.
+        """
+        if not blobs:
+            return
         
-        for i, file_path in enumerate(all_files):
-            if i % 1000 == 0 and i > 0:
-                logger.info(f"Analyzed {i}/{len(all_files)} files")
-            
-            metrics = self.analyze_file(file_path)
-            file_metrics.append(metrics)
-            
-            total_size_bytes += metrics.size_bytes
-            total_lines += metrics.line_count
-            
-            # Update category statistics
-            category = metrics.file_type
-            if category not in category_stats:
-                category_stats[category] = {
-                    'file_count': 0,
-                    'total_size_bytes': 0,
-                    'total_lines': 0,
-                    'binary_files': 0
-                }
-            
-            category_stats[category]['file_count'] += 1
-            category_stats[category]['total_size_bytes'] += metrics.size_bytes
-            category_stats[category]['total_lines'] += metrics.line_count
-            if metrics.is_binary:
-                category_stats[category]['binary_files'] += 1
+        process = subprocess.Popen(
+            ['git', 'cat-file', '--batch'],
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        
+        def feed():
+            # Written from a thread so that neither pipe can fill up and block
+            try:
+                for blob in blobs:
+                    process.stdin.write(blob.encode('ascii') + b'\n')
+                process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        
+        out = process.stdout
+        try:
+            for _ in blobs:
+                header = out.readline().split()
+                if len(header) != 3:
+                    if not header:
+                        break  # git exited early
+                    continue  # '<sha> missing'
+                blob, size = header[0].decode('ascii'), int(header[2])
+                
+                head = out.read(min(size, READ_CHUNK_SIZE))
+                remaining = size - len(head)
+                is_binary = b'\0' in head[:1024]
+                
+                def rest(remaining=remaining):
+                    while remaining > 0:
+                        chunk = out.read(min(remaining, READ_CHUNK_SIZE))
+                        if not chunk:
+                            break
+                        remaining -= len(chunk)
+                        yield chunk
+                
+                if is_binary:
+                    for _ in rest():
+                        pass
+                    line_count = 0
+                else:
+                    line_count = count_text_lines(itertools.chain((head,), rest()))
+                out.read(1)  # Newline after the contents
+                
+                yield blob, size, line_count, is_binary
+        finally:
+            out.close()
+            process.wait()
+            feeder.join()
+    
+    def iter_git_index_metrics(self, index_entries: List[Tuple[str, str]] = None) -> Iterator[FileMetrics]:
+        """Measure the tracked files from the Git object store instead of the working tree.
+        
+        Exclude patterns are matched against paths relative to the repository.
+        Each distinct blob is measured once; files with a binary extension
+        only have their size looked up. index_entries may be passed by callers
+        that already read the index.
+        """
+        if index_entries is None:
+            index_entries = self.get_index_entries()
+        entries = [(path, blob) for path, blob in index_entries
+                   if not self.should_exclude_path(Path(path))]
+        logger.info(f"Found {len(entries)} tracked files to analyze")
+        
+        binary_blobs = set()
+        text_blobs = set()
+        for path, blob in entries:
+            if Path(path).suffix.lower() in self.BINARY_EXTENSIONS:
+                binary_blobs.add(blob)
+            else:
+                text_blobs.add(blob)
         
-        # Get Git repository information
-        git_info = self.get_git_repository_size()
+        measurements = {blob: (size, 0, True) for blob, size in self.get_blob_sizes(sorted(binary_blobs)).items()}
+        for i, (blob, size, line_count, is_binary) in enumerate(self.iter_blob_measurements(sorted(text_blobs)), 1):
+            measurements[blob] = (size, line_count, is_binary)
+            if i % 10000 == 0:
+                logger.info(f"Measured {i}/{len(text_blobs)} blobs")
+        
+        for path, blob in entries:
+            size_bytes, line_count, is_binary = measurements.get(blob, (0, 0, True))
+            file_path = Path(path)
+            yield FileMetrics(str(file_path), size_bytes, line_count, is_binary, self.get_file_category(file_path))
+    
+    def summarize_file_metrics(self, file_metrics: Iterable[FileMetrics]) -> Dict:
+        """Aggregate per-file metrics into totals and category statistics.
+        
+        file_metrics is a FileMetricsTable or any iterable of FileMetrics rows.
+        """
+        aggregator = self.new_aggregator()
+        aggregator.add_rows(file_metrics)
+        table = file_metrics if isinstance(file_metrics, FileMetricsTable) else None
+        return self.build_analysis_data(aggregator, table)
+    
+    def build_analysis_data(self, aggregator: SizeAggregator, table: Optional[FileMetricsTable] = None,
+                            partial: bool = False) -> Dict:
+        """Collect the report data from a (possibly still running) aggregation."""
+        # Get Git repository information, once per run
+        if self._git_info is None:
+            self._git_info = self.get_git_repository_size()
         
         return {
-            'file_metrics': file_metrics,
-            'total_files': len(all_files),
-            'total_size_bytes': total_size_bytes,
-            'total_lines': total_lines,
-            'category_stats': category_stats,
-            'git_info': git_info
+            'file_metrics': table,
+            'partial': partial,
+            'total_files': aggregator.total_files,
+            'total_size_bytes': aggregator.total_size_bytes,
+            'total_lines': aggregator.total_lines,
+            'category_stats': aggregator.category_stats(),
+            'largest_files': aggregator.largest_files(),
+            'largest_directories': aggregator.largest_directories(),
+            'large_file_count': aggregator.large_file_count,
+            'small_file_count': aggregator.small_file_count,
+            'git_info': self._git_info
         }
     
     def format_bytes(self, bytes_value: int) -> str:
@@ -311,7 +831,6 @@ class RepoSizeMetricsCalculator:
     
     def generate_report(self, analysis_data: Dict) -> str:
         """Generate comprehensive repository size metrics report."""
-        file_metrics = analysis_data['file_metrics']
         total_files = analysis_data['total_files']
         total_size_bytes = analysis_data['total_size_bytes']
         total_lines = analysis_data['total_lines']
@@ -319,21 +838,24 @@ class RepoSizeMetricsCalculator:
         git_info = analysis_data['git_info']
         
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        status = ("\n> **In progress**: partial results, the analysis is still running.\n"
+                  if analysis_data.get('partial') else "")
         
         report = f"""# Repository Size Metrics Report
 
 **Analysis Date**: {timestamp}  
 **Repository Path**: {self.repo_path}  
+**Files Measured**: {'Tracked files in the Git index' if self.source == 'git-index' else 'Working tree'}  
 **Total Files**: {total_files:,}  
 **Total Size**: {self.format_bytes(total_size_bytes)}  
 **Total Lines of Code**: {total_lines:,}
-
+{status}
 ## Overview Summary
 
 | Metric | Value |
 |--------|-------|
 | Repository Size (excluding .git) | {self.format_bytes(total_size_bytes)} |
-| Git Repository Size (.git directory) | {self.format_bytes(git_info['git_dir_size_bytes'])} |
+| Git Repository Size (object store) | {self.format_bytes(git_info['git_dir_size_bytes'])} |
 | Total Repository Size | {self.format_bytes(total_size_bytes + git_info['git_dir_size_bytes'])} |
 | File Count | {total_files:,} |
 | Lines of Code | {total_lines:,} |
@@ -368,7 +890,9 @@ class RepoSizeMetricsCalculator:
         if git_info['is_git_repo']:
             report += f"""| Metric | Value |
 |--------|-------|
-| Git Directory Size | {self.format_bytes(git_info['git_dir_size_bytes'])} |
+| Git Object Store Size | {self.format_bytes(git_info['git_dir_size_bytes'])} |
+| Packed Objects | {self.format_bytes(git_info['pack_bytes'])} in {git_info['pack_count']} packs |
+| Loose Objects | {self.format_bytes(git_info['loose_object_bytes'])} in {git_info['loose_object_count']:,} objects |
 | Total Commits | {git_info['commit_count']:,} |
 | Branches | {git_info['branch_count']} |
 | Tags | {git_info['tag_count']} |
@@ -377,22 +901,32 @@ class RepoSizeMetricsCalculator:
         else:
             report += "This directory is not a Git repository.\n"
         
-        report += """
+        report += f"""
 ## Largest Files
 
-Top 20 largest files in the repository:
+Top {TOP_K} largest files in the repository:
 
 | File | Size | Type | Lines |
 |------|------|------|-------|
 """
         
-        # Sort files by size (descending) and show top 20
-        largest_files = sorted(file_metrics, key=lambda x: x.size_bytes, reverse=True)[:20]
-        
-        for file_metric in largest_files:
+        for file_metric in analysis_data['largest_files']:
             lines_str = f"{file_metric.line_count:,}" if not file_metric.is_binary else "Binary"
             report += f"| {file_metric.path} | {self.format_bytes(file_metric.size_bytes)} | {file_metric.file_type} | {lines_str} |\n"
         
+        report += f"""
+## Largest Directories
+
+Top {TOP_K} directories up to {self.rollup_depth} levels deep, subdirectories included:
+
+| Directory | Files | Size | % of Size | Lines |
+|-----------|-------|------|-----------|-------|
+"""
+        
+        for directory, file_count, size_bytes, lines in analysis_data['largest_directories']:
+            size_percent = round((size_bytes / total_size_bytes) * 100, 1) if total_size_bytes > 0 else 0
+            report += f"| {directory} | {file_count:,} | {self.format_bytes(size_bytes)} | {size_percent}% | {lines:,} |\n"
+        
         report += """
 ## Code Density Analysis
 
@@ -409,11 +943,7 @@ Analysis of lines of code per file type:
                 total_lines_cat = stats['total_lines']
                 avg_lines = total_lines_cat // file_count if file_count > 0 else 0
                 
-                # Find max lines for this category
-                max_lines = 0
-                for fm in file_metrics:
-                    if fm.file_type == category and fm.line_count > max_lines:
-                        max_lines = fm.line_count
+                max_lines = stats['max_lines']
                 
                 report += f"| {category} | {total_lines_cat:,} | {file_count:,} | {avg_lines} | {max_lines:,} |\n"
         
@@ -455,18 +985,18 @@ Analysis of lines of code per file type:
 """
         
         # Check for large files
-        large_files = [fm for fm in file_metrics if fm.size_bytes > 10 * 1024 * 1024]  # > 10MB
-        if large_files:
+        large_file_count = analysis_data['large_file_count']  # > 10MB
+        if large_file_count:
             report += f"""
-**Large Files Detected**: {len(large_files)} files larger than 10MB
+**Large Files Detected**: {large_file_count} files larger than 10MB
 - Consider using Git LFS for these files
 - Review if these files should be in version control
 
 """
         
         # Check for many small files
-        small_files = [fm for fm in file_metrics if fm.size_bytes < 1024]  # < 1KB
-        if len(small_files) > total_files * 0.3:  # > 30% small files
+        small_file_count = analysis_data['small_file_count']  # < 1KB
+        if small_file_count > total_files * 0.3:  # > 30% small files
             report += """
 **Many Small Files**: High proportion of very small files detected
 - Consider consolidating configuration files
@@ -489,19 +1019,38 @@ Analysis of lines of code per file type:
         
         return report
     
-    def run_analysis(self) -> None:
-        """Run complete repository size analysis."""
-        analysis_data = self.analyze_repository()
+    def write_report(self, analysis_data: Dict) -> Path:
+        """Generate the report and write it to the output file."""
         report = self.generate_report(analysis_data)
         
-        # Save report
         output_path = Path(self.output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(report)
+        return output_path
+    
+    def run_analysis(self, analysis_data: Dict = None) -> None:
+        """Run complete repository size analysis.
+        
+        analysis_data may be supplied by a caller that already measured the
+        files (see onboarding_pipeline.py); otherwise the tree is walked.
+        """
+        if analysis_data is None:
+            analysis_data = self.analyze_repository()
         
+        # Save report
+        output_path = self.write_report(analysis_data)
         logger.info(f"Analysis complete. Report saved to: {output_path}")
+        
+        if self.export_file and analysis_data['file_metrics'] is not None:
+            try:
+                analysis_data['file_metrics'].export(self.export_file)
+                logger.info(f"Per-file metrics exported to: {self.export_file}")
+            except ImportError as e:
+                logger.error(f"Could not export per-file metrics, missing optional dependency: {e}")
+            except (ValueError, IOError, OSError) as e:
+                logger.error(f"Could not export per-file metrics: {e}")
 
 
 def main():
@@ -510,6 +1059,20 @@ def main():
     parser.add_argument('repo_path', help='Path to repository')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Directory for the file metrics cache (default: <repo>/.olaf-cache)')
+    parser.add_argument('--no-cache', action='store_true', help='Rescan every file without caching')
+    parser.add_argument('--source', choices=SOURCE_MODES, default='worktree',
+                        help='Measure the working tree, or the tracked files straight from the Git index '
+                             'and object store (default: worktree)')
+    parser.add_argument('-w', '--workers', type=int, default=8,
+                        help='Threads reading files concurrently (default: 8, 0 = one per CPU)')
+    parser.add_argument('--rollup-depth', type=int, default=2,
+                        help='Directory levels totalled for the largest directories table (default: 2)')
+    parser.add_argument('--snapshot-every', type=int, default=0, metavar='FILES',
+                        help='Rewrite the report with partial results every FILES files (default: 0 = only at the end)')
+    parser.add_argument('--export', default=None, metavar='PATH',
+                        help='Also write the per-file metrics columns to a .parquet (pyarrow) or .npz (numpy) file')
     
     args = parser.parse_args()
     
@@ -520,7 +1083,11 @@ def main():
         logger.error(f"Repository path does not exist: {args.repo_path}")
         sys.exit(1)
     
-    calculator = RepoSizeMetricsCalculator(args.repo_path, args.output)
+    calculator = RepoSizeMetricsCalculator(args.repo_path, args.output,
+                                           cache_dir=args.cache_dir, use_cache=not args.no_cache,
+                                           workers=args.workers, source=args.source,
+                                           export_file=args.export, rollup_depth=args.rollup_depth,
+                                           snapshot_every=args.snapshot_every)
     calculator.run_analysis()
 
 
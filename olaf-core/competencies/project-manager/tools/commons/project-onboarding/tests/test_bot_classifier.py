@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Automation detection of the contributor BotClassifier
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from contributor_analyzer import BotClassifier  # noqa: E402
+
+
+class BotClassifierTest(unittest.TestCase):
+
+    def test_bots(self):
+        classifier = BotClassifier()
+        for alias in [('dependabot[bot]', '49699333+dependabot[bot]@users.noreply.github.com'),
+                      ('buildbot', 'buildbot@example.com'),
+                      ('CircleCI', 'builds@circleci.com'),
+                      ('ci_runner', 'runner@example.com'),
+                      ('Jenkins', 'ci-bot@example.com'),
+                      ('Release Automation', 'release@example.com')]:
+            with self.subTest(alias=alias):
+                self.assertTrue(classifier.is_bot([alias]))
+
+    def test_humans(self):
+        classifier = BotClassifier()
+        for alias in [('Lucia Rossi', 'lucia@example.com'),
+                      ('Abbott Lee', 'abbott@example.com'),
+                      ('Cicero Dias', 'cicero@example.com'),
+                      ('Bottom Line', 'bottom@example.com')]:
+            with self.subTest(alias=alias):
+                self.assertFalse(classifier.is_bot([alias]))
+
+    def test_allowlist_and_denylist(self):
+        classifier = BotClassifier(allowlist=['Ann Talbot'], denylist=['release@example.com'])
+        self.assertFalse(classifier.is_bot([('Ann Talbot', 'ann@example.com')]))
+        self.assertTrue(classifier.is_bot([('Rel Eng', 'release@example.com')]))
+
+
+if __name__ == '__main__':
+    unittest.main()
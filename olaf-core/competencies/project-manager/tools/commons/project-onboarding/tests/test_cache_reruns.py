@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Reruns of the onboarding analyzers with the per-file metrics cache enabled
+
+The cache is written inside the analyzed repository, so a second run must
+not pick up the cache files and must report exactly what the first did, and
+git must not list them as untracked.
+"""
+
+import logging
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from language_distribution_analyzer import LanguageDistributionAnalyzer  # noqa: E402
+from onboarding_pipeline import VISITORS, OnboardingPipeline  # noqa: E402
+from repo_size_metrics_calculator import RepoSizeMetricsCalculator  # noqa: E402
+
+logging.disable(logging.INFO)
+
+FILES = {
+    'main.py': 'def main():\n    if True:\n        return 1\n',
+    'src/app.js': 'function app() {\n  return 2;\n}\n',
+    'src/config.json': '{"name": "fixture"}\n',
+    'docs/README.md': '# Fixture\n\nText\n',
+}
+
+
+def report_without_dates(path: Path) -> list:
+    """Lines of a report, without the ones that change with the time of the run."""
+    return [line for line in path.read_text(encoding='utf-8').splitlines() if 'Date' not in line]
+
+
+class CacheRerunTest(unittest.TestCase):
+    """Runs each analyzer twice over the same repository and compares the results."""
+
+    def setUp(self):
+        self.repo_path = Path(tempfile.mkdtemp(prefix='olaf-fixture-'))
+        self.addCleanup(shutil.rmtree, self.repo_path)
+        for name, content in FILES.items():
+            file_path = self.repo_path / name
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(content, encoding='utf-8')
+
+    def fixture_excludes(self, patterns: list) -> list:
+        """Drop, in place, the exclude patterns that the fixture's own path matches (e.g. 'tmp')."""
+        patterns[:] = [pattern for pattern in patterns if pattern not in str(self.repo_path)]
+        return patterns
+
+    def size_calculator(self):
+        calculator = RepoSizeMetricsCalculator(str(self.repo_path), workers=1)
+        self.fixture_excludes(calculator.exclude_patterns)
+        return calculator
+
+    def test_size_metrics(self):
+        def run():
+            data = self.size_calculator().analyze_repository()
+            return {key: value for key, value in data.items() if key != 'analysis_date'}
+
+        first = run()
+        self.assertTrue((self.repo_path / '.olaf-cache').is_dir())
+        self.assertEqual(first, run())
+        self.assertEqual(first['total_files'], len(FILES))
+
+    def test_language_distribution(self):
+        def run():
+            analyzer = LanguageDistributionAnalyzer(str(self.repo_path))
+            self.fixture_excludes(analyzer.exclude_patterns)
+            return analyzer.analyze_language_distribution()
+
+        first = run()
+        self.assertTrue((self.repo_path / '.olaf-cache').is_dir())
+        self.assertEqual(first, run())
+        self.assertEqual(first['total_files'], len(FILES))
+
+    def test_pipeline_reports(self):
+        output_dir = self.repo_path / 'reports'
+
+        def run():
+            visitors = [VISITORS[name](self.repo_path, output_dir) for name in ('language', 'size')]
+            for visitor in visitors:
+                self.fixture_excludes(visitor.exclude_patterns)
+            OnboardingPipeline(str(self.repo_path), visitors).run()
+            # The reports themselves are written into the repository too, so keep only their contents
+            reports = {name: report_without_dates(output_dir / name)
+                       for name in ('language-distribution.md', 'repo-size-metrics.md')}
+            shutil.rmtree(output_dir)
+            return reports
+
+        # The standalone size run leaves its cache behind for the pipeline to walk past
+        self.size_calculator().analyze_repository()
+        first = run()
+        self.assertEqual(first, run())
+        self.assertIn(f"**Total Files**: {len(FILES)}  ", first['language-distribution.md'])
+        self.assertFalse(any('.olaf-cache' in line for line in first['repo-size-metrics.md']))
+
+    @unittest.skipUnless(shutil.which('git'), 'git is not installed')
+    def test_cache_not_untracked(self):
+        subprocess.run(['git', 'init', '-q'], cwd=self.repo_path, check=True)
+        self.size_calculator().analyze_repository()
+        self.assertTrue((self.repo_path / '.olaf-cache').is_dir())
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=all'],
+                                cwd=self.repo_path, capture_output=True, text=True, check=True).stdout
+        self.assertNotIn('.olaf-cache', status)
+        self.assertIn('main.py', status)
+
+
+if __name__ == '__main__':
+    unittest.main()
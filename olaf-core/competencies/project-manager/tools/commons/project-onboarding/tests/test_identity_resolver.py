@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Display names and emails chosen by the contributor IdentityResolver
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from contributor_analyzer import IdentityResolver  # noqa: E402
+
+
+def resolve(*aliases):
+    """Resolve (name, email, commits, timestamp) aliases in the given order."""
+    resolver = IdentityResolver()
+    for name, email, commits, timestamp in aliases:
+        resolver.add(name, email, commits, timestamp)
+    return resolver.resolve()
+
+
+class IdentityResolverTest(unittest.TestCase):
+
+    def test_most_frequent_name_wins(self):
+        canonical, aliases, _ = resolve(('lucia  rossi', 'lucia@example.com', 5, 200),
+                                        ('Lucia Rossi', 'lucia@example.com', 2, 100))
+        self.assertEqual(canonical[('Lucia Rossi', 'lucia@example.com')], 'lucia  rossi')
+        self.assertEqual(len(aliases), 1)
+
+    def test_tie_prefers_tidy_spelling(self):
+        for order in (1, -1):
+            with self.subTest(order=order):
+                canonical, aliases, _ = resolve(*[('lucia  rossi', 'lucia@example.com', 3, 200),
+                                                  ('Lucia Rossi', 'lucia@example.com', 3, 100)][::order])
+                self.assertEqual(list(aliases), ['Lucia Rossi'])
+                self.assertEqual(canonical[('lucia  rossi', 'lucia@example.com')], 'Lucia Rossi')
+
+    def test_tie_between_tidy_spellings_prefers_most_recent(self):
+        for order in (1, -1):
+            with self.subTest(order=order):
+                _, aliases, emails = resolve(*[('Bob Builder', 'Bob@example.com', 4, 100),
+                                               ('Bob B', 'bob@example.com', 4, 300)][::order])
+                self.assertEqual(list(aliases), ['Bob B'])
+                self.assertEqual(emails['Bob B'], 'bob@example.com')
+
+    def test_people_sharing_a_name_stay_apart(self):
+        canonical, aliases, _ = resolve(('John Smith', 'john@one.example.com', 3, 100),
+                                        ('John Smith', 'jsmith@two.example.com', 2, 200))
+        self.assertEqual(sorted(aliases), ['John Smith <john@one.example.com>',
+                                           'John Smith <jsmith@two.example.com>'])
+        self.assertEqual(canonical[('John Smith', 'jsmith@two.example.com')],
+                         'John Smith <jsmith@two.example.com>')
+
+    def test_placeholder_email_merges_no_one(self):
+        _, aliases, _ = resolve(('Ann Lee', 'you@example.com', 1, 100),
+                                ('Bert Cole', 'you@example.com', 1, 200),
+                                ('Cleo Park', 'noreply@github.com', 1, 300),
+                                ('Dan Ruiz', 'noreply@github.com', 1, 400))
+        self.assertEqual(sorted(aliases), ['Ann Lee', 'Bert Cole', 'Cleo Park', 'Dan Ruiz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Text Measurements for Project Onboarding
+
+Shared by the onboarding analyzers that count the lines of files. Lines
+are counted on raw bytes read in chunks, so files are never decoded or
+held in memory whole.
+"""
+
+from typing import FrozenSet, Iterable
+
+# Files are read in chunks of this size to count lines
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Extensions of binary files, which are never opened to count lines
+BINARY_EXTENSIONS: FrozenSet[str] = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.ico', '.webp', '.bmp', '.tiff',
+    '.mp4', '.avi', '.mov', '.mp3', '.wav', '.ogg', '.flac',
+    '.zip', '.tar', '.gz', '.bz2', '.7z', '.rar',
+    '.exe', '.dll', '.so', '.dylib', '.bin', '.app',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.sqlite', '.db', '.parquet'
+})
+
+
+def count_text_lines(chunks: Iterable[bytes]) -> int:
+    """Count the lines of consecutive chunks of a text file.
+    
+    Lines are counted as text-mode readlines() would for valid UTF-8, with
+    LF, CRLF and CR all ending a line.
+    """
+    line_count = 0
+    last_byte = b''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        line_count += chunk.count(b'\n')
+        if b'\r' in chunk or last_byte == b'\r':
+            line_count += chunk.count(b'\r') - chunk.count(b'\r\n')
+            if last_byte == b'\r' and chunk[:1] == b'\n':
+                line_count -= 1  # CRLF split across two chunks
+        last_byte = chunk[-1:]
+    
+    if last_byte and last_byte not in b'\r\n':
+        line_count += 1  # Last line without a terminator
+    return line_count
+
+
+def count_file_lines(file_path: str) -> int:
+    """Count the lines of a file, reading it in chunks."""
+    with open(file_path, 'rb') as f:
+        return count_text_lines(iter(lambda: f.read(READ_CHUNK_SIZE), b''))
@@ -9,6 +9,7 @@ Based on PowerShell script patterns from OLAF toolkit.
 """
 
 import os
+import asyncio
 import json
 import argparse
 import subprocess
@@ -18,6 +19,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import logging
 
+from repo_size_metrics_calculator import GIT_METADATA_CONCURRENCY, collect_git_metadata_many
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -26,9 +29,11 @@ logger = logging.getLogger(__name__)
 class WorkspaceContentAnalyzer:
     """Analyzes workspace content structure and repository relationships."""
     
-    def __init__(self, workspace_path: str, output_file: str = None):
+    def __init__(self, workspace_path: str, output_file: str = None,
+                 git_concurrency: int = GIT_METADATA_CONCURRENCY):
         self.workspace_path = Path(workspace_path).resolve()
         self.output_file = output_file or self.workspace_path / "workspace-analysis.md"
+        self.git_concurrency = git_concurrency
         self.repositories = []
         self.dependency_map = {}
         self.workspace_structure = {}
@@ -57,6 +62,13 @@ class WorkspaceContentAnalyzer:
                 
         return repositories
     
+    def collect_git_metadata(self) -> None:
+        """Attach the Git metadata of every repository, querying many repositories at once."""
+        metadata = asyncio.run(collect_git_metadata_many(
+            [repo['absolute_path'] for repo in self.repositories], self.git_concurrency))
+        for repo in self.repositories:
+            repo['git'] = metadata[repo['absolute_path']]
+    
     def _detect_repository_type(self, repo_path: Path) -> str:
         """Detect the type of repository based on configuration files."""
         config_files = {
@@ -321,14 +333,16 @@ class WorkspaceContentAnalyzer:
 
 ## Repository Overview
 
-| Repository | Type | Path | Size (MB) | Last Modified |
-|------------|------|------|-----------|---------------|
+| Repository | Type | Path | Size (MB) | Commits | Branches | Tags | Last Modified |
+|------------|------|------|-----------|---------|----------|------|---------------|
 """
         
         for repo in sorted(self.repositories, key=lambda x: x['name']):
             size_mb = round(repo['size'] / (1024 * 1024), 2)
             last_mod = repo['last_modified'][:10]  # Date only
-            report += f"| {repo['name']} | {repo['type']} | {repo['path']} | {size_mb} | {last_mod} |\n"
+            git = repo['git']
+            report += (f"| {repo['name']} | {repo['type']} | {repo['path']} | {size_mb} | "
+                       f"{git['commit_count']:,} | {git['branch_count']} | {git['tag_count']} | {last_mod} |\n")
         
         report += f"""
 ## Workspace Structure Analysis
@@ -422,6 +436,10 @@ Based on the workspace analysis:
         self.repositories = self.find_git_repositories()
         logger.info(f"Found {len(self.repositories)} repositories")
         
+        # Collect Git metadata
+        logger.info("Collecting Git metadata...")
+        self.collect_git_metadata()
+        
         # Analyze dependencies
         logger.info("Analyzing dependencies...")
         self.dependency_map = self.analyze_dependencies()
@@ -449,6 +467,8 @@ def main():
     parser = argparse.ArgumentParser(description='Analyze workspace content structure')
     parser.add_argument('workspace_path', help='Path to workspace directory')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
+    parser.add_argument('--git-concurrency', type=int, default=GIT_METADATA_CONCURRENCY,
+                        help=f'Repositories whose Git metadata is collected at the same time (default: {GIT_METADATA_CONCURRENCY})')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -460,7 +480,7 @@ def main():
         logger.error(f"Workspace path does not exist: {args.workspace_path}")
         sys.exit(1)
     
-    analyzer = WorkspaceContentAnalyzer(args.workspace_path, args.output)
+    analyzer = WorkspaceContentAnalyzer(args.workspace_path, args.output, args.git_concurrency)
     analyzer.run_analysis()
 
 